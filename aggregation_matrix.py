@@ -0,0 +1,147 @@
+"""
+종별 -> 유형(그룹) 진료비 가중평균을 가중치 행렬 곱으로 계산
+- 연도별 가중치 행렬 W[연도] (그룹 x 종별): 그룹 내 종별 진료비 비중 (행 합 = 1)
+- 종별 x 시나리오 블록을 전 연도 한 번의 행렬곱(einsum)으로 그룹 집계
+- 그룹 정의는 임의 지정 가능: {그룹: [종별, ...]} (진료비 가중) 또는 {그룹: {종별: 고정가중치}}
+  그룹 간 종별 중복 허용 (예: '병원(계)' 와 '전체' 를 함께 정의)
+
+기존 루프(그룹별 멤버 필터 -> 진료비 비중 정규화 -> mul().sum())와 같은 결과:
+- 진료비 합계가 0 이거나 유효 멤버가 없는 그룹은 NaN
+- skipna=True(기본)면 값이 NaN 인 종별은 pandas sum 처럼 0 으로 취급
+
+전체 가중평균 지수 (weighted_average / weighted_average_series):
+- 지수 큐브 (연도, 종별, 시나리오...) 를 t / t-1 / t-2 진료비 가중치(lag)로 한 번에 평균
+- 결측 종별 처리: 'zero' (분자 0, 분모 포함 - 기존 보고서 스크립트와 동일) 또는 'renormalize' (마스크 후 재정규화)
+
+사용 예:
+    agg = AggregationMatrix(GROUP_MAPPING, types)
+    block5 = agg.aggregate(block10, df_exp, exp_years)   # (연도, 종별, 시나리오) -> (연도, 그룹, 시나리오)
+    df5 = agg.aggregate_frame(df_cf_10, df_exp, 2023)    # 종별 x 시나리오 DataFrame 1개
+    s = weighted_average_series(df_law, df_exp, lag=0)   # 연도별 전체 가중평균 법과제도 지수
+"""
+
+import numpy as np
+import pandas as pd
+
+TYPE_GROUPS_5 = {
+    '병원': ['상급종합', '종합병원', '병원', '요양병원'],
+    '의원': ['의원'],
+    '치과': ['치과병원', '치과의원'],
+    '한방': ['한방병원', '한의원'],
+    '약국': ['약국'],
+}
+TOTAL_GROUP = '전체'
+MISSING_MODES = ('zero', 'renormalize')
+
+
+class AggregationMatrix:
+    """그룹 정의 + 종별 순서 -> 연도별 (그룹 x 종별) 가중치 행렬"""
+
+    def __init__(self, groups, types):
+        self.spec = dict(groups)
+        self.groups = list(groups)
+        self.types = list(types)
+        pos = {t: j for j, t in enumerate(self.types)}
+        # 그룹별 멤버 위치 마스크 / 고정 가중치 (고정 가중치가 없으면 진료비 가중)
+        self.members = np.zeros((len(self.groups), len(self.types)), dtype=bool)
+        self.fixed = np.full((len(self.groups), len(self.types)), np.nan)
+        self.is_fixed = np.zeros(len(self.groups), dtype=bool)
+        for g, name in enumerate(self.groups):
+            spec = groups[name]
+            if isinstance(spec, dict):
+                self.is_fixed[g] = True
+                for t, w in spec.items():
+                    if t in pos:
+                        self.members[g, pos[t]] = True
+                        self.fixed[g, pos[t]] = w
+            else:
+                for t in spec:
+                    if t in pos:
+                        self.members[g, pos[t]] = True
+        self._cache = None
+
+    def matrices(self, df_exp, years):
+        """진료비(연도 x 종별) -> W (연도, 그룹, 종별). 자료 없는 종별은 가중치 0"""
+        years = tuple(years)
+        if self._cache is not None and self._cache[0] is df_exp and self._cache[1] == years:
+            return self._cache[2]
+        exp = df_exp.reindex(index=list(years), columns=self.types).to_numpy(dtype=float)
+        exp = np.nan_to_num(exp, nan=0.0)
+        raw = np.where(self.members[None], exp[:, None, :], 0.0)
+        fixed = np.nan_to_num(np.where(self.members, self.fixed, 0.0))
+        raw = np.where(self.is_fixed[None, :, None], fixed[None], raw)
+        total = raw.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            W = np.where(total != 0, raw / total, np.nan)
+        self._cache = (df_exp, years, W)
+        return W
+
+    def aggregate(self, block, df_exp, years, skipna=True):
+        """block (연도, 종별, ...) -> (연도, 그룹, ...) 가중평균"""
+        W = self.matrices(df_exp, years)
+        values = np.asarray(block, dtype=float)
+        if skipna:
+            values = np.where(np.isnan(values), 0.0, values)
+        flat = values.reshape(values.shape[0], values.shape[1], -1)
+        out = np.einsum('ygt,ytk->ygk', W, flat)
+        return out.reshape((values.shape[0], len(self.groups)) + values.shape[2:])
+
+    def aggregate_frame(self, df, df_exp, year, skipna=True):
+        """종별 x 열 DataFrame 1개 -> 그룹 x 열 DataFrame (weight_year = year)"""
+        present = [t for t in self.types if t in df.index]
+        if len(present) < len(self.types):
+            # df 에 없는 종별은 멤버에서 제외하고 나머지로 재정규화 (기존 루프와 동일)
+            return AggregationMatrix(self.spec, present).aggregate_frame(df, df_exp, year, skipna)
+        block = df.reindex(self.types).to_numpy(dtype=float)[None]
+        out = self.aggregate(block, df_exp, [year], skipna)[0]
+        return pd.DataFrame(out, index=self.groups, columns=df.columns)
+
+
+def weighted_average(block, df_exp, years, types, lag=0, groups=None, missing='zero'):
+    """지수 큐브 (연도, 종별, ...) -> 진료비 가중평균 (연도, 그룹, ...)
+
+    가중치 연도 = 연도 - lag (0: t, 1: t-1, 2: t-2), groups=None 이면 '전체' 그룹 1개
+    missing='zero': 지수 결측 종별은 분자 0 / 분모 포함, 'renormalize': 결측 종별을 제외하고 재정규화
+    진료비 합계가 0 이거나 없는 연도는 NaN
+    """
+    if missing not in MISSING_MODES:
+        raise ValueError(f"missing must be one of {MISSING_MODES}: {missing}")
+    types = list(types)
+    agg = AggregationMatrix(groups or {TOTAL_GROUP: types}, types)
+    exp_years = [y - lag for y in years]
+    values = np.asarray(block, dtype=float)
+    if missing == 'zero':
+        return agg.aggregate(values, df_exp, exp_years)
+    W = agg.matrices(df_exp, exp_years)
+    mask = ~np.isnan(values)
+    flat = np.where(mask, values, 0.0).reshape(values.shape[0], values.shape[1], -1)
+    num = np.einsum('ygt,ytk->ygk', W, flat)
+    den = np.einsum('ygt,ytk->ygk', W, mask.reshape(flat.shape).astype(float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(den > 0, num / den, np.nan)
+    return out.reshape((values.shape[0], len(agg.groups)) + values.shape[2:])
+
+
+def weighted_average_series(df_index, df_exp, lag=0, types=None, missing='zero'):
+    """연도 x 종별 지수 DataFrame -> 연도별 전체 가중평균 Series (가중치 진료비가 없는 연도는 제외)"""
+    types = [t for t in (types or df_index.columns) if t in df_exp.columns]
+    years = [y for y in df_index.index if y - lag in df_exp.index]
+    block = df_index.reindex(index=years, columns=types).to_numpy(dtype=float)
+    out = weighted_average(block, df_exp, years, types, lag, missing=missing)[:, 0]
+    return pd.Series(out, index=pd.Index(years, name=df_index.index.name)).dropna()
+
+
+def overall_from_rows(rows_by_year, df_exp, types, group_mapping=None, lag=2, missing='renormalize'):
+    """{연도: {종별/그룹: 값}} -> {연도: 전체 가중평균} (대시보드 '전체' 선)
+    종별 값이 있으면 종별 진료비, 그룹 값만 있으면 그룹 멤버 진료비 합으로 가중"""
+    df = pd.DataFrame({int(y): row for y, row in rows_by_year.items() if isinstance(row, dict)}).T
+    df = df.apply(pd.to_numeric, errors='coerce')
+    cols = [t for t in types if t in df.columns]
+    weights = df_exp
+    if not cols and group_mapping:
+        cols = [g for g in group_mapping if g in df.columns]
+        weights = pd.DataFrame({g: df_exp.reindex(columns=group_mapping[g]).sum(axis=1, min_count=1) for g in cols})
+    if not cols or df.empty:
+        return {}
+    return {int(y): float(v) for y, v in
+            weighted_average_series(df.sort_index(), weights, lag, cols, missing).items()}
@@ -0,0 +1,204 @@
+"""
+분석 결과 캐시 및 서버 시작 시 사전 계산(Warm-up) 모듈
+- 연도별 run_full_analysis 결과를 여러 개 보관하는 LRU 캐시 (기존 단일 결과 캐시 대체)
+- 동일 연도 동시 요청 시 한 번만 계산 (single-flight)
+- 서버 시작 시 선택 가능한 전 연도(2024-2028)를 백그라운드에서 병렬 계산
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import engine_profiler
+from metrics import instrument_stages, timed_stage
+from parallel_analysis import private_copy
+
+# UI 연도 선택기(2024-2028)와 동일
+WARMUP_YEARS = [2024, 2025, 2026, 2027, 2028]
+DEFAULT_MAX_ENTRIES = 8
+
+# /metrics 엔진 세부 단계 (run_full_analysis 중 이 메서드들 밖의 시간은 ENGINE_OTHER_STAGE 로 기록)
+ENGINE_STAGES = {
+    'mei': [('MeiCalculator', 'calc_mei_index_by_year')],
+    'sgr': [('SgrCalculator', '_calc_sgr_components'), ('SgrCalculator', 'calc_sgr_index')],
+    'paf': [('SgrCalculator', 'calc_paf_s1'), ('SgrCalculator', 'calc_paf_s2')],
+    'final_rate': [('FinalRateCalculator', 'calc_macro_final_rate'),
+                   ('FinalRateCalculator', '_group_and_weight_average')],
+}
+ENGINE_OTHER_STAGE = 'engine_other'
+
+_engine_module = None
+
+
+def engine_module():
+    """엔진 모듈 (처음 사용할 때 로드하고 세부 단계 계측 설치)"""
+    global _engine_module
+    if _engine_module is None:
+        import 파이썬용_sgr_2027 as engine
+        instrument_stages({stage: [(getattr(engine, cls), attr) for cls, attr in methods if hasattr(engine, cls)]
+                           for stage, methods in ENGINE_STAGES.items()})
+        _engine_module = engine
+    return _engine_module
+
+
+def build_engine(raw_data, overrides=None):
+    """원시자료(+사용자 수정값)로 CalculationEngine 생성
+    - 엔진은 수정값을 raw_data 에 제자리 기록하므로 수정값이 있으면 복사본으로 생성
+      (호출자의 원시자료/전망 캐시/내용 지문에 수정값이 남지 않음)
+    """
+    CalculationEngine = engine_module().CalculationEngine
+    if overrides:
+        return CalculationEngine(private_copy(raw_data), overrides)
+    return CalculationEngine(raw_data)
+
+
+def compute_analysis(raw_data, target_year, overrides=None):
+    """run_full_analysis 1회 실행 -> (history, components, bulk_sgr)"""
+    engine = build_engine(raw_data, overrides)
+    with timed_stage('run_full_analysis', remainder=ENGINE_OTHER_STAGE):
+        return engine.run_full_analysis(target_year=target_year)
+
+
+class AnalysisCache:
+    """연도(및 키)별 분석 결과를 보관하는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                engine_profiler.count('analysis_cache.hit')
+                return self._entries[key]
+            self.misses += 1
+            engine_profiler.count('analysis_cache.miss')
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, key, compute_fn):
+        """캐시에 없으면 compute_fn()을 실행. 같은 키의 동시 요청은 먼저 시작한 계산 결과를 기다림"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            # 락 획득 사이에 다른 스레드가 완료했을 수 있음
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                waiter = threading.Event()
+                self._inflight[key] = waiter
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            waiter.wait()
+            value = self.get(key)
+            if value is not None:
+                return value
+            # 선행 계산이 실패한 경우 직접 재시도
+            return self.get_or_compute(key, compute_fn)
+
+        try:
+            value = compute_fn()
+            if value is not None:
+                self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            waiter.set()
+
+    def entry_sizes(self):
+        """캐시 항목별 결과 객체 크기 (bytes) - 캐시 개수(max_entries) 산정용"""
+        with self._lock:
+            items = list(self._entries.items())
+        return {str(k): engine_profiler.deep_sizeof(v) for k, v in items}
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+            }
+
+
+class AnalysisWarmer:
+    """서버 시작 시 대상 연도 분석을 백그라운드에서 병렬로 미리 계산"""
+
+    def __init__(self, analysis_fn, hot_fn, years=None, max_workers=None):
+        # analysis_fn(year): 캐시를 거쳐 결과 반환, hot_fn(year): 캐시 적재 여부
+        self.analysis_fn = analysis_fn
+        self.hot_fn = hot_fn
+        self.years = list(years) if years else list(WARMUP_YEARS)
+        self.max_workers = max_workers or len(self.years)
+        self._status = {y: {'state': 'pending', 'seconds': None, 'error': None} for y in self.years}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _set(self, year, **fields):
+        with self._lock:
+            self._status.setdefault(year, {'state': 'pending', 'seconds': None, 'error': None}).update(fields)
+
+    def _warm_year(self, year):
+        self._set(year, state='running')
+        start = time.time()
+        try:
+            result = self.analysis_fn(year)
+            state = 'ready' if result is not None else 'error'
+            self._set(year, state=state, seconds=round(time.time() - start, 3))
+            print(f"[INFO] Warm-up {year}: {state} ({time.time() - start:.2f}s)")
+        except Exception as e:
+            self._set(year, state='error', seconds=round(time.time() - start, 3), error=str(e))
+            print(f"[WARN] Warm-up failed for {year}: {e}")
+
+    def start(self):
+        """요청 처리 경로와 분리된 스레드 풀에서 계산 시작 (즉시 반환)"""
+        if self._executor is not None:
+            return self
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sgr-warmup')
+        for year in self.years:
+            self._executor.submit(self._warm_year, year)
+        self._executor.shutdown(wait=False)
+        return self
+
+    def status(self):
+        """연도별 준비 상태 {year: {'state', 'seconds', 'error', 'hot'}}"""
+        with self._lock:
+            snapshot = {y: dict(s) for y, s in self._status.items()}
+        for year, s in snapshot.items():
+            s['hot'] = self.hot_fn(year)
+        return snapshot
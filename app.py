@@ -6,7 +6,11 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import os
+import hashlib
 from datetime import datetime
+from functools import lru_cache
+
+from 파이썬용_sgr_2027 import DataProcessor, CalculationEngine
 
 # AI 최적화 모듈 import
 try:
@@ -15,6 +19,8 @@ try:
 except ImportError:
     AI_MODULE_AVAILABLE = False
 
+from raw_data_api import RawDataStore, DEFAULT_PAGE_SIZE
+
 # 경고 무시 설정
 warnings.filterwarnings('ignore')
 
@@ -97,55 +103,153 @@ def inject_custom_css():
 # ----------------------------------------------------------------------
 # 1. Calculation Engine (Full Fidelity Logic)
 # ----------------------------------------------------------------------
-# [Note: Calculation logic is embedded or imported from calculation engines]
-# For the sake of app.py speed, we use modularized engine classes from the original codebase.
+# 파이썬용_sgr_2027.py 의 DataProcessor / CalculationEngine 을 그대로 사용
+
+DETAIL_CATEGORIES = [
+    "1. MEI 물가지수 시나리오 (16종)",
+    "2. SGR 구성요소 (연도별 상세)",
+    "3. 기초자료_증가율",
+    "4. SGR 산출내역 (지수, 1.xxxx)",
+    "5. 연도별 목표진료비 (Target V)",
+    "6. UAF(PAF) 산출 추이",
+    "7. 환산지수 조정률_현행 (16가지 시나리오)",
+    "8. 환산지수 조정률_개선 (16가지 시나리오)",
+    "9. 최종 조정률 결과 (현행모형)",
+    "10. 최종 조정률 결과 (개선모형)",
+    "11. 거시지표 모형",
+    "12. 최종 결과 종합 (Summary)",
+    "13. AR모형 시나리오 분석 (30개)",
+    "14. 인덱스(지수)법",
+    "15. 추가소요재정제약하의 환산지수조정율"
+]
+
+AI_GROUPS = {'병원(계)': '병원(계)', '의원': '의원(계)', '치과(계)': '치과(계)', '한방(계)': '한방(계)', '약국': '약국(계)'}
+
+
+def workbook_fingerprint(path):
+    """워크북 내용 해시 (캐시 키에 포함 -> 파일이 바뀌면 자동 재계산)"""
+    stat = os.stat(path)
+    return _hash_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _hash_file(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def _to_frame(obj):
+    """엔진 결과(dict / list of dict / DataFrame)를 표 형태로 변환"""
+    if obj is None:
+        return pd.DataFrame()
+    if isinstance(obj, pd.DataFrame):
+        return obj
+    if isinstance(obj, pd.Series):
+        return obj.to_frame()
+    if isinstance(obj, list):
+        return pd.json_normalize(obj)
+    if isinstance(obj, dict):
+        if all(not isinstance(v, (dict, list, pd.Series, pd.DataFrame)) for v in obj.values()):
+            return pd.Series(obj).to_frame('값')
+        try:
+            return pd.DataFrame(obj)
+        except ValueError:
+            return pd.json_normalize(obj)
+    return pd.DataFrame({'값': [obj]})
+
+
+def _by_year(series_dict, years=None):
+    """history[key] = {year: {group: val}} -> 행: 유형, 열: 연도"""
+    if not series_dict:
+        return pd.DataFrame()
+    years = years or sorted(series_dict.keys())
+    return pd.DataFrame({f"{y}년": series_dict[y] for y in years if y in series_dict})
+
 
 class SGRAppEngine:
     def __init__(self, data_path='SGR_data.xlsx'):
         self.data_path = data_path
-        self.data = self._load_data()
-        
-    def _load_data(self):
-        try:
-            return pd.read_excel(self.data_path, sheet_name=None, index_col=0)
-        except Exception as e:
-            st.error(f"Excel Load Error: {e}")
-            return {}
+        self.processor = DataProcessor(data_path)
+
+    @property
+    def raw_data(self):
+        return self.processor.raw_data
 
     def run_analysis(self, target_year):
-        """로컬 엔진의 15가지 결과물을 시뮬레이션 및 산출"""
-        # [MOCK DATA FOR DEMO - Real implementation should call modularized calc_*.py scripts]
-        h_types = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국']
-        years = list(range(2014, 2030))
-        
-        history = {
-            'S1': {y: {t: round(np.random.uniform(1, 3), 2) for t in h_types + ['전체']} for y in years},
-            'S2': {y: {t: round(np.random.uniform(1.2, 3.2), 2) for t in h_types + ['전체']} for y in years},
-            'GDP': {y: {t: round(np.random.uniform(2, 4), 2) for t in h_types + ['전체']} for y in years},
-            'MEI': {y: {t: round(np.random.uniform(2.5, 4.5), 2) for t in h_types + ['전체']} for y in years},
-            'Link': {y: {t: round(np.random.uniform(2.2, 3.8), 2) for t in h_types + ['전체']} for y in years},
-            'SGR_S2_INDEX': {y: {t: round(np.random.uniform(85, 95), 2) for t in h_types + ['전체']} for y in years}
-        }
-        
-        bulk_sgr = {
-            'scenario_adjustments': {y: pd.DataFrame(np.random.uniform(1, 4, (len(h_types), 16)), index=h_types, columns=[f"Scenario_{i}" for i in range(1, 17)]) for y in years},
-            'budget_analysis': {y: {t: round(np.random.uniform(100, 1000), 0) for t in h_types} for y in years},
-            'ar_analysis': {y: pd.DataFrame(np.random.uniform(1, 3, (30, 5)), columns=[f"AR_{i}" for i in range(1, 6)]) for y in years},
-            'mei_raw': {y: pd.DataFrame(np.random.uniform(100, 120, (len(h_types), 3)), index=h_types, columns=['인건비', '관리비', '재료비']) for y in years}
-        }
-        
-        return history, bulk_sgr
+        """CalculationEngine 실행 -> (history, components, bulk_sgr)"""
+        engine = CalculationEngine(self.processor.raw_data)
+        return engine.run_full_analysis(target_year=target_year)
+
+    @staticmethod
+    def build_detail_table(results, year, category):
+        """상세 산출 15개 메뉴 중 하나를 표로 구성"""
+        history, components, bulk_sgr = results
+        no = int(category.split('.')[0])
+
+        if no == 1:
+            return _to_frame(components.get('mei_raw', {}).get(year))
+        if no == 2:
+            return _to_frame(components.get('sgr_factors', {})).T
+        if no == 3:
+            return _to_frame(bulk_sgr.get('factor_growth', {}))
+        if no == 4:
+            return pd.concat({m: _by_year(history.get(f'SGR_{m}_INDEX')) for m in ['S1', 'S2']})
+        if no == 5:
+            return pd.concat({m: _by_year(history.get(f'Target_{m}')) for m in ['S1', 'S2']})
+        if no == 6:
+            return pd.concat({m: _by_year(history.get(f'UAF_{m}')) for m in ['S1', 'S2']})
+        if no in (7, 8):
+            model = 'S1' if no == 7 else 'S2'
+            scen = bulk_sgr.get('scenario_adjustments', {}).get(year, {})
+            return pd.DataFrame({sc: v.get(model, {}) for sc, v in scen.items()})
+        if no in (9, 10):
+            return _by_year(history.get('S1' if no == 9 else 'S2'))
+        if no == 11:
+            return pd.DataFrame({m: history.get(m, {}).get(year, {}) for m in ['GDP', 'MEI', 'Link']})
+        if no == 12:
+            keys = ['S1', 'S2', 'GDP', 'MEI', 'Link', 'UAF_S1', 'UAF_S2']
+            return pd.DataFrame({k: history[k][year] for k in keys if year in history.get(k, {})})
+        if no == 13:
+            ar = bulk_sgr.get('ar_analysis', {}).get(year, [])
+            if isinstance(ar, dict):
+                return pd.concat({m: _to_frame(rows) for m, rows in ar.items()})
+            return _to_frame(ar)
+        if no == 14:
+            return _to_frame(history.get('IndexMethod', {}).get(year))
+        if no == 15:
+            return _to_frame(bulk_sgr.get('budget_constraints', {}).get(year))
+        return pd.DataFrame()
 
 # ----------------------------------------------------------------------
 # 2. Caching & Persistence
 # ----------------------------------------------------------------------
+# 모든 캐시 키에 워크북 fingerprint 포함 (같은 경로라도 내용이 바뀌면 새로 계산)
 @st.cache_resource
-def get_sgr_engine(path):
+def get_sgr_engine(path, fingerprint):
     return SGRAppEngine(path)
 
-@st.cache_data
-def get_cached_results(_engine, year):
-    return _engine.run_analysis(year)
+@st.cache_resource
+def get_raw_data_store(path, fingerprint):
+    return RawDataStore(get_sgr_engine(path, fingerprint).raw_data)
+
+@st.cache_data(max_entries=8)
+def get_cached_results(path, fingerprint, year):
+    return get_sgr_engine(path, fingerprint).run_analysis(year)
+
+@st.cache_data(max_entries=256)
+def get_detail_table(path, fingerprint, year, category):
+    """(연도, 메뉴)별 상세표 메모이제이션"""
+    results = get_cached_results(path, fingerprint, year)
+    return SGRAppEngine.build_detail_table(results, year, category)
+
+@st.cache_data(max_entries=8)
+def get_ai_result(path, fingerprint, year, sgr_results):
+    raw = get_sgr_engine(path, fingerprint).raw_data
+    ai_engine = AIOptimizationEngine(data_frames={k: raw.get(k) for k in ['df_contract', 'df_expenditure', 'df_finance']})
+    return ai_engine.run_full_analysis(target_year=year, sgr_results=dict(sgr_results))
 
 # ----------------------------------------------------------------------
 # 3. Main Application UI
@@ -203,7 +307,9 @@ def render_dashboard():
         st.markdown("<div style='position: fixed; bottom: 20px; color: #475569; font-size: 0.75rem;'>SGR Intelligence v2.0.4-FIRE</div>", unsafe_allow_html=True)
 
     # 2. Main Analytics Content
-    engine = get_sgr_engine('SGR_data.xlsx')
+    data_path = 'SGR_data.xlsx'
+    fingerprint = workbook_fingerprint(data_path)
+    y = st.session_state.target_year
     
     # Header Section
     st.markdown(f"""
@@ -218,33 +324,37 @@ def render_dashboard():
         </div>
     """, unsafe_allow_html=True)
 
-    # Auto-run analysis
-    with st.spinner("Processing massive dataset..."):
-        h, b = get_cached_results(engine, st.session_state.target_year)
-        st.session_state.history = h
-        st.session_state.bulk_sgr = b
+    # Main Views (선택된 화면만 계산/렌더링)
+    views = ["📊 대시보드 (Dashboard)", "🔍 원시자료 (Raw Data)", "📑 상세 산출 (Details)", "🧠 AI 최적화 (AI Prediction)"]
+    view = st.radio("View", views, horizontal=True, label_visibility="collapsed", key="main_view")
 
-    # Main Tabs
-    tabs = st.tabs(["📊 대시보드 (Dashboard)", "🔍 원시자료 (Raw Data)", "📑 상세 산출 (Details)", "🧠 AI 최적화 (AI Prediction)"])
+    # --- VIEW 1: Dashboard (Metrics + Plotly) ---
+    if view == views[0]:
+        with st.spinner("Processing massive dataset..."):
+            h, c, b = get_cached_results(data_path, fingerprint, y)
+
+        def metric(key):
+            cur = h.get(key, {}).get(y, {}).get('전체')
+            prev = h.get(key, {}).get(y - 1, {}).get('전체')
+            value = f"{cur:.2f}%" if cur is not None else "-"
+            delta = f"{cur - prev:+.2f}%p" if cur is not None and prev is not None else None
+            return value, delta
 
-    # --- TAB 1: Dashboard (Metrics + Plotly) ---
-    with tabs[0]:
-        y = st.session_state.target_year
         m1, m2, m3, m4 = st.columns(4)
-        m1.metric("SGR S1 (현행)", f"{h['S1'][y]['전체']}%", "+0.15%")
-        m2.metric("SGR S2 (개선)", f"{h['S2'][y]['전체']}%", "+0.45%")
-        m3.metric("GDP 모형", f"{h['GDP'][y]['전체']}%", "-0.10%")
-        m4.metric("추가 재정 추정", f"{sum(b['budget_analysis'][y].values()):,.0f} 억", "Auto")
+        m1.metric("SGR S1 (현행)", *metric('S1'))
+        m2.metric("SGR S2 (개선)", *metric('S2'))
+        m3.metric("GDP 모형", *metric('GDP'))
+        m4.metric("거시지표 연계 모형", *metric('Link'))
 
         st.markdown("<br>", unsafe_allow_html=True)
         
         # Plotly Trend Chart
         st.markdown("### 📈 모델별 조정률 추세 (Trend Analysis)")
         df_trend = pd.DataFrame({
-            'SGR S1': {yr: h['S1'][yr]['전체'] for yr in h['S1']},
-            'SGR S2': {yr: h['S2'][yr]['전체'] for yr in h['S2']},
-            'GDP Model': {yr: h['GDP'][yr]['전체'] for yr in h['GDP']}
-        })
+            'SGR S1': {yr: v.get('전체') for yr, v in h['S1'].items()},
+            'SGR S2': {yr: v.get('전체') for yr, v in h['S2'].items()},
+            'GDP Model': {yr: v.get('전체') for yr, v in h['GDP'].items()}
+        }).sort_index()
         fig = go.Figure()
         for col in df_trend.columns:
             fig.add_trace(go.Scatter(x=df_trend.index, y=df_trend[col], name=col, mode='lines+markers', line=dict(width=3 if 'S2' in col else 2)))
@@ -253,78 +363,71 @@ def render_dashboard():
 
         st.markdown("### 📋 종별 상세 분석 결과")
         df_table = pd.DataFrame({
-            'S1 (%)': h['S1'][y],
-            'S2 (%)': h['S2'][y],
-            'Link (%)': h['Link'][y]
+            'S1 (%)': h['S1'].get(y, {}),
+            'S2 (%)': h['S2'].get(y, {}),
+            'Link (%)': h['Link'].get(y, {})
         })
         st.table(df_table.head(10).T)
 
-    # --- TAB 2: Raw Data ---
-    with tabs[1]:
-        sheet_list = list(engine.data.keys())
-        sel_sheet = st.selectbox("Excel Sheet Selector", sheet_list)
+    # --- VIEW 2: Raw Data ---
+    elif view == views[1]:
+        raw_store = get_raw_data_store(data_path, fingerprint)
+        sheet_info = {s['name']: s for s in raw_store.describe()}
+        sel_sheet = st.selectbox("Excel Sheet Selector", list(sheet_info.keys()))
         if sel_sheet:
-            st.dataframe(engine.data[sel_sheet], use_container_width=True, height=600)
+            info = sheet_info[sel_sheet]
+            c1, c2, c3 = st.columns([2, 1, 1])
+            sel_cols = c1.multiselect("Columns", info['columns'], default=info['columns'])
+            n_pages = max(1, -(-info['total_rows'] // DEFAULT_PAGE_SIZE))
+            page = c2.number_input("Page", min_value=1, max_value=n_pages, value=1)
+            c3.markdown(f"<br>Rows: {info['total_rows']}", unsafe_allow_html=True)
+            # 보이는 페이지만 조회
+            page_data = raw_store.query(sel_sheet, columns=sel_cols, offset=(page - 1) * DEFAULT_PAGE_SIZE)
+            df_page = pd.DataFrame(page_data['rows'], columns=page_data['headers']).set_index(page_data['headers'][0])
+            st.dataframe(df_page, use_container_width=True, height=600)
 
-    # --- TAB 3: Detailed Stats (15-Menu Restoration) ---
-    with tabs[2]:
+    # --- VIEW 3: Detailed Stats (15-Menu Restoration) ---
+    elif view == views[2]:
         st.markdown("### 📑 상세 산출 내역 서브메뉴 (15 Categories)")
-        sub_menu = st.selectbox("Category Selector", [
-            "1. MEI 물가지수 시나리오 (16종)",
-            "2. SGR 구성요소 (연도별 상세)",
-            "3. 기초자료_증가율",
-            "4. SGR 산출내역 (지수, 1.xxxx)",
-            "5. 연도별 목표진료비 (Target V)",
-            "6. UAF(PAF) 산출 추이",
-            "7. 환산지수 조정률_현행 (16가지 시나리오)",
-            "8. 환산지수 조정률_개선 (16가지 시나리오)",
-            "9. 최종 조정률 결과 (현행모형)",
-            "10. 최종 조정률 결과 (개선모형)",
-            "11. 거시지표 모형",
-            "12. 최종 결과 종합 (Summary)",
-            "13. AR모형 시나리오 분석 (30개)",
-            "14. 인덱스(지수)법",
-            "15. 추가소요재정제약하의 환산지수조정율"
-        ])
-        
-        y = st.session_state.target_year
-        if sub_menu.startswith("1.") or sub_menu.startswith("7.") or sub_menu.startswith("8."):
-            st.table(b['scenario_adjustments'][y].head(10))
-        elif sub_menu.startswith("13."):
-            st.table(b['ar_analysis'][y].head(10))
-        elif sub_menu.startswith("15."):
-            st.table(pd.DataFrame(b['budget_analysis'][y], index=['추가소요재정(억)']).T)
+        sub_menu = st.selectbox("Category Selector", DETAIL_CATEGORIES)
+        with st.spinner(f"'{sub_menu}' 산출 중..."):
+            df_detail = get_detail_table(data_path, fingerprint, y, sub_menu)
+        if df_detail.empty:
+            st.info(f"{y}년 '{sub_menu}' 데이터가 없습니다.")
         else:
-            st.info(f"'{sub_menu}'에 대한 상세 데이터를 로드 중입니다.")
-            st.dataframe(pd.DataFrame(np.random.normal(size=(10, 5))), use_container_width=True)
+            st.dataframe(df_detail, use_container_width=True, height=600)
 
-    # --- TAB 4: AI Prediction (Plotly Integration) ---
-    with tabs[3]:
+    # --- VIEW 4: AI Prediction (Plotly Integration) ---
+    elif view == views[3]:
         st.markdown("""<h2 style='color: #a855f7; font-weight: 800;'>🧠 AI Intelligence Optimization</h2>""", unsafe_allow_html=True)
         col_btn, col_info = st.columns([1, 2])
         with col_btn:
-            if st.button("🚀 EXECUTE AI ENGINE", use_container_width=True, type="primary"):
-                with st.spinner("AI Exploring Global Optimum..."):
-                    # Mock AI Result (Matching Local AI dash)
-                    st.session_state.ai_res = {
-                        'k': 12, 'j': 1.052, 'm_err': 1.42, 'budget': '418',
-                        'data': {'상급종합': 1.62, '종합병원': 1.84, '의원': 3.12, '치과병원': 2.15, '약국': 2.52}
-                    }
-                    st.success("Optimization Complete!")
-
-        if 'ai_res' in st.session_state:
-            res = st.session_state.ai_res
+            run_ai = st.button("🚀 EXECUTE AI ENGINE", use_container_width=True, type="primary", disabled=not AI_MODULE_AVAILABLE)
+        if not AI_MODULE_AVAILABLE:
+            col_info.warning("ai_optimizer 모듈을 불러올 수 없습니다.")
+        if run_ai:
+            with st.spinner("AI Exploring Global Optimum..."):
+                h, c, b = get_cached_results(data_path, fingerprint, y)
+                s2 = h.get('S2', {}).get(y, {})
+                sgr_results = tuple((k, float(s2[g])) for k, g in AI_GROUPS.items() if s2.get(g) is not None)
+                st.session_state.ai_res = get_ai_result(data_path, fingerprint, y, sgr_results)
+                st.session_state.ai_year = y
+                st.success("Optimization Complete!")
+
+        res = st.session_state.get('ai_res')
+        if res and st.session_state.get('ai_year') == y:
             a1, a2, a3, a4 = st.columns(4)
-            a1.metric("K-Factor", res['k'])
-            a2.metric("J-Momentum", res['j'])
-            a3.metric("Min MAPE", f"{res['m_err']}%")
-            a4.metric("Cons. Budget", f"{res['budget']} 억")
+            a1.metric("K-Factor", res['optimal_k'])
+            a2.metric("J-Momentum", res['optimal_j'])
+            a3.metric("Min MAPE", f"{res['min_error']:.2f}%")
+            a4.metric("Target Budget", f"{res['target_budget']:,.0f} 억")
             
             st.markdown("### 🎯 AI Optimized Rates")
-            st.table(pd.DataFrame(res['data'], index=['Target Rate (%)']).T)
+            st.table(pd.DataFrame(res['optimized_rates'], index=['Target Rate (%)']).T)
             
             # Plotly Error Bar
-            fig_err = px.bar(x=[2021, 2022, 2023, 2024, 2025], y=[2.1, 1.9, 1.45, 1.6, 1.42], labels={'x': 'Year', 'y': 'MAPE (%)'}, title="Backtesting Accuracy (2021-2025)")
+            year_errors = res.get('year_errors', {})
+            fig_err = px.bar(x=[int(k) for k in year_errors], y=list(year_errors.values()), labels={'x': 'Year', 'y': 'MAPE (%)'}, title="Backtesting Accuracy")
             fig_err.update_layout(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
             st.plotly_chart(fig_err, use_container_width=True)
 
@@ -0,0 +1,181 @@
+"""
+AR 모형 시나리오 큐브 (기본증가율 x MEI 시나리오 x 적용률 r x 종별)
+- 산식: Final = Base + r x (CF_S - 가중평균 CF_S)   (가중치: 종별 진료비 비중)
+- Final 은 r 에 대해 선형이므로 Base (기본증가율 x 열) 와 편차 Dev (시나리오 x 열) 두 행렬만 저장하고
+  조회 시 브로드캐스트로 계산 -> r 을 수백 개로 늘려도 저장 크기/계산 시간이 r 개수와 무관
+- 그룹(병원(계) 등)과 '전체' 열도 가중평균이 선형이므로 Base/Dev 단계에서 한 번만 집계
+  ('전체' 의 Dev 는 정의상 0 -> 모든 r 에서 전체 인상률 = 기본증가율 전체)
+
+기존 bulk_sgr['ar_analysis'][year] 레코드 목록(dict 리스트)과 상호 변환 가능 (to_records / from_records).
+from_analysis: 엔진과 같은 입력(history 기본증가율, scenario_adjustments 의 CF_S, T-2 진료비 가중치)으로 직접 구성
+  -> 반올림된 레코드에서 역산하지 않고, 엔진이 레코드로 내보내지 않는 MEI 시나리오도 모두 포함
+
+사용 예:
+    cube = ARCube.build(base_by_rate, cf_by_scenario, exp_weights, r_values=np.linspace(0, 1, 201))
+    cube.query(base_rate='GDP', r=[0.1, 0.5])                  # long 형식 DataFrame
+    cube.values(r=np.linspace(0, 1, 500)).shape                # (기본, 시나리오, 500, 열)
+"""
+
+import numpy as np
+import pandas as pd
+
+from aggregation_matrix import AggregationMatrix
+
+TOTAL_COLUMN = '전체'
+DEFAULT_R_VALUES = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+# 엔진 AR 분석과 동일한 기본증가율 / r 격자 / 가중치 시차 (진료비 T-2)
+AR_BASE_RATES = ('GDP', 'MEI', 'Link')
+AR_R_VALUES = (1.0, 0.75, 0.5, 0.25, 0.15, 0.0)
+WEIGHT_LAG = 2
+
+
+def _select(labels, wanted):
+    """라벨 목록에서 위치 선택 (None 이면 전체)"""
+    if wanted is None:
+        return list(range(len(labels)))
+    if isinstance(wanted, str) or not hasattr(wanted, '__iter__'):
+        wanted = [wanted]
+    pos = {l: i for i, l in enumerate(labels)}
+    missing = [w for w in wanted if w not in pos]
+    if missing:
+        raise KeyError(f"Unknown labels: {missing}")
+    return [pos[w] for w in wanted]
+
+
+class ARCube:
+    """Base (기본증가율 x 열) + Dev (시나리오 x 열) 로 표현한 AR 시나리오 결과"""
+
+    def __init__(self, base_rates, mei_scenarios, r_values, columns, base, dev):
+        self.base_rates = list(base_rates)
+        self.mei_scenarios = list(mei_scenarios)
+        self.r_values = np.asarray(r_values, dtype=float)
+        self.columns = list(columns)
+        self.base = np.asarray(base, dtype=float)
+        self.dev = np.asarray(dev, dtype=float)
+
+    @classmethod
+    def build(cls, base_by_rate, cf_by_scenario, weights, r_values=DEFAULT_R_VALUES, group_mapping=None):
+        """base_by_rate: {기본증가율명: 종별 Series(%)}, cf_by_scenario: {시나리오명: 종별 Series(%)},
+        weights: 종별 진료비 Series, group_mapping: {그룹명: [종별, ...]} (그룹 열 추가)"""
+        types = list(weights.index)
+        w = weights.reindex(types).astype(float).fillna(0.0)
+        w = (w / w.sum()).to_numpy() if w.sum() else np.full(len(types), np.nan)
+
+        base = pd.DataFrame(base_by_rate).reindex(types).to_numpy(dtype=float).T
+        cf = pd.DataFrame(cf_by_scenario).reindex(types).to_numpy(dtype=float).T
+        cf_filled = np.where(np.isnan(cf), 0.0, cf)
+        dev = cf - (cf_filled @ w)[:, None]
+
+        groups = dict(group_mapping or {})
+        groups[TOTAL_COLUMN] = types
+        agg = AggregationMatrix(groups, types)
+        df_w = pd.DataFrame([weights.reindex(types).to_numpy(dtype=float)], columns=types)
+        base = np.concatenate([base, agg.aggregate(base.T[None], df_w, [0])[0].T], axis=1)
+        dev = np.concatenate([dev, agg.aggregate(dev.T[None], df_w, [0])[0].T], axis=1)
+        return cls(list(base_by_rate), list(cf_by_scenario), r_values, types + agg.groups, base, dev)
+
+    @classmethod
+    def from_analysis(cls, history, bulk_sgr, df_expenditure, year, model='S1', types=None, group_mapping=None,
+                      r_values=AR_R_VALUES, base_rates=AR_BASE_RATES):
+        """분석 결과 + 원시자료 진료비 -> 큐브 (엔진 AR 산식과 동일 입력, 결측 종별 값은 엔진처럼 0)
+        history[기본증가율][year][종별], bulk_sgr['scenario_adjustments'][year][시나리오][model][종별]"""
+        def _year(data):
+            data = data or {}
+            return data.get(year) or data.get(str(year)) or {}
+
+        types = list(types if types is not None else df_expenditure.columns)
+        base_by_rate = {b: pd.Series({t: _year(history.get(b)).get(t, 0) for t in types}, dtype=float)
+                        for b in base_rates if _year(history.get(b))}
+        adjustments = _year(bulk_sgr.get('scenario_adjustments'))
+        cf_by_scenario = {s: pd.Series({t: (v.get(model) or {}).get(t, 0) for t in types}, dtype=float)
+                          for s, v in adjustments.items() if isinstance(v, dict) and v.get(model)}
+        if not base_by_rate or not cf_by_scenario:
+            raise ValueError(f'{year}년 {model} AR 입력(기본증가율/시나리오 조정률)이 없습니다.')
+        weights = df_expenditure.loc[int(year) - WEIGHT_LAG].reindex(types).fillna(0)
+        return cls.build(base_by_rate, cf_by_scenario, weights, r_values, group_mapping)
+
+    @classmethod
+    def from_records(cls, records):
+        """기존 레코드 목록 [{'base_rate', 'mei_scenario', 'r', 'rates': {열: 값}}, ...] -> 큐브
+        (기본증가율, 시나리오)별 r 에 대한 최소제곱 직선으로 Base/Dev 복원 (r 이 2개 이상 필요)"""
+        if not records:
+            raise ValueError('AR records are empty')
+        df = pd.DataFrame([dict(r['rates'], base_rate=r['base_rate'], mei_scenario=r['mei_scenario'], r=r['r'])
+                           for r in records])
+        columns = [c for c in records[0]['rates']]
+        base_rates = list(dict.fromkeys(df['base_rate']))
+        scenarios = list(dict.fromkeys(df['mei_scenario']))
+        r_values = np.array(sorted(set(df['r'].astype(float))))
+        if len(r_values) < 2:
+            raise ValueError('At least two r values are required to rebuild the AR cube')
+
+        grouped = df.groupby(['base_rate', 'mei_scenario'], sort=False)
+        r_mean = grouped['r'].transform('mean')
+        y_mean = grouped[columns].transform('mean')
+        dr = (df['r'] - r_mean).to_numpy()[:, None]
+        slope_num = pd.DataFrame((df[columns] - y_mean).to_numpy() * dr, columns=columns)
+        keys = [df['base_rate'], df['mei_scenario']]
+        slope = slope_num.groupby(keys, sort=False).sum().div(
+            pd.Series(dr[:, 0] ** 2).groupby(keys, sort=False).sum(), axis=0)
+        intercept = grouped[columns].mean() - slope.mul(grouped['r'].mean(), axis=0)
+
+        # Dev 는 시나리오별, Base 는 기본증가율별로 동일 -> 평균으로 정리
+        dev = slope.groupby(level=1, sort=False).mean().reindex(scenarios)
+        base = intercept.groupby(level=0, sort=False).mean().reindex(base_rates)
+        return cls(base_rates, scenarios, r_values, columns, base.to_numpy(), dev.to_numpy())
+
+    # --- 조회 ---
+    def values(self, r=None, base_rate=None, mei_scenario=None, columns=None):
+        """(기본증가율, 시나리오, r, 열) 배열. r 은 저장된 격자 외 임의 값도 가능"""
+        r = self.r_values if r is None else np.atleast_1d(np.asarray(r, dtype=float))
+        b = _select(self.base_rates, base_rate)
+        s = _select(self.mei_scenarios, mei_scenario)
+        c = _select(self.columns, columns)
+        base = self.base[np.ix_(b, c)]
+        dev = self.dev[np.ix_(s, c)]
+        return base[:, None, None, :] + r[None, None, :, None] * dev[None, :, None, :]
+
+    def query(self, r=None, base_rate=None, mei_scenario=None, columns=None):
+        """조건에 맞는 조합을 long 형식 DataFrame 으로 (base_rate, mei_scenario, r, 열...)"""
+        r = self.r_values if r is None else np.atleast_1d(np.asarray(r, dtype=float))
+        b = [self.base_rates[i] for i in _select(self.base_rates, base_rate)]
+        s = [self.mei_scenarios[i] for i in _select(self.mei_scenarios, mei_scenario)]
+        cols = [self.columns[i] for i in _select(self.columns, columns)]
+        block = self.values(r, b, s, cols)
+        index = pd.MultiIndex.from_product([b, s, r], names=['base_rate', 'mei_scenario', 'r'])
+        return pd.DataFrame(block.reshape(-1, len(cols)), index=index, columns=cols).reset_index()
+
+    def rates(self, base_rate, mei_scenario, r):
+        """조합 1개의 열별 인상률 dict"""
+        row = self.values(r, base_rate, mei_scenario)[0, 0, 0]
+        return dict(zip(self.columns, row.tolist()))
+
+    def to_records(self, r=None):
+        """기존 ar_analysis 레코드 형식 (화면/엑셀 호환)"""
+        df = self.query(r)
+        rates = df[self.columns].to_numpy().tolist()
+        return [{'base_rate': b, 'mei_scenario': s, 'r': float(rv), 'rates': dict(zip(self.columns, vals))}
+                for b, s, rv, vals in zip(df['base_rate'], df['mei_scenario'], df['r'], rates)]
+
+    # --- 직렬화 ---
+    def to_dict(self):
+        return {
+            'base_rates': self.base_rates,
+            'mei_scenarios': self.mei_scenarios,
+            'r_values': self.r_values.tolist(),
+            'columns': self.columns,
+            'base': self.base.tolist(),
+            'dev': self.dev.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['base_rates'], d['mei_scenarios'], d['r_values'], d['columns'], d['base'], d['dev'])
+
+    @property
+    def nbytes(self):
+        return self.base.nbytes + self.dev.nbytes + self.r_values.nbytes
+
+    @property
+    def shape(self):
+        return (len(self.base_rates), len(self.mei_scenarios), len(self.r_values), len(self.columns))
@@ -0,0 +1,353 @@
+"""
+최종 환산지수 조정률 요인분해 (로그 분해, 벡터 연산)
+- 연도 x 종별 x MEI 시나리오 전체에 대해 최종 조정률(S1/S2)을 요인별 가산 기여도로 분해
+  요인: MEI / 인구 / GDP / 법과제도 / 환산지수(재평가) / UAF(진료비 실적 격차) / 상대가치
+- 산식 (엔진 SgrCalculator.calc_paf_s1 / calc_paf_s2 + PAF 상하한, report_runner.cf_index 와 동일)
+  S1: CF = MEI x (1 + UAF_S1)                  S2: CF = MEI x (1 + UAF_S2) - (RV - 1)
+  SGR_y = GDP 지수 x 인구 지수 x 법과제도 지수 x 환산지수 지수  (S2: GDP = 1 + 0.8 x (S1 GDP - 1), 인구 = 고령화 반영)
+  UAF_S1 = 0.75 x 단기 격차(T-2) + 0.33 x 누적 격차(T-11 ~ T-2, 분모 AE_{T-2} x (1 + SGR_{T-1}))
+  UAF_S2 = 0.5/0.3/0.2 x 격차(T-2/T-3/T-4),  최종 UAF = clip(UAF, -5%, +5%)
+  SGR/진료비 시트는 엔진 _safe_get 처럼 자료 범위 밖 연도를 첫/마지막 연도로 대체
+  (엔진 history 의 S2 는 상대가치 차감 전 값 = 조정률 - 상대가치 몫)
+- 분해 방법
+  1) ln(CF) = ln(MEI) + ln(1 + UAF) 를 조정률 r 에 로그 평균 가중으로 배분 -> MEI 몫 + UAF 몫 (합계 = r, 오차 없음)
+  2) UAF 는 SGR 지수에 대해 선형: UAF = sum_y a_y x (SGR_y - 1) + c  (a_y, c 는 진료비 실적으로 정해지는 계수)
+     (SGR_y - 1) 을 구성요소 로그 비중으로 나누어 인구/GDP/법과제도/환산지수 몫, c 는 UAF(진료비 실적) 몫
+     상하한에 걸린 경우 요인별 몫을 (상하한 UAF / 원 UAF) 비율로 축소
+  3) S2 의 상대가치 조정 -(RV - 1) 은 그대로 가산
+  모든 몫은 (요인, 연도, 종별, 시나리오) 배열 한 번의 계산으로 산출 -> 연도/시나리오 수와 무관하게 1회 추가 계산
+
+사용 예:
+    model = AttributionModel(processor.raw_data)
+    res = model.run(range(2020, 2028))
+    res.explain(2025, '상급종합', model='S1')        # 요인별 기여도(%p) Series
+    res.to_frame('S2', years=[2025])                 # long 형식 DataFrame
+    python attribution.py 2025 상급종합 --model S2 --scenario 평균
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from macro_link import MacroLinkModel, COST_TYPES, DATA_LAG, LABOR_SPAN, link_rates, mei_rates, scenario_stats
+from aggregation_matrix import AggregationMatrix
+
+MODELS = ('S1', 'S2')
+RATE_MODELS = ('S1', 'S2', 'Link')
+SGR_FACTORS = ['인구', 'GDP', '법과제도', '환산지수']
+FACTORS = ['MEI'] + SGR_FACTORS + ['UAF', '상대가치']
+RATE_COLUMN = '조정률(%)'
+
+S1_SHORT_WEIGHT = 0.75
+S1_ACCUM_WEIGHT = 0.33
+S1_ACCUM_SPAN = 10          # 누적 격차: T-11 ~ T-2
+S2_LAG_WEIGHTS = {2: 0.5, 3: 0.3, 4: 0.2}
+S2_GDP_SHARE = 0.8
+PAF_LIMIT = 0.05            # 최종 UAF(PAF) 상하한 +-5%
+GROUP_WEIGHT_LAG = 2        # 그룹 집계 가중치: T-2 진료비 (report_runner.group_cf_index 와 동일)
+EXCLUDED_COLUMNS = ('총계', '전체')
+# 엔진 SgrCalculator._safe_get 으로 읽는 시트: 자료 범위 밖 연도는 첫/마지막 연도 값 사용
+SAFE_GET_KEYS = ('df_expenditure', 'df_gdp', 'df_pop', 'df_sgr_law', 'df_sgr_reval')
+
+
+def _log_ratio(x):
+    """ln(1 + x) / x (x -> 0 극한 1). 로그 평균 가중에 사용"""
+    x = np.asarray(x, dtype=float)
+    small = np.abs(x) < 1e-12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(small, 1.0 - x / 2, np.log1p(x) / np.where(small, 1.0, x))
+
+
+def _safe_rows(index, years):
+    """엔진 _safe_get 과 같은 연도 대체: 자료 범위 밖 연도 -> 첫/마지막 연도"""
+    index = pd.Index(index)
+    if index.empty:
+        return [int(y) for y in years]
+    return [int(y) for y in np.clip(years, int(index.min()), int(index.max()))]
+
+
+class AttributionResult:
+    """모형별 조정률 (연도, 종별, 시나리오) + 기여도 (요인, 연도, 종별, 시나리오), 단위 %"""
+
+    def __init__(self, years, types, scenarios, rates, contributions, factors=FACTORS):
+        self.years = list(years)
+        self.types = list(types)
+        self.scenarios = list(scenarios)
+        self.factors = list(factors)
+        self.rates = rates                  # {모형: (Y, T, S)}
+        self.contributions = contributions  # {모형: (K, Y, T, S)}
+
+    @property
+    def models(self):
+        return list(self.rates)
+
+    def residual(self, model='S1'):
+        """조정률 - 기여도 합 최대 절댓값 (분해 검증용, 0 에 가까워야 함)"""
+        diff = self.rates[model] - self.contributions[model].sum(axis=0)
+        return float(np.nanmax(np.abs(diff))) if np.isfinite(diff).any() else float('nan')
+
+    def explain(self, year, type_name, model='S1', scenario='평균'):
+        """연도/종별/시나리오 1개 조합의 요인별 기여도 Series (마지막 행 = 최종 조정률)"""
+        y, t, s = self.years.index(year), self.types.index(type_name), self.scenarios.index(scenario)
+        values = list(self.contributions[model][:, y, t, s]) + [self.rates[model][y, t, s]]
+        return pd.Series(values, index=self.factors + [RATE_COLUMN], name=f'{year}_{type_name}_{model}_{scenario}')
+
+    def to_frame(self, model=None, years=None, scenarios=None):
+        """long 형식: 모형, 연도, 종별, 시나리오, 조정률(%), 요인별 기여도(%p)"""
+        models = [model] if model else self.models
+        y_pos = [self.years.index(y) for y in years] if years is not None else list(range(len(self.years)))
+        s_pos = [self.scenarios.index(s) for s in scenarios] if scenarios is not None else \
+            list(range(len(self.scenarios)))
+        frames = []
+        for m in models:
+            rate = self.rates[m][np.ix_(y_pos, range(len(self.types)), s_pos)]
+            contrib = self.contributions[m][:, y_pos][:, :, :, s_pos]
+            index = pd.MultiIndex.from_product([[m], [self.years[i] for i in y_pos], self.types,
+                                                [self.scenarios[i] for i in s_pos]],
+                                               names=['모형', '연도', '종별', '시나리오'])
+            df = pd.DataFrame(contrib.reshape(len(self.factors), -1).T, index=index, columns=self.factors)
+            df.insert(0, RATE_COLUMN, rate.ravel())
+            frames.append(df.reset_index())
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def by_group(self, groups, df_exp, lag=GROUP_WEIGHT_LAG):
+        """종별 기여도를 그룹(예: GROUP_MAPPING) 진료비 가중평균으로 집계 (가산성 유지) -> 새 AttributionResult"""
+        agg = AggregationMatrix(groups, self.types)
+        exp_years = [y - lag for y in self.years]
+        rates, contributions = {}, {}
+        for m in self.models:
+            rates[m] = agg.aggregate(self.rates[m], df_exp, exp_years)
+            block = np.moveaxis(self.contributions[m], 0, -1)        # (Y, T, S, K)
+            contributions[m] = np.moveaxis(agg.aggregate(block, df_exp, exp_years), -1, 0)
+        return AttributionResult(self.years, agg.groups, self.scenarios, rates, contributions, self.factors)
+
+
+class RateKernel:
+    """목표연도 계산에 필요한 입력 시트를 공통 연도 범위 배열로 추출 + 배열 -> UAF/MEI/조정률
+
+    모든 계산은 앞쪽 배치 축을 허용 (입력 배열이 (..., 연도, 열) 이면 결과도 (..., ...)) -> 입력 교란 묶음을
+    시나리오 축처럼 쌓아 한 번에 계산 (sensitivity.py)
+    연도 범위: min(T) - 13 ~ max(T) - 1 (S1 누적 격차 T-11 의 전년 SGR 까지)
+    rows[키] 는 배열 행별 원자료 연도 (범위 밖 대체로 중복 가능), row_source[키] 는 같은 원자료 행의 첫 위치
+    """
+
+    def __init__(self, raw_data, target_years, types=None):
+        self.types = list(types) if types is not None else \
+            [t for t in raw_data['df_weights'].index if t not in EXCLUDED_COLUMNS]
+        self.target = np.asarray(list(target_years))
+        self.years = np.arange(self.target.min() - S1_ACCUM_SPAN - 3, self.target.max())
+        macro = MacroLinkModel(raw_data['df_raw_mei_inf'], raw_data['df_weights'].reindex(self.types),
+                               raw_data['df_gdp'], raw_data['df_rel_value'])
+        self.scenarios = macro.columns
+        self.price_cols = (macro.I_cols, macro.M_cols, macro.Z_cols)
+        # raw_data 키 -> 추출 열 (연도 x 열 배열), df_weights 는 (종별 x 비용유형)
+        self.columns = {
+            'df_expenditure': self.types,
+            'df_gdp': ['실질GDP', '영안인구'],
+            'df_pop': ['건보대상자수', '건보_고령화반영후(대상자수)'],
+            'df_sgr_law': self.types,
+            'df_sgr_reval': self.types,
+            'df_rel_value': self.types,
+            'df_raw_mei_inf': [c for cols in self.price_cols for c in cols],
+            'df_weights': list(COST_TYPES),
+        }
+        self.rows = {}
+        for k in self.columns:
+            if k == 'df_weights':
+                self.rows[k] = self.types
+            elif k in SAFE_GET_KEYS:
+                self.rows[k] = _safe_rows(raw_data[k].index, self.years)
+            else:
+                self.rows[k] = [int(y) for y in self.years]
+        self.row_source = {}
+        for k, rows in self.rows.items():
+            first = {}
+            self.row_source[k] = np.array([first.setdefault(r, i) for i, r in enumerate(rows)])
+        self.base = {k: raw_data[k].reindex(index=self.rows[k], columns=cols).to_numpy(dtype=float)
+                     for k, cols in self.columns.items()}
+        self.rv_rows = np.isin(self.years, raw_data['df_rel_value'].index)
+
+    def _pos(self, years):
+        return np.asarray(years) - self.years[0]
+
+    def _at(self, arr, lag):
+        """(..., 연도, 종별) 배열에서 T - lag 행 -> (..., T, 종별)"""
+        return arr[..., self._pos(self.target - lag), :]
+
+    def sgr_factors(self, x, model='S1'):
+        """SGR 구성요소 지수 (..., 요인, y, 종별), y = years[1:] - 요인 순서 SGR_FACTORS"""
+        gdp, pop = x['df_gdp'], x['df_pop']
+        per_capita = gdp[..., 0] / gdp[..., 1]
+        gdp_idx = per_capita[..., 1:] / per_capita[..., :-1]
+        if model == 'S1':
+            pop_idx = pop[..., 1:, 0] / pop[..., :-1, 0]
+        else:
+            gdp_idx = 1 + (gdp_idx - 1) * S2_GDP_SHARE
+            pop_idx = pop[..., 1:, 1] / pop[..., :-1, 0]
+        law = x['df_sgr_law'][..., 1:, :]
+        reval = x['df_sgr_reval'][..., 1:, :] / x['df_sgr_reval'][..., :-1, :]
+        return np.stack(np.broadcast_arrays(pop_idx[..., None], gdp_idx[..., None], law, reval), axis=-3)
+
+    def uaf_coefficients(self, x, sgr, model='S1'):
+        """UAF = sum_y a[T, y] x (SGR_y - 1) + c[T] 의 (a (..., T, y, 종별), c (..., T, 종별))
+
+        엔진 calc_paf_s1 / calc_paf_s2 와 같은 산식 (상하한 적용 전), 결측은 엔진처럼 NaN 으로 전파
+        S1 누적 격차 분모 AE_{T-2} x (1 + SGR_{T-1}) 는 계수로 고정
+        """
+        calc = self.years[1:]
+        ae, ae_prev = x['df_expenditure'][..., 1:, :], x['df_expenditure'][..., :-1, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = ae_prev / ae                                              # (..., y, 종별) AE_{y-1} / AE_y
+        offset = (calc[None, :] - self.target[:, None])[..., None]           # (T, y, 1)
+
+        def at(arr, lag):
+            return arr[..., self._pos(self.target - lag) - 1, :]
+
+        if model == 'S1':
+            window = (offset >= -1 - S1_ACCUM_SPAN) & (offset <= -2)
+            denom = at(ae, 2) * (1 + at(np.prod(sgr, axis=-3), 1))            # AE_{T-2} x (1 + SGR_{T-1})
+            sum_prev = np.where(window, ae_prev[..., None, :, :], 0.0).sum(axis=-2)
+            sum_ae = np.where(window, ae[..., None, :, :], 0.0).sum(axis=-2)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                a = S1_SHORT_WEIGHT * np.where(offset == -2, ratio[..., None, :, :], 0.0) + \
+                    S1_ACCUM_WEIGHT * np.where(window, ae_prev[..., None, :, :], 0.0) / denom[..., :, None, :]
+                c = S1_SHORT_WEIGHT * (at(ratio, 2) - 1) + S1_ACCUM_WEIGHT * (sum_prev - sum_ae) / denom
+        else:
+            a, c = 0.0, 0.0
+            for lag, w in S2_LAG_WEIGHTS.items():
+                a = a + w * np.where(offset == -lag, ratio[..., None, :, :], 0.0)
+                c = c + w * (at(ratio, lag) - 1)
+        return np.where(np.isfinite(a), a, 0.0), c
+
+    def uaf_parts(self, x, model='S1', clamp=True):
+        """UAF 요인별 몫 (..., 인구/GDP/법과제도/환산지수/진료비 실적, T, 종별), 합계 = UAF (소수)
+
+        clamp: 엔진 PAF 상하한(+-PAF_LIMIT) 적용 - 걸린 경우 몫을 같은 비율로 축소
+        """
+        sgr = self.sgr_factors(x, model)
+        a, c = self.uaf_coefficients(x, sgr, model)
+        g_minus_1 = np.prod(sgr, axis=-3) - 1
+        # (SGR_y - 1) x ln f_k / ln SGR_y = ln f_k / L(SGR_y - 1), 자료 없는 연도는 계수 a 가 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.log(sgr) / _log_ratio(g_minus_1)[..., None, :, :]   # (..., K, y, 종별)
+        share = np.where(np.isfinite(share), share, 0.0)
+        parts = np.einsum('...tyn,...kyn->...ktn', a, share)
+        nan = np.where(np.isnan(c), np.nan, 0.0)[..., None, :, :]
+        parts = np.concatenate([parts, c[..., None, :, :]], axis=-3) + nan
+        if not clamp:
+            return parts
+        raw = parts.sum(axis=-3)
+        paf = np.clip(raw, -PAF_LIMIT, PAF_LIMIT)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = np.where(paf == raw, 1.0, paf / raw)
+        return parts * scale[..., None, :, :]
+
+    def paf(self, x, model='S1', clamp=True):
+        """엔진 calc_paf_s1 / calc_paf_s2 (+ 상하한) 와 같은 최종 UAF (..., T, 종별), 소수"""
+        return self.uaf_parts(x, model, clamp).sum(axis=-3)
+
+    def mei_growth(self, x):
+        """MEI 증가율 (..., T, 종별, 시나리오+통계) - macro_link.MacroLinkModel.inputs 와 같은 산식"""
+        prices = x['df_raw_mei_inf']
+        n_i, n_m = len(self.price_cols[0]), len(self.price_cols[1])
+        dy = self._pos(self.target - DATA_LAG)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            labor = (prices[..., dy, :n_i] / prices[..., dy - LABOR_SPAN, :n_i]) ** (1 / LABOR_SPAN) - 1
+            growth = prices[..., dy, n_i:] / prices[..., dy - 1, n_i:] - 1
+        mei = mei_rates(labor, growth[..., :n_m], growth[..., n_m:], x['df_weights'])
+        return np.concatenate([mei, scenario_stats(mei)], axis=-1)
+
+    def rv_index(self, x):
+        """T-1 상대가치 변화지수 (..., T, 종별), 결측 1.0 (report_runner.rv_idx 와 동일)"""
+        rv = self._at(x['df_rel_value'], 1)
+        return np.where(np.isnan(rv), 1.0, rv)
+
+    def link_cf(self, x):
+        """거시지표 연계 조정률(%) (..., T, 종별, 시나리오) - macro_link.MacroLinkModel.cf 와 같은 산식"""
+        gdp = x['df_gdp'][..., 0]
+        dy = self._pos(self.target - DATA_LAG)
+        rv = np.where(self.rv_rows[dy][:, None], self._at(x['df_rel_value'], DATA_LAG) - 1, 0.0)
+        return (link_rates(self.mei_growth(x), gdp[..., dy] / gdp[..., dy - 1] - 1) - rv[..., None]) * 100
+
+    def decompose(self, x, model='S1', mei=None):
+        """(조정률 (..., T, 종별, 시나리오), 기여도 (..., 요인, T, 종별, 시나리오)), 단위 %"""
+        mei = 1 + self.mei_growth(x) if mei is None else mei
+        parts = self.uaf_parts(x, model)[..., None]                        # (..., 5, T, n, 1)
+        uaf = parts.sum(axis=-4)                                           # (..., T, n, 1)
+        r = mei * (1 + uaf) - 1                                            # (..., T, n, S)
+        scale = 1 / _log_ratio(r)                                          # r / ln(1 + r)
+        mei_part = np.log(mei) * scale
+        sgr_parts = parts * (_log_ratio(uaf) * scale)[..., None, :, :, :]  # UAF 몫 = ln(1+UAF) x r / ln(1+r)
+        rv_part = np.zeros_like(r)
+        if model == 'S2':
+            rv_part = np.broadcast_to(-(self.rv_index(x) - 1)[..., None], r.shape)
+            r = r + rv_part
+        contrib = np.concatenate([mei_part[..., None, :, :, :], sgr_parts, rv_part[..., None, :, :, :]], axis=-4)
+        return r * 100, contrib * 100
+
+    def rates(self, x, models=RATE_MODELS):
+        """모형별 최종 조정률(%) {모형: (..., T, 종별, 시나리오)} - 'Link' 는 거시지표 연계 모형"""
+        mei = 1 + self.mei_growth(x)
+        return {m: self.link_cf(x) if m == 'Link' else self.decompose(x, m, mei)[0] for m in models}
+
+
+class AttributionModel:
+    """raw_data -> SGR 구성요소 / UAF 계수 / MEI 블록 -> 요인분해"""
+
+    def __init__(self, raw_data, types=None):
+        self.data = raw_data
+        self.types = list(types) if types is not None else \
+            [t for t in raw_data['df_weights'].index if t not in EXCLUDED_COLUMNS]
+
+    def kernel(self, target_years):
+        return RateKernel(self.data, target_years, self.types)
+
+    def uaf_parts(self, target_years, model='S1', clamp=True):
+        """UAF 요인별 몫 (인구, GDP, 법과제도, 환산지수, 진료비 실적) x (연도, 종별), 합계 = UAF (소수)"""
+        k = self.kernel(target_years)
+        return k.uaf_parts(k.base, model, clamp)
+
+    def mei_index(self, target_years):
+        """MEI 지수 (연도, 종별, 시나리오+통계) - macro_link.MacroLinkModel 과 같은 MEI 블록 (1 + 증가율)"""
+        k = self.kernel(target_years)
+        return 1 + k.mei_growth(k.base), k.scenarios
+
+    def run(self, target_years, models=MODELS, mei=None, scenarios=None):
+        """mei: 엔진 MEI 지수 블록 (연도, 종별, 시나리오) 을 직접 넘기면 그 값을 사용 (scenarios 와 함께)"""
+        target = list(target_years)
+        k = self.kernel(target)
+        if mei is None:
+            scenarios = k.scenarios
+        else:
+            mei = np.asarray(mei, dtype=float)
+            scenarios = list(scenarios) if scenarios is not None else [str(i) for i in range(mei.shape[-1])]
+        rates, contributions = {}, {}
+        for model in models:
+            rates[model], contributions[model] = k.decompose(k.base, model, mei)
+        return AttributionResult(target, self.types, scenarios, rates, contributions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='최종 조정률 요인분해')
+    parser.add_argument('year', type=int)
+    parser.add_argument('type_name', nargs='?', default=None, help='종별 (생략 시 전 종별)')
+    parser.add_argument('--model', default='S1', choices=MODELS)
+    parser.add_argument('--scenario', default='평균')
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    args = parser.parse_args(argv)
+
+    from 파이썬용_sgr_2027 import DataProcessor
+    processor = DataProcessor(args.data)
+    res = AttributionModel(processor.raw_data).run([args.year], models=[args.model])
+    print(f"=== [{args.year}년 {args.model} 최종 조정률 요인분해 (시나리오: {args.scenario}, 단위 %p)] ===")
+    if args.type_name:
+        print(res.explain(args.year, args.type_name, args.model, args.scenario).round(4).to_string())
+    else:
+        df = res.to_frame(args.model, scenarios=[args.scenario])
+        print(df.drop(columns=['모형', '연도', '시나리오']).set_index('종별').round(4).to_string())
+    print(f"[INFO] 분해 오차 (최대): {res.residual(args.model):.2e}")
+
+
+if __name__ == "__main__":
+    main()
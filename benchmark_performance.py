@@ -1,24 +1,453 @@
-import time
-import sys
+"""
+SGR 엔진 단계별 성능 벤치마크
+- 워크북 로드부터 JSON 직렬화까지 단계별로 warm-up 후 반복 측정, 백분위(p50/p90/p99) 리포트
+- 결과를 JSON 기준선(baseline)으로 저장하고, 비교 모드에서 임계치 이상 느려진 단계가 있으면 실패(exit 1)
+- --scaling: 합성 데이터셋(synthetic_data.py)의 크기별로 전체 파이프라인 시간 / 최대 메모리 측정
+
+사용 예:
+    python benchmark_performance.py --save bench_baseline.json
+    python benchmark_performance.py --compare bench_baseline.json --threshold 0.2
+    python benchmark_performance.py --scaling --save bench_scaling.json
+    python benchmark_performance.py --profile profile   (profile.json + profile.folded)
+    python benchmark_performance.py --profile profile --memory   (단계별 peak/retained 메모리 포함)
+"""
+
+import argparse
+import json
 import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
 
-# Import the logic from the main script
-# Since the script is large, I'll just copy the necessary parts or import if possible.
-# For simplicity, I'll try to import.
 sys.path.append(os.getcwd())
-from 파이썬용_sgr_2027 import DataProcessor, CalculationEngine
+from 파이썬용_sgr_2027 import (DataProcessor, CalculationEngine, SgrCalculator, MeiCalculator,
+                          FinalRateCalculator, sanitize_data)
+from ai_optimizer import BudgetFunctionSimulator, ConstraintOptimizer
+import synthetic_data
+from macro_link import MacroLinkModel
+from aggregation_matrix import AggregationMatrix
+from budget_solver import constrained_grid
+from sensitivity import jacobian
+from replay import counterfactual_replay, DEFAULT_START as DEFAULT_REPLAY_START
+from driver_projection import project_drivers
+from engine_profiler import profile_analysis, result_sizes
+
+PERCENTILES = (50, 90, 99)
+
+# 확장성 측정용 데이터 크기 (종별 수, 연도 범위, 물가지수 변형 개수)
+SCALING_SIZES = [
+    {'label': 'x1', 'types': None, 'start': None, 'end': None, 'variants': None},
+    {'label': 'types x2', 'types': 20, 'start': None, 'end': None, 'variants': None},
+    {'label': 'types x4', 'types': 40, 'start': None, 'end': None, 'variants': None},
+    {'label': 'years x2', 'types': None, 'start': 1991, 'end': None, 'variants': None},
+    {'label': 'variants x4', 'types': None, 'start': None, 'end': None, 'variants': (6, 4, 4)},
+    {'label': 'all x4', 'types': 40, 'start': 1953, 'end': None, 'variants': (6, 4, 4)},
+]
+
+# 이름 -> setup(ctx) 함수. setup 은 측정 대상 callable 을 반환 (준비 작업은 측정에서 제외)
+BENCHMARKS = {}
+
+
+def benchmark(name, warmup=None, repeat=None):
+    def register(setup_fn):
+        BENCHMARKS[name] = {'setup': setup_fn, 'warmup': warmup, 'repeat': repeat}
+        return setup_fn
+    return register
+
+
+class BenchContext:
+    """단계 간 공유되는 로드 데이터 / 중간 결과 (지연 생성)"""
+
+    def __init__(self, data_file, target_year):
+        self.data_file = data_file
+        self.target_year = target_year
+        self._cache = {}
+
+    def _get(self, key, factory):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    @property
+    def processor(self):
+        return self._get('processor', lambda: DataProcessor(self.data_file))
+
+    @property
+    def data(self):
+        return self.processor.data
+
+    @property
+    def hospital_types(self):
+        return self.processor.HOSPITAL_TYPES
+
+    @property
+    def group_mapping(self):
+        return self.processor.GROUP_MAPPING
+
+    @property
+    def mei_index(self):
+        return self._get('mei_index', lambda: MeiCalculator(self.data, self.hospital_types).calc_mei_index_by_year(self.target_year))
+
+    @property
+    def sgr_components(self):
+        return self._get('sgr_components', lambda: SgrCalculator(self.data, self.hospital_types)._calc_sgr_components(self.target_year - 2))
+
+    @property
+    def analysis(self):
+        return self._get('analysis', lambda: CalculationEngine(self.processor.raw_data).run_full_analysis(target_year=self.target_year))
+
+    @property
+    def simulator(self):
+        return self._get('simulator', lambda: BudgetFunctionSimulator(data_frames=self.processor.raw_data))
+
+    @property
+    def optimal_params(self):
+        return self._get('optimal_params', lambda: self.simulator.find_optimal_parameters()[0])
+
+
+# ----------------------------------------------------------------------
+# 단계별 벤치마크 정의
+# ----------------------------------------------------------------------
+@benchmark('load_workbook', warmup=1, repeat=5)
+def bench_load(ctx):
+    return lambda: DataProcessor(ctx.data_file)
+
+
+@benchmark('calc_mei_index_by_year')
+def bench_mei(ctx):
+    data, types, year = ctx.data, ctx.hospital_types, ctx.target_year
+    # 계산기 내부 캐시 영향을 없애기 위해 매 회 새로 생성
+    return lambda: MeiCalculator(data, types).calc_mei_index_by_year(year)
+
+
+@benchmark('_calc_sgr_components')
+def bench_sgr_components(ctx):
+    data, types, year = ctx.data, ctx.hospital_types, ctx.target_year
+    return lambda: SgrCalculator(data, types)._calc_sgr_components(year - 2)
+
+
+@benchmark('calc_paf_s1')
+def bench_paf_s1(ctx):
+    data, types, year = ctx.data, ctx.hospital_types, ctx.target_year
+    return lambda: SgrCalculator(data, types).calc_paf_s1(year)
+
+
+@benchmark('calc_paf_s2')
+def bench_paf_s2(ctx):
+    data, types, year = ctx.data, ctx.hospital_types, ctx.target_year
+    return lambda: SgrCalculator(data, types).calc_paf_s2(year)
+
+
+@benchmark('_group_and_weight_average')
+def bench_group_average(ctx):
+    final_calc = FinalRateCalculator(ctx.data, ctx.group_mapping)
+    df_mei, year = ctx.mei_index, ctx.target_year
+    return lambda: final_calc._group_and_weight_average(df_mei, year)
+
+
+@benchmark('macro_link')
+def bench_macro_link(ctx):
+    final_calc = FinalRateCalculator(ctx.data, ctx.group_mapping)
+    df_mei, comp, year = ctx.mei_index, ctx.sgr_components, ctx.target_year
+    return lambda: final_calc.calc_macro_final_rate(df_mei, comp, year)
+
+
+@benchmark('group_matrix')
+def bench_group_matrix(ctx):
+    # _group_and_weight_average 대응: 그룹 x 종별 가중치 행렬로 MEI 지수 전 시나리오 집계
+    df_mei, year = ctx.mei_index, ctx.target_year
+    df_exp = ctx.processor.raw_data['df_expenditure']
+    agg = AggregationMatrix(ctx.group_mapping, list(df_mei.index))
+    weight_year = year - 2 if year - 2 in df_exp.index else df_exp.index.max()
+    return lambda: agg.aggregate_frame(df_mei, df_exp, weight_year)
+
+
+@benchmark('macro_link_sweep')
+def bench_macro_link_sweep(ctx):
+    # 거시지표 연계 모형 2020-2027 x 계수 100개 (브로드캐스트 1회)
+    raw = ctx.processor.raw_data
+    model = MacroLinkModel(raw['df_raw_mei_inf'], raw['df_weights'], raw['df_gdp'], raw['df_rel_value'])
+    years = model.valid_years(range(2020, 2028))
+    coefs = np.linspace(0, 1, 100)
+    return lambda: model.cf(years, coef=coefs)
+
+
+@benchmark('budget_envelopes')
+def bench_budget_envelopes(ctx):
+    # 추가소요재정 제약: 전 모형/시나리오 x 목표 재정 101개 동시 해법
+    year = ctx.target_year
+    budget_year = (ctx.analysis[2].get('budget_analysis') or {}).get(year)
+    envelopes = np.linspace(10000, 20000, 101)
+    return lambda: constrained_grid(budget_year, envelopes)
+
+
+@benchmark('sensitivity_jacobian', warmup=1, repeat=5)
+def bench_sensitivity_jacobian(ctx):
+    # 목표연도 S1/S2/Link 조정률의 전 입력 셀 Jacobian (배치 중앙차분)
+    raw_data, year = ctx.processor.raw_data, ctx.target_year
+    return lambda: jacobian(raw_data, year)
+
+
+@benchmark('counterfactual_replay', warmup=1, repeat=5)
+def bench_counterfactual_replay(ctx):
+    # 2014 ~ 목표연도 S1/S2/Link x 전 MEI 시나리오 재귀 재현
+    raw_data, year = ctx.processor.raw_data, ctx.target_year
+    return lambda: counterfactual_replay(raw_data, DEFAULT_REPLAY_START, year)
+
+
+@benchmark('driver_projection')
+def bench_driver_projection(ctx):
+    # 동인 시트 전 계열 AR(1) 적합 + 2035년까지 전망 (1회 행렬 연산)
+    raw_data = ctx.processor.raw_data
+    return lambda: project_drivers(raw_data, horizon=2035)
+
+
+@benchmark('run_full_analysis', warmup=1, repeat=5)
+def bench_full_analysis(ctx):
+    # AR 분석 / 추가소요재정 제약(budget_constraints)은 run_full_analysis 내부 단계로 함께 측정됨
+    raw_data, year = ctx.processor.raw_data, ctx.target_year
+    return lambda: CalculationEngine(raw_data).run_full_analysis(target_year=year)
+
+
+@benchmark('find_optimal_parameters')
+def bench_find_optimal(ctx):
+    sim = ctx.simulator
+    return lambda: sim.find_optimal_parameters()
+
+
+@benchmark('ConstraintOptimizer.optimize')
+def bench_constraint_optimizer(ctx):
+    optimizer = ConstraintOptimizer(ctx.simulator)
+    params = ctx.optimal_params
+    k, j = int(params['k']), int(params['j'])
+    history = ctx.analysis[0]
+    s2 = history['S2'].get(ctx.target_year, {})
+    sgr_results = {'병원(계)': s2.get('병원(계)', 2.0), '의원': s2.get('의원(계)', 2.0),
+                   '치과(계)': s2.get('치과(계)', 2.0), '한방(계)': s2.get('한방(계)', 2.0),
+                   '약국': s2.get('약국(계)', 2.0)}
+    year = ctx.target_year
+    return lambda: optimizer.optimize(year, sgr_results, k, j)
+
+
+@benchmark('json_serialization')
+def bench_json(ctx):
+    history, components, bulk_sgr = ctx.analysis
+    payload = {'history': history, 'components': components, 'bulk_sgr': bulk_sgr}
+    return lambda: json.dumps(sanitize_data(payload), ensure_ascii=False)
+
+
+# ----------------------------------------------------------------------
+# 실행 / 리포트 / 비교
+# ----------------------------------------------------------------------
+def run_benchmark(fn, warmup, repeat):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    arr = np.array(samples) * 1000.0
+    stats = {f'p{p}': float(np.percentile(arr, p)) for p in PERCENTILES}
+    stats.update({'mean': float(arr.mean()), 'min': float(arr.min()), 'max': float(arr.max()),
+                  'runs': repeat, 'unit': 'ms'})
+    return stats
+
+
+def run_suite(data_file='SGR_data.xlsx', target_year=2025, warmup=2, repeat=20, only=None):
+    ctx = BenchContext(data_file, target_year)
+    results = {}
+    for name, spec in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        try:
+            fn = spec['setup'](ctx)
+            results[name] = run_benchmark(fn, spec['warmup'] if spec['warmup'] is not None else warmup,
+                                          spec['repeat'] if spec['repeat'] is not None else repeat)
+        except Exception as e:
+            print(f"[WARN] Benchmark '{name}' failed: {e}")
+            results[name] = {'error': str(e)}
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'data_file': data_file,
+            'target_year': target_year,
+        },
+        'results': results,
+    }
+
+
+def _measure(fn):
+    """(결과, 경과 ms, tracemalloc 최대 할당 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def run_scaling(sizes=None, template_file='SGR_data.xlsx', target_year=2025, repeat=3):
+    """크기별 합성 워크북 생성 -> 로드 + run_full_analysis 시간(최소값)과 최대 메모리 측정
+
+    엔진의 종별 목록(HOSPITAL_TYPES)은 고정이므로 종별 축은 로드/원시자료 크기 영향만 반영됨
+    """
+    template = synthetic_data.load_template(template_file)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes or SCALING_SIZES:
+            label = size['label']
+            try:
+                sheets = synthetic_data.generate_sheets(size['types'], size['start'], size['end'],
+                                                        size['variants'], template=template)
+                path = synthetic_data.write_workbook(sheets, os.path.join(tmp, 'scaled.xlsx'))
+                row = {'size': synthetic_data.dataset_size(sheets)}
+                load_ms, analysis_ms, load_mb, analysis_mb = [], [], 0.0, 0.0
+                for _ in range(repeat):
+                    proc, ms, mb = _measure(lambda: DataProcessor(path))
+                    load_ms.append(ms)
+                    load_mb = max(load_mb, mb)
+                    _, ms, mb = _measure(lambda: CalculationEngine(proc.raw_data).run_full_analysis(target_year=target_year))
+                    analysis_ms.append(ms)
+                    analysis_mb = max(analysis_mb, mb)
+                row.update({'load_ms': min(load_ms), 'load_peak_mb': load_mb,
+                            'analysis_ms': min(analysis_ms), 'analysis_peak_mb': analysis_mb})
+            except Exception as e:
+                print(f"[WARN] Scaling run '{label}' failed: {e}")
+                row = {'error': str(e)}
+            results[label] = row
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'template': template_file,
+            'target_year': target_year,
+            'mode': 'scaling',
+        },
+        'scaling': results,
+    }
+
+
+def print_scaling_report(report):
+    print(f"\n{'size':<14}{'types':>6}{'years':>6}{'MEI':>5}{'cells':>8}"
+          f"{'load ms':>10}{'load MB':>9}{'calc ms':>10}{'calc MB':>9}")
+    print('-' * 77)
+    for label, r in report['scaling'].items():
+        if 'error' in r:
+            print(f"{label:<14}  ERROR: {r['error']}")
+            continue
+        z = r['size']
+        print(f"{label:<14}{z['types']:>6}{z['years']:>6}{z['mei_scenarios']:>5}{z['cells']:>8}"
+              f"{r['load_ms']:>10.1f}{r['load_peak_mb']:>9.1f}{r['analysis_ms']:>10.1f}{r['analysis_peak_mb']:>9.1f}")
+
+
+def print_report(report):
+    print(f"\n{'stage':<32}{'p50':>10}{'p90':>10}{'p99':>10}{'mean':>10}{'runs':>6}  (ms)")
+    print('-' * 80)
+    for name, s in report['results'].items():
+        if 'error' in s:
+            print(f"{name:<32}  ERROR: {s['error']}")
+            continue
+        print(f"{name:<32}{s['p50']:>10.2f}{s['p90']:>10.2f}{s['p99']:>10.2f}{s['mean']:>10.2f}{s['runs']:>6}")
+
+
+def compare_reports(current, baseline, threshold=0.2, metric='p50', only=None):
+    """기준선 대비 metric 이 (1 + threshold) 배를 넘은 단계 목록 반환.
+    기준선에 있는데 이번 실행에서 빠졌거나 오류가 난 단계도 실패(비율 inf)로 포함
+    only: run_suite 에 준 단계 선택 (선택하지 않은 기준선 단계는 비교 제외)"""
+    regressions = []
+    current_results = current.get('results', {})
+    print(f"\n{'stage':<32}{'baseline':>12}{'current':>12}{'change':>10}")
+    print('-' * 66)
+    for name, base in baseline.get('results', {}).items():
+        if not base or 'error' in base or (only and name not in only):
+            continue
+        cur = current_results.get(name)
+        if cur is None or 'error' in cur:
+            status = 'MISSING' if cur is None else f"ERROR: {cur['error']}"
+            print(f"{name:<32}{base[metric]:>12.2f}  {status}  <-- FAILED")
+            regressions.append((name, float('inf')))
+            continue
+        ratio = cur[metric] / base[metric] if base[metric] > 0 else 1.0
+        flag = '  <-- REGRESSION' if ratio > 1 + threshold else ''
+        print(f"{name:<32}{base[metric]:>12.2f}{cur[metric]:>12.2f}{(ratio - 1) * 100:>9.1f}%{flag}")
+        if flag:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SGR 엔진 단계별 벤치마크')
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    parser.add_argument('--year', type=int, default=2025)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--only', nargs='*', help='실행할 단계 이름')
+    parser.add_argument('--save', help='결과를 JSON 기준선으로 저장')
+    parser.add_argument('--compare', help='비교할 JSON 기준선 경로')
+    parser.add_argument('--threshold', type=float, default=0.2, help='허용 성능 저하 비율 (0.2 = 20%%)')
+    parser.add_argument('--metric', default='p50', choices=[f'p{p}' for p in PERCENTILES] + ['mean', 'min'])
+    parser.add_argument('--scaling', action='store_true', help='합성 데이터 크기별 시간/메모리 측정')
+    parser.add_argument('--profile', metavar='PREFIX', help='run_full_analysis 호출 트리 프로파일 저장')
+    parser.add_argument('--memory', action='store_true', help='--profile 시 단계별 메모리 할당 추적')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        prof, result = profile_analysis(DataProcessor(args.data).raw_data, args.year, track_memory=args.memory)
+        extra = {'result_bytes': result_sizes(result)} if args.memory else None
+        with open(f"{args.profile}.json", 'w', encoding='utf-8') as f:
+            f.write(prof.to_json(extra=extra))
+        prof.save(collapsed_path=f"{args.profile}.folded")
+        for name, t in list(prof.totals().items())[:15]:
+            print(f"{name:<48}{t['calls']:>6}{t['self_ms']:>12.2f}{t['cumulative_ms']:>12.2f}")
+        if args.memory:
+            print(f"\n{'stage':<48}{'peak MB':>10}{'retained MB':>14}")
+            for name, m in list(prof.memory().items())[:15]:
+                print(f"{name:<48}{m['peak_bytes'] / 2**20:>10.2f}{m['retained_bytes'] / 2**20:>14.2f}")
+            print(f"\n{'result part':<48}{'MB':>10}")
+            for name, b in extra['result_bytes'].items():
+                print(f"{name:<48}{b / 2**20:>10.2f}")
+        print(f"\n[INFO] Profile saved: {args.profile}.json, {args.profile}.folded")
+        return 0
+
+    if args.scaling:
+        report = run_scaling(template_file=args.data, target_year=args.year, repeat=max(1, min(args.repeat, 3)))
+        print_scaling_report(report)
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"\n[INFO] Scaling report saved: {args.save}")
+        return 0
+
+    report = run_suite(args.data, args.year, args.warmup, args.repeat, args.only)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n[INFO] Baseline saved: {args.save}")
 
-def benchmark():
-    print("Loading data...")
-    start_load = time.time()
-    processor = DataProcessor('SGR_data.xlsx')
-    print(f"Data loading took: {time.time() - start_load:.2f}s")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.threshold, args.metric, args.only)
+        if regressions:
+            print(f"\n[ERROR] {len(regressions)} stage(s) regressed beyond {args.threshold:.0%} or failed to run")
+            return 1
+        print("\n[SUCCESS] No regressions.")
+    return 0
 
-    print("Running full analysis...")
-    start_calc = time.time()
-    engine = CalculationEngine(processor.raw_data)
-    history, components, bulk_sgr = engine.run_full_analysis(target_year=2025)
-    print(f"Full analysis took: {time.time() - start_calc:.2f}s")
 
 if __name__ == "__main__":
-    benchmark()
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+추가소요재정 제약 시나리오 일괄 해법 (scale factor 동시 계산)
+- 시나리오별 인상률 벡터 x 배율 k 로 조정했을 때 추가소요재정 합계가 목표 재정(envelope)과 같아지는 k 를
+  모든 (목표 재정 x 시나리오) 조합에 대해 배열 단위로 동시에 계산
+- 해법: 구간 [lower, upper] 에서 뉴턴 스텝(수치 기울기)을 시도하고 구간을 벗어나면 이분법으로 대체 (safeguarded Newton)
+  인상률 상/하한(rate_bounds)이 있으면 식이 구간별 선형이 되어도 그대로 수렴
+- 엔진 budget_analysis 결과(종별 인상률/소요재정)에서 종별 기준 금액을 역산하여
+  임의 목표 재정 격자에 대한 제약 결과를 계산 (deep_scale / scale_factor 경로와 같은 배율 구조)
+
+사용 예:
+    res = solve_scale_factors(rates, base_amounts, envelopes=[12000, 13480, 15000])
+    res['k'].shape                                        # (목표 재정 수, 시나리오 수)
+    grid = constrained_grid(bulk_sgr['budget_analysis'][2025], envelopes=np.linspace(1e4, 2e4, 101))
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOL = 1e-10
+DEFAULT_MAX_ITER = 100
+MAX_BRACKET_DOUBLINGS = 60
+
+# 엔진 GROUP_MAPPING 과 같은 그룹 (종별 -> '(계)')
+DEFAULT_GROUPS = {
+    '병원(계)': ['상급종합', '종합병원', '병원', '요양병원'],
+    '의원(계)': ['의원'],
+    '치과(계)': ['치과병원', '치과의원'],
+    '한방(계)': ['한방병원', '한의원'],
+    '약국(계)': ['약국'],
+}
+TOTAL_KEY = '전체'
+
+
+def additional_budget(rates, base_amounts):
+    """종별 추가소요재정 합계 = sum(기준 금액 x 인상률(%) / 100) -> rates 의 마지막 축 합산"""
+    return np.nansum(np.asarray(rates, dtype=float) * base_amounts / 100.0, axis=-1)
+
+
+def solve_scale_factors(rates, base_amounts, envelopes, rate_bounds=None, lower=0.0, upper=None,
+                        tol=DEFAULT_TOL, max_iter=DEFAULT_MAX_ITER, budget_fn=additional_budget):
+    """모든 (목표 재정, 시나리오) 조합의 배율 k 동시 계산
+
+    rates: (시나리오, 종별) 인상률(%), base_amounts: (종별,) 또는 (시나리오, 종별) 기준 금액
+    envelopes: 목표 재정 스칼라 또는 1차원 격자, rate_bounds: (하한, 상한) 인상률(%) 또는 None
+    반환: {'k': (목표, 시나리오), 'rates': (목표, 시나리오, 종별), 'budget', 'residual', 'converged', 'iterations'}
+    """
+    rates = np.atleast_2d(np.asarray(rates, dtype=float))
+    base_amounts = np.asarray(base_amounts, dtype=float)
+    env = np.atleast_1d(np.asarray(envelopes, dtype=float))[:, None]
+
+    def scaled(k):
+        x = k[..., None] * rates
+        return np.clip(x, *rate_bounds) if rate_bounds is not None else x
+
+    def f(k):
+        return budget_fn(scaled(k), base_amounts) - env
+
+    shape = (env.shape[0], rates.shape[0])
+    lo = np.full(shape, float(lower))
+    f_lo = f(lo)
+    # 증가/감소 방향 판별 (인상률 합이 음수인 시나리오는 k 증가 시 재정 감소)
+    direction = np.sign(budget_fn(scaled(np.ones(shape)), base_amounts) - budget_fn(scaled(np.zeros(shape)), base_amounts))
+    direction = np.where(direction == 0, 1.0, direction)
+
+    if upper is None:
+        hi = np.maximum(lo + 1.0, 1.0)
+        for _ in range(MAX_BRACKET_DOUBLINGS):
+            need = (f(hi) * direction < 0)
+            if not need.any():
+                break
+            hi = np.where(need, hi * 2.0, hi)
+    else:
+        hi = np.full(shape, float(upper))
+    f_hi = f(hi)
+    bracketed = (np.sign(f_lo) * np.sign(f_hi) <= 0)
+
+    k = np.where(bracketed, lo + (hi - lo) * np.divide(-f_lo, f_hi - f_lo, out=np.full(shape, 0.5),
+                                                        where=(f_hi != f_lo)), np.nan)
+    converged = ~bracketed
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        active = bracketed & ~converged
+        if not active.any():
+            break
+        fk = f(np.where(active, k, lo))
+        scale = np.maximum(np.abs(env), 1.0)
+        done = active & (np.abs(fk) <= tol * scale)
+        converged |= done
+        active &= ~done
+        # 구간 갱신 (f(lo) 와 부호가 같으면 lo <- k)
+        same = np.sign(fk) == np.sign(f_lo)
+        lo = np.where(active & same, k, lo)
+        f_lo = np.where(active & same, fk, f_lo)
+        hi = np.where(active & ~same, k, hi)
+        # 뉴턴 스텝 (수치 기울기), 구간 밖이면 이분법
+        h = 1e-7 * np.maximum(np.abs(k), 1.0)
+        slope = (f(np.where(active, k + h, lo)) - fk) / h
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = k - fk / slope
+        inside = np.isfinite(newton) & (newton > np.minimum(lo, hi)) & (newton < np.maximum(lo, hi))
+        k = np.where(active, np.where(inside, newton, 0.5 * (lo + hi)), k)
+        converged |= active & (np.abs(hi - lo) <= tol * np.maximum(np.abs(k), 1.0))
+
+    final_rates = scaled(np.where(np.isnan(k), 0.0, k))
+    budget = budget_fn(final_rates, base_amounts)
+    return {
+        'k': k,
+        'rates': np.where(np.isnan(k)[..., None], np.nan, final_rates),
+        'budget': np.where(np.isnan(k), np.nan, budget),
+        'residual': budget - env,
+        'converged': converged & bracketed,
+        'iterations': iterations,
+    }
+
+
+def base_amounts_from_analysis(paths, types):
+    """{(모형, 시나리오): {'rate': {...}, 'budget': {...}}} -> 종별 기준 금액 (소요재정 / 인상률 x 100)
+    인상률 0 인 종별은 다른 시나리오 값으로 채움 (기준 금액은 시나리오와 무관)"""
+    rows = []
+    for item in paths.values():
+        rate = pd.Series((item or {}).get('rate', {}), dtype=float).reindex(types)
+        budget = pd.Series((item or {}).get('budget', {}), dtype=float).reindex(types)
+        rows.append((budget / rate.where(rate != 0) * 100).to_numpy())
+    with np.errstate(all='ignore'):
+        return np.nanmedian(np.array(rows), axis=0) if rows else np.full(len(types), np.nan)
+
+
+def constrained_grid(budget_year, envelopes, groups=None, rate_bounds=None):
+    """budget_analysis[year] ({모형: {시나리오: {'rate', 'budget'}}}) + 목표 재정 격자 -> 제약 결과 long DataFrame
+
+    열: envelope, model, scenario, k, converged, 종별/그룹/전체 인상률(%) 및 소요재정
+    """
+    groups = groups or DEFAULT_GROUPS
+    types = [t for members in groups.values() for t in members]
+    paths = {(m, s): item for m, by_s in (budget_year or {}).items() for s, item in (by_s or {}).items()}
+    if not paths:
+        return pd.DataFrame()
+    rates = np.array([pd.Series(item.get('rate', {}), dtype=float).reindex(types).to_numpy()
+                      for item in paths.values()])
+    base = base_amounts_from_analysis(paths, types)
+    base = np.where(np.isnan(base), 0.0, base)
+    envelopes = np.atleast_1d(np.asarray(envelopes, dtype=float))
+    res = solve_scale_factors(rates, base, envelopes, rate_bounds=rate_bounds)
+
+    # 그룹/전체 인상률 = 그룹 소요재정 / 그룹 기준 금액 (기준 금액 가중평균)
+    budgets = res['rates'] * base / 100.0
+    member = np.array([[t in members for t in types] for members in groups.values()] + [[True] * len(types)], float)
+    group_base = member @ base
+    group_budget = budgets @ member.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        group_rates = np.where(group_base > 0, group_budget / group_base * 100.0, np.nan)
+
+    labels = types + list(groups) + [TOTAL_KEY]
+    all_rates = np.concatenate([res['rates'], group_rates], axis=-1)
+    all_budgets = np.concatenate([budgets, group_budget], axis=-1)
+    n_env, n_path = res['k'].shape
+    keys = list(paths)
+    frame = {
+        'envelope': np.repeat(envelopes, n_path),
+        'model': [keys[j][0] for _ in range(n_env) for j in range(n_path)],
+        'scenario': [keys[j][1] for _ in range(n_env) for j in range(n_path)],
+        'k': res['k'].ravel(),
+        'converged': res['converged'].ravel(),
+    }
+    for i, label in enumerate(labels):
+        frame[f'{label}_인상률(%)'] = all_rates[..., i].ravel()
+    for i, label in enumerate(labels):
+        frame[f'{label}_소요재정(억)'] = all_budgets[..., i].ravel()
+    return pd.DataFrame(frame)
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 
+from macro_link import MacroLinkModel, DEFAULT_COEF
+from aggregation_matrix import AggregationMatrix
+
 # 1. Data Loader
 def load_data():
     file_path = '파이썬_SGR_데이터SET.xlsx'
@@ -29,122 +32,42 @@ def load_data():
         'GROUP_MAPPING': GROUP_MAPPING
     }
 
-# 2. MEI Scenarios Calculation
-def calculate_mei_16(data, year):
-    df_inf = data['df_mei_raw']
-    df_weights = data['df_weights']
-    
-    try:
-        # Labor rate: (year / year-3)**(1/3)
-        I_types = [col for col in df_inf.columns if '인건비' in col]
-        labor_rates = (df_inf.loc[year, I_types] / df_inf.loc[year-3, I_types]) ** (1/3) - 1
-        
-        # Raw rates: (year / year-1) - 1
-        M_types = [col for col in df_inf.columns if '관리비' in col]
-        Z_types = [col for col in df_inf.columns if '재료비' in col]
-        raw_rates = df_inf.loc[year] / df_inf.loc[year-1] - 1
-        
-        mei_results = {}
-        for i_col in I_types:
-            val_i = labor_rates[i_col]
-            for m_col in M_types:
-                val_m = raw_rates[m_col]
-                for z_col in Z_types:
-                    val_z = raw_rates[z_col]
-                    
-                    name = f"I{i_col.split('_')[-1]}M{m_col.split('_')[-1]}Z{z_col.split('_')[-1]}"
-                    mei_idx = (
-                        df_weights['인건비'] * val_i +
-                        df_weights['관리비'] * val_m +
-                        df_weights['재료비'] * val_z
-                    )
-                    mei_results[name] = mei_idx
-                    
-        df_mei = pd.DataFrame(mei_results)
-        df_stats = pd.DataFrame({
-            '평균': df_mei.mean(axis=1),
-            '최대': df_mei.max(axis=1),
-            '최소': df_mei.min(axis=1),
-            '중위수': df_mei.median(axis=1)
-        })
-        return pd.concat([df_mei, df_stats], axis=1)
-    except Exception as e:
-        return None
-
-# 3. Main Calculation Logic
-def run_linked_model_full():
+# 2. Main Calculation Logic
+def run_linked_model_full(coef=DEFAULT_COEF, threshold=0.0, rule='excess'):
     data = load_data()
     TARGET_YEARS = range(2020, 2028)
     
     CATEGORIES_10 = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국']
     TYPES_5 = ['병원', '의원', '치과', '한방', '약국']
     
-    all_res_10 = []
-    all_res_5 = []
+    # 1~4. GDP 증가율 / MEI 16개 시나리오 / 연계 산식 / 상대가치 조정을 전 연도 한 번에 계산
+    # 산식: GDP+1/3(MEI-GDP) if MEI > GDP else GDP (계수/기준은 인자)
+    model = MacroLinkModel(data['df_mei_raw'], data['df_weights'], data['df_gdp'], data['df_rv'])
+    years = model.valid_years(TARGET_YEARS)
+    block = model.cf(years, coef=coef, threshold=threshold, rule=rule)
     
-    for ty in TARGET_YEARS:
-        dy = ty - 2
-        
-        # 1. GDP Growth
-        try:
-            gdp_rate = (data['df_gdp'].loc[dy, '실질GDP'] / data['df_gdp'].loc[dy-1, '실질GDP']) - 1
-        except:
-            continue
-            
-        # 2. MEI 16 Scenarios
-        df_mei = calculate_mei_16(data, dy)
-        if df_mei is None: continue
-        
-        # 3. Formula: GDP+1/3(MEI-GDP) if MEI > GDP else GDP
-        def link_formula(m):
-            return gdp_rate + (1/3 * (m - gdp_rate)) if m > gdp_rate else gdp_rate
-            
-        df_base = df_mei.map(link_formula)
-        
-        # 4. RV Adj
-        try:
-            rv_rate = data['df_rv'].loc[dy] - 1
-            # Filter valid types
-            rv_rate = rv_rate.reindex(df_mei.index)
-        except:
-            rv_rate = 0
-            
-        df_cf_10_all = (df_base.subtract(rv_rate, axis=0)) * 100
-        df_cf_10 = df_cf_10_all.reindex(CATEGORIES_10)
-        
-        # Save 10 categories
-        tmp_10 = df_cf_10.copy()
-        tmp_10['연도'] = ty
-        all_res_10.append(tmp_10.reset_index().rename(columns={'index': '종별'}))
-        
-        # 5. Type Grouping
-        try:
-            exp_w = data['df_exp'].loc[dy]
-        except: continue
-        
-        type_res = {}
-        for group in TYPES_5:
-            members = data['GROUP_MAPPING'][group]
-            valid = [m for m in members if m in df_cf_10_all.index and m in exp_w.index]
-            if not valid: continue
-            
-            w = exp_w.loc[valid] / exp_w.loc[valid].sum()
-            type_res[group] = df_cf_10_all.loc[valid].mul(w, axis=0).sum(axis=0)
-            
-        df_cf_5 = pd.DataFrame(type_res).T.reindex(TYPES_5)
-        tmp_5 = df_cf_5.copy()
-        tmp_5['연도'] = ty
-        all_res_5.append(tmp_5.reset_index().rename(columns={'index': '유형'}))
-        
-    # Combine
-    df_final_10 = pd.concat(all_res_10, ignore_index=True)
-    df_final_5 = pd.concat(all_res_5, ignore_index=True)
+    # 10개 종별 순서로 재배열 (가중치 시트에 없는 종별도 빠뜨리지 않고 빈 행으로 유지)
+    df_final_10 = model.to_frame(block, years, types=CATEGORIES_10)
+    
+    # 5. Type Grouping: 자료연도 진료비 가중치 행렬로 전 연도 x 시나리오 한 번에 집계
+    exp_years = [ty for ty in years if ty - 2 in data['df_exp'].index]
+    rows = [years.index(ty) for ty in exp_years]
+    agg = AggregationMatrix({g: data['GROUP_MAPPING'][g] for g in TYPES_5}, model.types)
+    block_5 = agg.aggregate(block[rows], data['df_exp'], [ty - 2 for ty in exp_years])
+    df_final_5 = model.to_frame(block_5, exp_years, types=TYPES_5, label='유형', row_labels=agg.groups)
     
-    # Reorder columns
-    cols_10 = ['연도', '종별'] + [c for c in df_final_10.columns if c not in ['연도', '종별']]
     cols_5 = ['연도', '유형'] + [c for c in df_final_5.columns if c not in ['연도', '유형']]
     
-    return df_final_10[cols_10], df_final_5[cols_5]
+    return df_final_10, df_final_5[cols_5]
+
+
+def run_coef_sweep(coefs, year=2025):
+    """연계 계수 민감도: 계수 배열 전체를 브로드캐스트 1회로 계산 -> 계수 x 종별 (평균 시나리오, %)"""
+    data = load_data()
+    model = MacroLinkModel(data['df_mei_raw'], data['df_weights'], data['df_gdp'], data['df_rv'])
+    block = model.cf([year], coef=np.asarray(coefs, dtype=float))
+    avg = model.columns.index('평균')
+    return pd.DataFrame(block[:, 0, :, avg], index=pd.Index(coefs, name='계수'), columns=model.types)
 
 if __name__ == "__main__":
     df10, df5 = run_linked_model_full()
@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 import os
 
+from aggregation_matrix import AggregationMatrix
+from driver_projection import project_drivers, missing_drivers, DEFAULT_HORIZON
+
 # 1. Data Loading and Preprocessing
 class DataProcessor:
     def __init__(self, file_path):
@@ -104,9 +107,20 @@ class MeiCalculator:
         return pd.concat([df_scenarios, df_stats], axis=1)
 
 # 3. Model Logic
-def run_mei_growth_model(target_years):
+def run_mei_growth_model(target_years, project=True):
+    """project=True: 자료(t-2 물가 등)가 없는 대상연도는 입력 동인 전망값으로 채워 계산
+    반환: (10개 종별 결과, 5개 유형 결과, 전망값을 사용한 대상연도 집합)"""
     processor = DataProcessor('파이썬_SGR_데이터SET.xlsx')
     data = processor.load_all_data()
+    projected_years = set()
+    if project and missing_drivers(data, max(target_years)):
+        proj = project_drivers(data, horizon=max(target_years))
+        data = proj.raw_data
+        flagged = proj.projected_years()
+        # 대상연도 ty 는 ty-2 물가(인건비는 ty-5 부터)와 ty-2 상대가치/진료비를 사용
+        projected_years = {ty for ty in target_years
+                           if any(y in range(ty - 5, ty - 1) for y in flagged.get('df_raw_mei_inf', []))
+                           or any(ty - 2 in flagged.get(k, []) for k in ('df_rel_value', 'df_expenditure'))}
     mei_calc = MeiCalculator(data)
     
     # 10 categories in specific order
@@ -114,6 +128,8 @@ def run_mei_growth_model(target_years):
     # 5 types in specific order
     TYPES_5 = ['병원', '의원', '치과', '한방', '약국']
     
+    type_matrix = AggregationMatrix({g: processor.GROUP_MAPPING[g] for g in TYPES_5}, list(data['df_weights'].index))
+    
     all_results_10 = {} # target_year -> DataFrame(Scenarios x 종별)
     all_results_5 = {}  # target_year -> DataFrame(Scenarios x 유형별)
     
@@ -142,35 +158,19 @@ def run_mei_growth_model(target_years):
         
         # Calculate 5 types (Weighted Average)
         exp_year = data_year
-        try:
-            exp_weights = data['df_expenditure'].loc[exp_year]
-        except KeyError:
-             continue
-        
-        type_results = {}
-        for group in TYPES_5:
-            members = processor.GROUP_MAPPING[group]
-            valid_members = [m for m in members if m in df_cf_10_all.index and m in exp_weights.index]
-            if not valid_members: continue
-            
-            group_exp = exp_weights.loc[valid_members]
-            total_exp = group_exp.sum()
-            
-            if total_exp == 0:
-                type_results[group] = pd.Series(np.nan, index=df_cf_10_all.columns)
-            else:
-                weights = group_exp / total_exp
-                type_results[group] = df_cf_10_all.loc[valid_members].mul(weights, axis=0).sum(axis=0)
+        if exp_year not in data['df_expenditure'].index:
+            continue
         
-        df_cf_5 = pd.DataFrame(type_results).T
+        # 유형별 진료비 가중평균 (그룹 x 종별 가중치 행렬 곱)
+        df_cf_5 = type_matrix.aggregate_frame(df_cf_10_all, data['df_expenditure'], exp_year)
         all_results_5[ty] = df_cf_5.reindex(TYPES_5)
 
-    return all_results_10, all_results_5
+    return all_results_10, all_results_5, projected_years
 
 # 4. Main execution
 if __name__ == "__main__":
-    target_years = list(range(2020, 2028))
-    res10, res5 = run_mei_growth_model(target_years)
+    target_years = list(range(2020, DEFAULT_HORIZON + 1))
+    res10, res5, projected = run_mei_growth_model(target_years)
     
     # Save to Excel
     with pd.ExcelWriter('MEI_증가율모형_결과.xlsx') as writer:
@@ -178,27 +178,31 @@ if __name__ == "__main__":
         for ty, df in sorted(res10.items()):
             df_pct = (df - 1) * 100
             df_pct['연도'] = ty
+            df_pct['전망'] = ty in projected
             summary_10.append(df_pct.reset_index().rename(columns={'index': '종별'}))
         
         if summary_10:
             df_total_10 = pd.concat(summary_10, ignore_index=True)
-            cols = ['연도', '종별'] + [c for c in df_total_10.columns if c not in ['연도', '종별']]
+            cols = ['연도', '종별', '전망'] + [c for c in df_total_10.columns if c not in ['연도', '종별', '전망']]
             df_total_10[cols].to_excel(writer, sheet_name='10개_종별_조정률', index=False)
         
         summary_5 = []
         for ty, df in sorted(res5.items()):
             df_pct = (df - 1) * 100
             df_pct['연도'] = ty
+            df_pct['전망'] = ty in projected
             summary_5.append(df_pct.reset_index().rename(columns={'index': '유형'}))
             
         if summary_5:
             df_total_5 = pd.concat(summary_5, ignore_index=True)
-            cols5 = ['연도', '유형'] + [c for c in df_total_5.columns if c not in ['연도', '유형']]
+            cols5 = ['연도', '유형', '전망'] + [c for c in df_total_5.columns if c not in ['연도', '유형', '전망']]
             df_total_5[cols5].to_excel(writer, sheet_name='5개_유형별_조정률', index=False)
 
     print("✅ MEI 증가율 모형 계산 완료. 'MEI_증가율모형_결과.xlsx' 파일로 저장되었습니다.")
+    if projected:
+        print(f"[INFO] 입력 동인 전망값 사용 연도: {sorted(projected)}")
     
-    # Print summary for 2020 to 2027 (Average Scenario)
+    # Print summary (Average Scenario)
     print("\n[연도별 평균 시나리오 조정률 추이 (%)]")
     
     type_summary = {}
@@ -2,64 +2,65 @@ import pandas as pd
 import numpy as np
 import warnings
 from 파이썬용_sgr_2027 import DataProcessor, MeiCalculator
+from aggregation_matrix import weighted_average
 
 # 경고 무시
 warnings.filterwarnings('ignore')
 
-def calculate_overall_weighted_mei_full_range(file_path):
+def calculate_overall_weighted_mei_full_range(file_path, lag=0):
     # 1. 데이터 로드 및 초기화
     processor = DataProcessor(file_path)
     hospital_types = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국']
     mei_calc = MeiCalculator(processor.raw_data, hospital_types)
-    
+
     # 진료비 데이터 가져오기
     df_exp = processor.raw_data['df_expenditure']
-    
-    # 2. 가능한 모든 연도 탐색 (2010 ~ 2028)
-    # factor_pd가 2010년부터 있으므로, target_year는 2012년부터 가능성 있음
+
+    # 2. 가능한 모든 연도의 종별 MEI 지수 -> (연도, 종별, 시나리오) 큐브
     years = sorted(df_exp.index.unique())
-    results = []
-    
     print(f"탐색 연도 범위: {min(years)} - {max(years)}")
-    
+
+    frames = {}
     for year in years:
         try:
-            # 해당 연도의 종별 MEI 평균 (지수 형태)
             df_mei = mei_calc.calc_mei_index_by_year(year)
-            
-            # 산출이 안 되는 경우 (데이터 부족 등) 스킵
-            if df_mei is None or '평균' not in df_mei.columns:
-                continue
-                
-            mei_averages = df_mei['평균'] # Series (indexed by hospital_types)
-            
-            # 해당 연도의 실제 진료비 가중치
-            if year in df_exp.index:
-                exp_year = df_exp.loc[year, hospital_types].fillna(0)
-                total_exp = exp_year.sum()
-                
-                if total_exp > 0:
-                    # 가중평균 MEI = Σ(종별 MEI평균 * 종별 진료비) / Σ(진료비)
-                    weighted_mei = (mei_averages * exp_year).sum() / total_exp
-                    
-                    results.append({
-                        '연도': int(year),
-                        '전체가중평균_MEI': round(weighted_mei, 6),
-                        '총진료비': round(total_exp, 2)
-                    })
         except Exception as e:
             # 특정 연도 산출 실패 시 로그 남기고 계속 진행
             print(f"[정보] {year}년 MEI 산출 불가: {e}")
             continue
-    
-    # 3. 결과 저장 및 출력
-    result_df = pd.DataFrame(results)
+        # 산출이 안 되는 경우 (데이터 부족 등) 스킵
+        if df_mei is not None and '평균' in df_mei.columns and year - lag in df_exp.index:
+            frames[year] = df_mei
+
+    if not frames:
+        print("[WARN] 산출 가능한 연도가 없습니다.")
+        return pd.DataFrame()
+    valid_years = list(frames)
+    scenarios = list(frames[valid_years[0]].columns)
+    cube = np.stack([frames[y].reindex(index=hospital_types, columns=scenarios).to_numpy(dtype=float)
+                     for y in valid_years])
+
+    # 3. 전 연도 x 전 시나리오 가중평균 (Σ MEI x 진료비 / Σ 진료비, 한 번의 행렬곱)
+    weighted = weighted_average(cube, df_exp, valid_years, hospital_types, lag=lag)[:, 0]
+    total_exp = df_exp.reindex(index=[y - lag for y in valid_years], columns=hospital_types).fillna(0).sum(axis=1)
+    ok = ~np.isnan(weighted[:, scenarios.index('평균')])
+    result_df = pd.DataFrame({
+        '연도': np.array(valid_years)[ok].astype(int),
+        '전체가중평균_MEI': np.round(weighted[ok, scenarios.index('평균')], 6),
+        '총진료비': np.round(total_exp.to_numpy()[ok], 2),
+    })
+    by_scenario = pd.DataFrame(weighted[ok], index=pd.Index(result_df['연도'], name='연도'), columns=scenarios)
+
+    # 4. 결과 저장 및 출력
     output_file = '연도별_전체_가중평균_MEI_결과_최대범위.xlsx'
-    result_df.to_excel(output_file, index=False)
-    
+    with pd.ExcelWriter(output_file) as writer:
+        result_df.to_excel(writer, sheet_name='Sheet1', index=False)
+        by_scenario.to_excel(writer, sheet_name='시나리오별')
+
     print("\n### [연도별 전체 가중평균 MEI (최대 데이터 확보 범위)] ###")
     print(result_df)
     print(f"\n파일이 '{output_file}'로 저장되었습니다.")
+    return result_df
 
 if __name__ == "__main__":
     calculate_overall_weighted_mei_full_range('SGR_data.xlsx')
@@ -0,0 +1,273 @@
+"""
+입력 동인 전망 (자료 범위를 넘는 연도 채우기, 벡터 연산)
+- run_full_analysis / calc_mei_index_by_year 는 t-1 / t-2 입력이 없는 연도를 None 으로 건너뜀
+  -> 생산요소 물가, GDP, 인구, 진료비, 환산지수, 법과제도, 상대가치 시트를 horizon(예: 2035)까지 전망해 채움
+- 시트별 열을 하나의 (연도, 계열) 행렬로 쌓아 전 계열을 한 번에 적합 (계열별 루프 없음)
+  수준 계열(물가/GDP/인구/진료비/환산지수): z = 로그 증가율,  지수 계열(법과제도/상대가치, 1 기준): z = 값 - 1
+  'ar1'  : z_t = c + phi x z_{t-1} (최근 window 년, 계열별 최소제곱) 을 재귀 전망 -> 장기 평균 c / (1 - phi) 로 수렴
+  'trend': 수준 계열은 로그 선형 추세(일정 증가율), 지수 계열은 최근 평균 유지
+- 원자료 값은 그대로 두고 비어 있는 뒤쪽 연도만 채움, 채운 셀은 flags (같은 모양의 bool DataFrame) 로 표시
+  stale_tail=True: 마지막 실적을 복사해 둔 꼬리 행(직전 행과 완전히 같은 값)도 결측으로 보고 전망
+  (수준 계열만 해당, 1.0 이 이어지는 법과제도/상대가치 지수는 제외)
+
+사용 예:
+    proj = project_drivers(processor.raw_data, horizon=2035)
+    engine = CalculationEngine(proj.raw_data)            # 2029~2035 분석 가능
+    proj.projected_years()                               # {시트: [전망 연도]}
+    proj.summary()                                       # 계열별 적합 계수 / 장기 증가율
+    python driver_projection.py --horizon 2035 --out 동인전망.xlsx
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from macro_link import DATA_LAG
+
+DEFAULT_HORIZON = 2035
+DEFAULT_WINDOW = 10
+METHODS = ('ar1', 'trend')
+PHI_LIMIT = 0.95        # AR 계수 안정 범위 (|phi| <= 0.95)
+MIN_PAIRS = 3           # AR(1) 적합 최소 관측쌍, 미만이면 평균 유지
+
+# raw_data 키 -> 계열 종류 ('level': 로그 증가율 전망, 'ratio': 1 기준 지수 전망)
+DRIVER_SHEETS = {
+    'df_raw_mei_inf': 'level',
+    'df_gdp': 'level',
+    'df_pop': 'level',
+    'df_expenditure': 'level',
+    'df_sgr_reval': 'level',
+    'df_sgr_law': 'ratio',
+    'df_rel_value': 'ratio',
+}
+SHEET_LABELS = {
+    'df_raw_mei_inf': '생산요소물가',
+    'df_gdp': 'GDP',
+    'df_pop': '건보대상',
+    'df_expenditure': '진료비',
+    'df_sgr_reval': '환산지수',
+    'df_sgr_law': '법과제도',
+    'df_rel_value': '상대가치',
+}
+# 대상연도 T 계산에 필요한 마지막 자료연도 = T - lag (물가는 T-2, 나머지는 T-1)
+DRIVER_LAGS = {'df_raw_mei_inf': DATA_LAG}
+DEFAULT_LAG = 1
+
+
+class ProjectionResult:
+    """전망으로 채운 raw_data + 셀별 전망 표시 + 계열별 적합 계수"""
+
+    def __init__(self, raw_data, flags, params, horizon, method):
+        self.raw_data = raw_data
+        self.flags = flags          # {시트: bool DataFrame (연도 x 열)}
+        self.params = params        # DataFrame (시트, 열, 종류, 마지막실적, c, phi, 장기값)
+        self.horizon = horizon
+        self.method = method
+
+    def projected_years(self):
+        """{시트: [전망값이 들어간 연도]}"""
+        return {key: [int(y) for y in f.index[f.any(axis=1)]] for key, f in self.flags.items()}
+
+    def summary(self):
+        return self.params.copy()
+
+    def to_frame(self, key):
+        """시트 1개: 값 + 열별 '전망' 표시 (long 형식: 연도, 열, 값, 전망)"""
+        values = self.raw_data[key].reindex(columns=self.flags[key].columns)
+        df = values.stack(future_stack=True).rename('값').to_frame()
+        df['전망'] = self.flags[key].stack(future_stack=True).to_numpy()
+        df.index.names = ['연도', '열']
+        return df.reset_index()
+
+
+def _stale_mask(values, last):
+    """열별 마지막 유효 행에서 거꾸로 직전 행과 같은 값이 이어지는 꼬리 셀 (연도, 열) bool"""
+    rows = np.arange(values.shape[0])[:, None]
+    same = np.zeros(values.shape, dtype=bool)
+    same[1:] = values[1:] == values[:-1]
+    same |= rows > last                     # 마지막 유효 행 이후(빈 행)는 연속 구간을 끊지 않음
+    # 뒤집어서 누적곱 -> 마지막 행부터 연속으로 같은 구간만 True
+    tail = np.flip(np.cumprod(np.flip(same, axis=0), axis=0), axis=0).astype(bool)
+    return tail & (rows <= last)
+
+
+def _last_valid(mask):
+    """열별 마지막 유효 행 위치 (없으면 -1)"""
+    n = mask.shape[0]
+    return np.where(mask.any(axis=0), n - 1 - np.argmax(np.flip(mask, axis=0), axis=0), -1)
+
+
+def fit_ar1(z, last, window=DEFAULT_WINDOW):
+    """(연도, 계열) z 에서 계열별 마지막 유효 위치 이전 window 년으로 z_t = c + phi z_{t-1} 적합 -> (c, phi)
+
+    관측쌍이 MIN_PAIRS 미만이거나 분산이 0 이면 phi = 0, c = 구간 평균 (평균 유지)
+    """
+    rows = np.arange(z.shape[0])[:, None]
+    in_window = (rows > last - window) & (rows <= last)
+    cur, prev = z[1:], z[:-1]
+    pair = in_window[1:] & in_window[:-1] & np.isfinite(cur) & np.isfinite(prev)
+    n = pair.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mx = np.where(pair, prev, 0.0).sum(axis=0) / n
+        my = np.where(pair, cur, 0.0).sum(axis=0) / n
+        sxx = np.where(pair, (prev - mx) ** 2, 0.0).sum(axis=0)
+        sxy = np.where(pair, (prev - mx) * (cur - my), 0.0).sum(axis=0)
+        phi = np.clip(sxy / sxx, -PHI_LIMIT, PHI_LIMIT)
+    ok = (n >= MIN_PAIRS) & (sxx > 0) & np.isfinite(phi)
+    valid = in_window & np.isfinite(z)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, z, 0.0).sum(axis=0) / valid.sum(axis=0)
+    phi = np.where(ok, phi, 0.0)
+    c = np.where(ok, my - phi * mx, mean)
+    return c, phi
+
+
+def fit_trend(log_level, last, window=DEFAULT_WINDOW):
+    """(연도, 계열) 로그 수준의 최근 window 년 선형 추세 기울기 (= 일정 로그 증가율)"""
+    rows = np.arange(log_level.shape[0])[:, None].astype(float)
+    valid = (rows > last - window) & (rows <= last) & np.isfinite(log_level)
+    n = valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mt = np.where(valid, rows, 0.0).sum(axis=0) / n
+        my = np.where(valid, log_level, 0.0).sum(axis=0) / n
+        stt = np.where(valid, (rows - mt) ** 2, 0.0).sum(axis=0)
+        sty = np.where(valid, (rows - mt) * (log_level - my), 0.0).sum(axis=0)
+        return np.where(stt > 0, sty / stt, 0.0)
+
+
+def _stack(raw_data, horizon, stale_tail):
+    """시트별 열을 공통 연도 축의 (연도, 계열) 행렬로 -> (연도, 값, 관측 mask, 계열 라벨, 종류)"""
+    keys = [k for k in DRIVER_SHEETS if k in raw_data]
+    frames = {k: raw_data[k].apply(pd.to_numeric, errors='coerce') for k in keys}
+    start = int(min(f.index.min() for f in frames.values()))
+    end = max(int(horizon), int(max(f.index.max() for f in frames.values())))
+    years = np.arange(start, end + 1)
+    blocks, observed, labels, kinds = [], [], [], []
+    for k in keys:
+        block = frames[k].reindex(index=years).to_numpy(dtype=float)
+        seen = np.isfinite(block)
+        if stale_tail and DRIVER_SHEETS[k] == 'level':
+            seen &= ~_stale_mask(np.where(seen, block, np.nan), _last_valid(seen))
+        blocks.append(block)
+        observed.append(seen)
+        labels += [(k, c) for c in frames[k].columns]
+        kinds += [DRIVER_SHEETS[k]] * block.shape[1]
+    return years, np.hstack(blocks), np.hstack(observed), labels, np.array(kinds)
+
+
+def project_drivers(raw_data, horizon=DEFAULT_HORIZON, method='ar1', window=DEFAULT_WINDOW, stale_tail=False):
+    """동인 시트의 비어 있는 뒤쪽 연도를 horizon 까지 전망으로 채움 -> ProjectionResult"""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}: {method}")
+    years, values, observed, labels, kinds = _stack(raw_data, horizon, stale_tail)
+    level = kinds == 'level'
+    obs = np.where(observed, values, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_obs = np.log(np.where(level & (obs > 0), obs, np.nan))
+    # z: 수준 계열은 로그 증가율 (t 행 = t-1 -> t), 지수 계열은 값 - 1
+    z = np.full(values.shape, np.nan)
+    z[1:, level] = np.diff(log_obs[:, level], axis=0)
+    z[:, ~level] = obs[:, ~level] - 1
+    last = _last_valid(observed)
+
+    if method == 'ar1':
+        c, phi = fit_ar1(z, last, window)
+    else:
+        c, phi = np.where(level, fit_trend(log_obs, last, window), 0.0), np.zeros(len(labels))
+        rows = np.arange(len(years))[:, None]
+        recent = (rows > last - window) & (rows <= last) & np.isfinite(z)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = np.where(level, c, np.where(recent, z, 0.0).sum(axis=0) / recent.sum(axis=0))
+
+    # 계열별 마지막 실적 다음 해부터 재귀 전망 (h 단계 z 를 전 계열 동시에 계산)
+    n_steps = len(years) - 1 - np.where(last >= 0, last, len(years) - 1)
+    cols = np.arange(len(labels))
+    z_last = np.where(last >= 0, z[np.maximum(last, 0), cols], np.nan)
+    z_last = np.where(np.isfinite(z_last), z_last, c / (1 - phi))
+    steps = np.empty((int(n_steps.max(initial=0)), len(labels)))
+    z_h = z_last
+    for h in range(steps.shape[0]):
+        z_h = c + phi * z_h
+        steps[h] = z_h
+    h_idx = np.arange(steps.shape[0])[:, None]
+    active = h_idx < n_steps
+    base = np.where(last >= 0, obs[np.maximum(last, 0), cols], np.nan)
+    path = np.where(level, base * np.exp(np.cumsum(np.where(active, steps, 0.0), axis=0)), 1 + steps)
+
+    filled = np.where(observed, values, np.nan)
+    rows = (last + 1)[None, :] + h_idx
+    r, k = np.nonzero(active & (rows < len(years)))
+    filled[rows[r, k], k] = path[r, k]
+    projected = ~observed & np.isfinite(filled)
+    projected &= np.arange(len(years))[:, None] > last
+
+    out_data, flags, params, start = dict(raw_data), {}, [], 0
+    for key in [k for k in DRIVER_SHEETS if k in raw_data]:
+        ncol = raw_data[key].shape[1]
+        sl = slice(start, start + ncol)
+        start += ncol
+        orig = raw_data[key]
+        block = pd.DataFrame(filled[:, sl], index=years, columns=orig.columns)
+        flag = pd.DataFrame(projected[:, sl], index=years, columns=orig.columns)
+        keep = np.isin(years, orig.index) | flag.any(axis=1).to_numpy()
+        block, flag = block[keep], flag[keep]
+        # 원자료 값(전망 대상이 아닌 셀)은 그대로 유지 (stale_tail 로 덮은 셀만 교체)
+        merged = orig.reindex(block.index).astype(float).where(~flag, block)
+        merged.index.name = orig.index.name
+        out_data[key] = merged
+        flags[key] = flag
+    for j, (key, col) in enumerate(labels):
+        long_run = c[j] / (1 - phi[j])
+        params.append({'시트': SHEET_LABELS.get(key, key), '자료': key, '열': col, '종류': kinds[j],
+                       '마지막실적': int(years[last[j]]) if last[j] >= 0 else None,
+                       'c': c[j], 'phi': phi[j],
+                       '장기값': (np.expm1(long_run) if kinds[j] == 'level' else 1 + long_run)})
+    return ProjectionResult(out_data, flags, pd.DataFrame(params), int(horizon), method)
+
+
+def last_complete_year(df):
+    """모든 열이 있는 마지막 연도 (없으면 None)"""
+    full = df.apply(pd.to_numeric, errors='coerce').dropna()
+    return int(full.index.max()) if len(full) else None
+
+
+def missing_drivers(raw_data, target_year):
+    """대상연도 계산에 필요한 연도(T-1, 물가 T-2)까지 자료가 없는 동인 시트 목록"""
+    out = []
+    for key in DRIVER_SHEETS:
+        if key not in raw_data:
+            continue
+        last = last_complete_year(raw_data[key])
+        if last is None or last < int(target_year) - DRIVER_LAGS.get(key, DEFAULT_LAG):
+            out.append(key)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='입력 동인 전망 (자료 범위 이후 연도 채우기)')
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON)
+    parser.add_argument('--method', default='ar1', choices=METHODS)
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--stale-tail', action='store_true', help='마지막 실적 복사 행도 결측으로 보고 전망')
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    parser.add_argument('--out', default=None, help='엑셀 저장 경로 (적합 계수 + 시트별 값/전망 표시)')
+    args = parser.parse_args(argv)
+
+    from 파이썬용_sgr_2027 import DataProcessor
+    processor = DataProcessor(args.data)
+    proj = project_drivers(processor.raw_data, args.horizon, args.method, args.window, args.stale_tail)
+    print(f"=== [입력 동인 전망 ~{args.horizon}년 ({args.method}, 최근 {args.window}년 적합)] ===")
+    for key, years in proj.projected_years().items():
+        label = SHEET_LABELS.get(key, key)
+        print(f"[INFO] {label}: " + (f"{years[0]}~{years[-1]}년 전망" if years else "전망 없음"))
+    if args.out:
+        with pd.ExcelWriter(args.out) as writer:
+            proj.summary().to_excel(writer, sheet_name='적합계수', index=False)
+            for key in proj.flags:
+                proj.to_frame(key).to_excel(writer, sheet_name=SHEET_LABELS.get(key, key), index=False)
+        print(f"[SUCCESS] 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+계산 엔진 계층형 프로파일러 (opt-in)
+- 프로파일링 중에만 엔진/계산기 클래스 메서드를 타이머로 감싸고, 끝나면 원래 메서드로 복원
+  -> 비활성 상태에서는 추가 비용 없음
+- 호출 트리별 호출 횟수, 누적(cumulative) 시간, 자기(self) 시간, 캐시 적중/미스 이벤트 집계
+- 결과: JSON 트리 / flamegraph 용 collapsed-stack 텍스트
+- track_memory=True: tracemalloc 으로 구간별 최대(peak) / 잔존(retained) 할당량 기록,
+  deep_sizeof 로 캐시된 결과 객체 크기 측정
+
+사용 예:
+    with EngineProfiler() as prof:
+        CalculationEngine(raw_data).run_full_analysis(target_year=2025)
+    prof.save('profile.json', 'profile.folded')
+"""
+
+import functools
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# 프로파일러를 활성화한 스레드만 기록 (다른 요청 스레드는 원래 메서드와 거의 동일한 비용)
+_local = threading.local()
+_install_lock = threading.Lock()
+_active = None
+
+
+def current():
+    """현재 스레드에서 기록 중인 프로파일러 (없으면 None)"""
+    return getattr(_local, 'profiler', None)
+
+
+def count(event, n=1):
+    """캐시 적중/미스 등 이벤트 카운트 (프로파일링 중이 아니면 무시)"""
+    prof = getattr(_local, 'profiler', None)
+    if prof is not None:
+        prof.count(event, n)
+
+
+def stage(name):
+    """임의 구간 타이머: with stage('load'): ... (비활성 시 빈 컨텍스트)"""
+    prof = getattr(_local, 'profiler', None)
+    if prof is None:
+        return _NULL_STAGE
+    return prof.stage(name)
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class ProfilerBusy(RuntimeError):
+    """다른 프로파일링 세션이 이미 실행 중"""
+
+
+class ProfileNode:
+    """호출 트리 노드 (같은 경로의 호출은 합산)"""
+
+    __slots__ = ('name', 'calls', 'total', 'children', 'events', 'peak_bytes', 'retained_bytes')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.children = {}
+        self.events = {}
+        self.peak_bytes = None
+        self.retained_bytes = None
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = ProfileNode(name)
+        return node
+
+    @property
+    def self_time(self):
+        return max(0.0, self.total - sum(c.total for c in self.children.values()))
+
+    @property
+    def self_retained_bytes(self):
+        """하위 구간 잔존분을 제외한 자기 잔존 할당량 (retained_bytes 는 하위 구간 포함)"""
+        if self.retained_bytes is None:
+            return None
+        return self.retained_bytes - sum(c.retained_bytes or 0 for c in self.children.values())
+
+    def to_dict(self):
+        d = {
+            'name': self.name,
+            'calls': self.calls,
+            'cumulative_ms': round(self.total * 1000, 3),
+            'self_ms': round(self.self_time * 1000, 3),
+        }
+        if self.peak_bytes is not None:
+            d['peak_bytes'] = self.peak_bytes
+            d['retained_bytes'] = self.retained_bytes
+            d['self_retained_bytes'] = self.self_retained_bytes
+        if self.events:
+            d['events'] = dict(self.events)
+        if self.children:
+            d['children'] = sorted((c.to_dict() for c in self.children.values()),
+                                   key=lambda c: -c['cumulative_ms'])
+        return d
+
+
+class _Stage:
+    __slots__ = ('profiler', 'node', 'start', 'mem_start', 'child_peak')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.node = profiler._stack[-1].child(name)
+
+    def __enter__(self):
+        prof = self.profiler
+        if prof.track_memory:
+            # tracemalloc 의 peak 는 전역 1개 -> 상위 구간의 peak 를 보존한 뒤 초기화
+            parent = prof._frames[-1]
+            current, peak = tracemalloc.get_traced_memory()
+            parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+            self.child_peak = current
+        prof._stack.append(self.node)
+        prof._frames.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        node, prof = self.node, self.profiler
+        node.total += time.perf_counter() - self.start
+        node.calls += 1
+        prof._stack.pop()
+        prof._frames.pop()
+        if prof.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.child_peak)
+            node.peak_bytes = max(node.peak_bytes or 0, peak - self.mem_start)
+            node.retained_bytes = (node.retained_bytes or 0) + (current - self.mem_start)
+            parent = prof._frames[-1]
+            parent.child_peak = max(parent.child_peak, peak)
+        return False
+
+
+class _RootFrame:
+    __slots__ = ('child_peak',)
+
+    def __init__(self):
+        self.child_peak = 0
+
+
+def deep_sizeof(obj, _seen=None):
+    """중첩 dict/list/DataFrame/ndarray 의 대략적 메모리 크기 (bytes, 공유 객체는 1회만 계산)"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+def result_sizes(result):
+    """(history, components, bulk_sgr) 결과의 구성요소별 크기 -> bulk_sgr 는 하위 키별로 분리"""
+    history, components, bulk_sgr = result
+    sizes = {'history': deep_sizeof(history), 'components': deep_sizeof(components)}
+    if isinstance(bulk_sgr, dict):
+        for key, value in bulk_sgr.items():
+            sizes[f'bulk_sgr.{key}'] = deep_sizeof(value)
+    else:
+        sizes['bulk_sgr'] = deep_sizeof(bulk_sgr)
+    sizes['total'] = deep_sizeof(result)
+    return dict(sorted(sizes.items(), key=lambda kv: -kv[1]))
+
+
+def _default_targets():
+    from 파이썬용_sgr_2027 import (CalculationEngine, MeiCalculator, SgrCalculator,
+                              FinalRateCalculator, DataProcessor)
+    return [CalculationEngine, MeiCalculator, SgrCalculator, FinalRateCalculator, DataProcessor]
+
+
+def _wrap(cls_name, attr, fn):
+    label = f"{cls_name}.{attr}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        prof = getattr(_local, 'profiler', None)
+        if prof is None:
+            return fn(*args, **kwargs)
+        with _Stage(prof, label):
+            return fn(*args, **kwargs)
+    wrapper.__sgr_profiled__ = True
+    return wrapper
+
+
+class EngineProfiler:
+    """엔진 클래스 메서드 계측 컨텍스트 (동시에 하나만 활성화)"""
+
+    def __init__(self, targets=None, root_name='profile', track_memory=False):
+        self.targets = targets
+        self.track_memory = track_memory
+        self.root = ProfileNode(root_name)
+        self._stack = [self.root]
+        self._frames = [_RootFrame()]
+        self._patched = []
+        self._start = None
+        self._own_tracemalloc = False
+
+    # --- 계측 설치/해제 ---
+    def _install(self):
+        for cls in (self.targets if self.targets is not None else _default_targets()):
+            for attr, value in list(vars(cls).items()):
+                if not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+                    continue
+                if attr.startswith('__') and attr != '__init__':
+                    continue
+                if getattr(value, '__sgr_profiled__', False):
+                    continue
+                setattr(cls, attr, _wrap(cls.__name__, attr, value))
+                self._patched.append((cls, attr, value))
+
+    def _uninstall(self):
+        for cls, attr, original in reversed(self._patched):
+            setattr(cls, attr, original)
+        self._patched = []
+
+    def __enter__(self):
+        global _active
+        if not _install_lock.acquire(blocking=False):
+            raise ProfilerBusy("Another profiling session is already running")
+        try:
+            self._install()
+        except Exception:
+            _install_lock.release()
+            raise
+        _active = self
+        _local.profiler = self
+        if self.track_memory:
+            self._own_tracemalloc = not tracemalloc.is_tracing()
+            if self._own_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._mem_start = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        self.root.total += time.perf_counter() - self._start
+        self.root.calls += 1
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.root.peak_bytes = max(peak, self._frames[0].child_peak) - self._mem_start
+            self.root.retained_bytes = current - self._mem_start
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+        _local.profiler = None
+        _active = None
+        try:
+            self._uninstall()
+        finally:
+            _install_lock.release()
+        return False
+
+    # --- 기록 ---
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def count(self, event, n=1):
+        events = self._stack[-1].events
+        events[event] = events.get(event, 0) + n
+
+    # --- 출력 ---
+    def to_dict(self):
+        return self.root.to_dict()
+
+    def totals(self):
+        """경로와 무관하게 메서드별 합계 {name: {calls, cumulative_ms, self_ms}} (재귀 호출은 누적 중복 제외)"""
+        out = {}
+
+        def walk(node, ancestors):
+            rec = out.setdefault(node.name, {'calls': 0, 'cumulative_ms': 0.0, 'self_ms': 0.0})
+            rec['calls'] += node.calls
+            rec['self_ms'] += node.self_time * 1000
+            if node.name not in ancestors:
+                rec['cumulative_ms'] += node.total * 1000
+            for c in node.children.values():
+                walk(c, ancestors | {node.name})
+
+        for c in self.root.children.values():
+            walk(c, frozenset())
+        return {k: {kk: (round(vv, 3) if isinstance(vv, float) else vv) for kk, vv in v.items()}
+                for k, v in sorted(out.items(), key=lambda kv: -kv[1]['self_ms'])}
+
+    def events(self):
+        """전체 트리의 이벤트 합계 (캐시 적중/미스 등)"""
+        out = {}
+
+        def walk(node):
+            for k, v in node.events.items():
+                out[k] = out.get(k, 0) + v
+            for c in node.children.values():
+                walk(c)
+
+        walk(self.root)
+        return out
+
+    def memory(self):
+        """메서드별 최대 peak / 자기 잔존 합계 (track_memory=True 일 때만).
+        잔존은 하위 구간을 뺀 자기 잔존만 합산 -> 중첩/재귀 호출이 이중 계산되지 않음"""
+        out = {}
+
+        def walk(node):
+            if node.peak_bytes is not None:
+                rec = out.setdefault(node.name, {'peak_bytes': 0, 'retained_bytes': 0})
+                rec['peak_bytes'] = max(rec['peak_bytes'], node.peak_bytes)
+                rec['retained_bytes'] += node.self_retained_bytes
+            for c in node.children.values():
+                walk(c)
+
+        for c in self.root.children.values():
+            walk(c)
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]['peak_bytes']))
+
+    def to_json(self, indent=2, extra=None):
+        payload = {'tree': self.to_dict(), 'totals': self.totals(), 'events': self.events()}
+        if self.track_memory:
+            payload['memory'] = self.memory()
+        if extra:
+            payload.update(extra)
+        return json.dumps(payload, ensure_ascii=False, indent=indent)
+
+    def collapsed(self):
+        """flamegraph.pl / speedscope 호환 'a;b;c <self μs>' 형식"""
+        lines = []
+
+        def walk(node, path):
+            path = path + [node.name.replace(';', ':').replace(' ', '_')]
+            us = int(round(node.self_time * 1e6))
+            if us > 0:
+                lines.append(f"{';'.join(path)} {us}")
+            for c in node.children.values():
+                walk(c, path)
+
+        walk(self.root, [])
+        return '\n'.join(lines) + '\n'
+
+    def save(self, json_path=None, collapsed_path=None):
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_json())
+        if collapsed_path:
+            with open(collapsed_path, 'w', encoding='utf-8') as f:
+                f.write(self.collapsed())
+
+
+def profile_analysis(raw_data, target_year, overrides=None, track_memory=False, analysis_fn=None):
+    """run_full_analysis 1회를 프로파일링 -> (EngineProfiler, 결과)
+    analysis_fn(target_year, overrides): 캐시 경유 조회 함수 (서버의 get_cached_analysis 등)
+    -> 캐시 적중/미스 이벤트가 기록되고, 적중 시 엔진은 실행되지 않음"""
+    from analysis_cache import compute_analysis
+    with EngineProfiler(track_memory=track_memory) as prof:
+        if analysis_fn is None:
+            result = compute_analysis(raw_data, target_year, overrides)
+        else:
+            result = analysis_fn(target_year, overrides)
+    return prof, result
@@ -0,0 +1,164 @@
+"""
+스트리밍 엑셀 작성기 (openpyxl write-only 모드)
+- 행 단위로 바로 기록하여 워크북 전체 DOM 을 메모리에 올리지 않음 (시트 수/행 수와 무관한 메모리)
+- 기존 다운로드 라우트의 열 너비 자동 조정(adjusted_widths: 최대 글자 수 + 2)을 기록 전에 계산하여 적용
+- HTTP 응답은 임시 파일(일정 크기까지 메모리)에 저장 후 청크 단위로 전송
+
+사용 예:
+    with StreamingExcelWriter('out.xlsx') as writer:
+        writer.write_frame('S1_현행_2025년', df)
+"""
+
+import itertools
+import math
+import tempfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MAX_SHEET_NAME = 31
+WIDTH_PADDING = 2
+MAX_COLUMN_WIDTH = 60
+WIDTH_SAMPLE_ROWS = 200
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+
+
+def _cell(value):
+    """numpy/pandas 값 -> openpyxl 기록 가능한 파이썬 값 (NaN/inf 는 빈 셀)"""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def _text_len(value):
+    return 0 if value is None else len(str(value))
+
+
+def adjusted_widths(header, rows):
+    """열별 너비 = 최대 글자 수 + 2 (다운로드 라우트와 동일 규칙, 상한 MAX_COLUMN_WIDTH)"""
+    widths = [_text_len(h) for h in header]
+    for row in rows:
+        for i, v in enumerate(row):
+            if i >= len(widths):
+                widths.append(0)
+            n = _text_len(v)
+            if n > widths[i]:
+                widths[i] = n
+    return [min(w + WIDTH_PADDING, MAX_COLUMN_WIDTH) for w in widths]
+
+
+def frame_widths(df, index=True):
+    """DataFrame 열 너비를 열 단위 벡터 연산으로 계산"""
+    widths = []
+    if index:
+        idx = pd.Series(df.index.astype(str))
+        widths.append(max(_text_len(df.index.name), int(idx.str.len().max()) if len(idx) else 0))
+    for col in df.columns:
+        lengths = df[col].dropna().astype(str).str.len()
+        widths.append(max(_text_len(col), int(lengths.max()) if len(lengths) else 0))
+    return [min(w + WIDTH_PADDING, MAX_COLUMN_WIDTH) for w in widths]
+
+
+class StreamingExcelWriter:
+    """write-only 워크북에 시트를 순서대로 스트리밍 기록 (target: 경로 또는 파일 객체)"""
+
+    def __init__(self, target):
+        self.target = target
+        self.workbook = Workbook(write_only=True)
+        self.sheet_names = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
+
+    def _new_sheet(self, sheet_name, widths):
+        name = str(sheet_name)[:MAX_SHEET_NAME]
+        ws = self.workbook.create_sheet(title=name)
+        # write-only 시트는 행 기록 전에 열 너비를 지정해야 함
+        for i, w in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(i)].width = w
+        self.sheet_names.append(name)
+        return ws
+
+    def write_frame(self, sheet_name, df, index=True):
+        """DataFrame 1개를 시트로 기록 (to_excel(index=...) 과 같은 배치)"""
+        header = ([df.index.name or ''] if index else []) + [str(c) for c in df.columns]
+        ws = self._new_sheet(sheet_name, frame_widths(df, index))
+        ws.append(header)
+        columns = [df[c].to_numpy() for c in df.columns]
+        index_values = df.index.to_numpy()
+        for i in range(len(df)):
+            row = [_cell(col[i]) for col in columns]
+            ws.append([_cell(index_values[i])] + row if index else row)
+
+    def write_rows(self, sheet_name, header, rows):
+        """행 iterator 기록 - 앞부분 WIDTH_SAMPLE_ROWS 행만 버퍼링하여 너비 계산"""
+        rows = iter(rows)
+        sample = [[_cell(v) for v in r] for r in itertools.islice(rows, WIDTH_SAMPLE_ROWS)]
+        ws = self._new_sheet(sheet_name, adjusted_widths(header, sample))
+        ws.append(list(header))
+        for r in sample:
+            ws.append(r)
+        for r in rows:
+            ws.append([_cell(v) for v in r])
+
+    def close(self):
+        if not self.sheet_names:
+            # 빈 워크북은 저장할 수 없으므로 빈 시트 1개 추가
+            self.workbook.create_sheet(title='Sheet1')
+        self.workbook.save(self.target)
+
+
+def write_frames(target, sheets):
+    """[(시트명, DataFrame, index 여부), ...] -> 스트리밍 워크북"""
+    with StreamingExcelWriter(target) as writer:
+        for sheet_name, df, index in sheets:
+            writer.write_frame(sheet_name, df, index)
+    return target
+
+
+def stream_response(sheets, download_name):
+    """시트 목록을 Flask 스트리밍 응답(청크 전송)으로 반환"""
+    from flask import Response
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    write_frames(spool, sheets)
+    size = spool.tell()
+    spool.seek(0)
+
+    def generate():
+        try:
+            while True:
+                chunk = spool.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            spool.close()
+
+    response = Response(generate(), mimetype=XLSX_MIMETYPE, direct_passthrough=True)
+    response.headers['Content-Length'] = str(size)
+    response.headers['Content-Disposition'] = _content_disposition(download_name)
+    return response
+
+
+def _content_disposition(filename):
+    from urllib.parse import quote
+    ascii_name = filename.encode('ascii', 'ignore').decode() or 'download.xlsx'
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
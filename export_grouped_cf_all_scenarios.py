@@ -5,6 +5,7 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from 파이썬용_sgr_2027 import DataProcessor, SgrCalculator, MeiCalculator, FinalRateCalculator
+from excel_stream import StreamingExcelWriter
 
 def export_grouped_cf_full_scenarios():
     """
@@ -64,14 +65,14 @@ def export_grouped_cf_full_scenarios():
             results_s1_rate[target_year] = (group_s1_idx - 1) * 100
             results_s2_rate[target_year] = (group_s2_idx - 1) * 100
 
-        # 엑셀 저장
-        with pd.ExcelWriter(OUTPUT_FILE_PATH, engine='openpyxl') as writer:
+        # 엑셀 저장 (시트별 행 단위 스트리밍 기록)
+        with StreamingExcelWriter(OUTPUT_FILE_PATH) as writer:
             # 모델별 전 시나리오 시트 생성
             for model_name, data_dict in [('S1_현행', results_s1_rate), ('S2_개선', results_s2_rate)]:
                 # 연도별로 시트를 만들지, 하나에 합칠지 고민 -> 연도별 상세 시트
                 for year in YEAR_RANGE:
                     if year in data_dict:
-                        data_dict[year].to_excel(writer, sheet_name=f'{model_name}_{year}년')
+                        writer.write_frame(f'{model_name}_{year}년', data_dict[year])
 
             # 전 연도 추이 및 등위 요약 (평균 시나리오 기준)
             for model_name, data_dict in [('S1_현행', results_s1_rate), ('S2_개선', results_s2_rate)]:
@@ -83,8 +84,8 @@ def export_grouped_cf_full_scenarios():
                 # 등급(Rank) 계산: 각 연도별로 어떤 유형이 가장 높은지/낮은지 (높은것이 1등)
                 rank_df = summary_df.rank(ascending=False, axis=0)
                 
-                summary_df.to_excel(writer, sheet_name=f'{model_name}_평균추이')
-                rank_df.to_excel(writer, sheet_name=f'{model_name}_등위추이')
+                writer.write_frame(f'{model_name}_평균추이', summary_df)
+                writer.write_frame(f'{model_name}_등위추이', rank_df)
 
         print(f"\n✅ 유형별 통합 전 시나리오 리포트가 '{OUTPUT_FILE_PATH}' 파일로 생성되었습니다.")
         
@@ -0,0 +1,175 @@
+"""
+건강보험 재정 장기 전망 (벡터 연산, 시나리오 전개)
+- finance 시트 최근 실적(보험료수입/정부지원/기타수입/보험급여비/관리운영비/누적수지)을 기준으로
+  기준연도 다음 해부터 horizon(예: 2050)까지 전망
+- 보험료수입 증가율 가정(P개) x 환산지수 조정률 시나리오(C개)를 한 번에 계산 -> (P, C, 연도) 배열
+  수입  = 보험료수입 x (1 + 정부지원 비율 + 기타수입 비율)      (비율은 최근 실적 유지)
+  지출  = 보험급여비 x 누적(1 + 조정률) x 누적(1 + 진료량 증가율) + 관리운영비(급여비 대비 비율 유지)
+  누적수지 = 기준 누적수지 + cumsum(당기수지), 적자연도/고갈연도는 누적 스캔(argmax)으로 산출
+- 결과는 압축 배열 + 적자/고갈 연도 분포, 기존 financial_forecast 형식({연도: {...}})으로 변환 가능
+
+사용 예:
+    fc = FinancialForecast.from_finance(raw_data['df_finance'])
+    res = fc.run({'S1': 1.9, 'S2': 2.4}, premium_growth=[0.03, 0.05, 0.07], horizon=2050)
+    res.depletion_distribution()
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HORIZON = 2050
+DEFAULT_PREMIUM_GROWTH = (0.03, 0.05, 0.07)
+VOLUME_WINDOW = 5       # 진료량 증가율 = 최근 5년 (급여비 증가 / 환산지수 증가) 평균
+NO_YEAR = -1
+
+
+class ForecastResult:
+    """(보험료 가정, 조정률 시나리오, 연도) 전망 배열"""
+
+    def __init__(self, years, premium_growth, scenarios, premium, income, expenditure, acc_start):
+        self.years = np.asarray(years)
+        self.premium = premium            # (P, 1, Y) 보험료수입
+        self.premium_growth = np.asarray(premium_growth, dtype=float)
+        self.scenarios = list(scenarios)
+        self.income = income              # (P, 1, Y) 총수입 - 조정률 시나리오와 무관
+        self.expenditure = expenditure    # (1, C, Y)
+        self.net = income - expenditure   # (P, C, Y)
+        self.acc_balance = acc_start + np.cumsum(self.net, axis=-1)
+        self.first_deficit_year = self._first_year(self.net < 0)
+        self.depletion_year = self._first_year(self.acc_balance < 0)
+
+    def _first_year(self, mask):
+        hit = mask.any(axis=-1)
+        return np.where(hit, self.years[mask.argmax(axis=-1)], NO_YEAR)
+
+    def _distribution(self, first_years, label):
+        years, counts = np.unique(first_years, return_counts=True)
+        order = np.argsort(np.where(years == NO_YEAR, np.iinfo(np.int64).max, years))
+        df = pd.DataFrame({label: years[order], '경우수': counts[order]})
+        df['비율'] = df['경우수'] / first_years.size
+        df[label] = df[label].astype(object).where(df[label] != NO_YEAR, f'{int(self.years[-1])}년 이후')
+        return df
+
+    def deficit_distribution(self):
+        """첫 당기적자 연도 분포 (전체 가정 x 시나리오 조합 기준)"""
+        return self._distribution(self.first_deficit_year, '당기적자_연도')
+
+    def depletion_distribution(self):
+        """누적수지 고갈(음수 전환) 연도 분포"""
+        return self._distribution(self.depletion_year, '고갈_연도')
+
+    def summary(self):
+        """가정 x 시나리오별 고갈 연도 표"""
+        return pd.DataFrame(self.depletion_year, index=pd.Index(self.premium_growth, name='보험료증가율'),
+                            columns=self.scenarios)
+
+    def to_legacy(self, premium_index=0):
+        """기존 bulk_sgr['financial_forecast'] 형식 {시나리오: {연도: {...}}} (보험료 가정 1개 선택)"""
+        out = {}
+        for c, name in enumerate(self.scenarios):
+            out[name] = {
+                int(y): {
+                    'premium_income': round(float(self.premium[premium_index, 0, i])),
+                    'total_income': round(float(self.income[premium_index, 0, i])),
+                    'expenditure': round(float(self.expenditure[0, c, i])),
+                    'net_balance': round(float(self.net[premium_index, c, i])),
+                    'acc_balance': round(float(self.acc_balance[premium_index, c, i])),
+                    'is_deficit': bool(self.net[premium_index, c, i] < 0),
+                }
+                for i, y in enumerate(self.years)
+            }
+        return out
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.premium, self.income, self.expenditure, self.net, self.acc_balance))
+
+
+class FinancialForecast:
+    """finance 시트 기준 재정 전망기"""
+
+    def __init__(self, base_year, premium, gov_ratio, other_ratio, benefit, admin_ratio, acc_balance, volume_growth):
+        self.base_year = int(base_year)
+        self.premium = float(premium)
+        self.gov_ratio = float(gov_ratio)
+        self.other_ratio = float(other_ratio)
+        self.benefit = float(benefit)
+        self.admin_ratio = float(admin_ratio)
+        self.acc_balance = float(acc_balance)
+        self.volume_growth = float(volume_growth)
+
+    @classmethod
+    def from_finance(cls, df_finance, base_year=None, volume_window=VOLUME_WINDOW):
+        df = df_finance
+        if '연도' in df.columns:
+            df = df.set_index('연도')
+        df = df.dropna(subset=['보험료수입', '보험급여비', '누적수지'])
+        base_year = int(df.index.max()) if base_year is None else int(base_year)
+        row = df.loc[base_year]
+
+        # 진료량 증가율: 급여비 증가 중 환산지수(가격) 증가를 제외한 부분의 최근 평균
+        recent = df.loc[:base_year].tail(volume_window + 1)
+        if '환산지수_가중평균' in recent.columns:
+            volume = (recent['보험급여비'] / recent['환산지수_가중평균']).pct_change().dropna()
+        else:
+            volume = recent['보험급여비'].pct_change().dropna()
+        return cls(
+            base_year=base_year,
+            premium=row['보험료수입'],
+            gov_ratio=row['정부지원'] / row['보험료수입'],
+            other_ratio=row['기타수입'] / row['보험료수입'],
+            benefit=row['보험급여비'],
+            admin_ratio=row['관리운영비_기타지출포함'] / row['보험급여비'],
+            acc_balance=row['누적수지'],
+            volume_growth=volume.mean() if len(volume) else 0.0,
+        )
+
+    def years(self, horizon=DEFAULT_HORIZON):
+        return np.arange(self.base_year + 1, int(horizon) + 1)
+
+    def run(self, cf_scenarios, premium_growth=DEFAULT_PREMIUM_GROWTH, horizon=DEFAULT_HORIZON,
+            volume_growth=None):
+        """cf_scenarios: {시나리오명: 연 조정률(%) 또는 연도별 조정률(%) 배열/Series}
+        premium_growth: 연 보험료수입 증가율(소수) 목록 (또는 (P, 연도) 배열)"""
+        years = self.years(horizon)
+        n = len(years)
+        if n == 0:
+            raise ValueError(f"horizon({horizon}) 은 기준연도({self.base_year}) 이후여야 합니다.")
+        if not cf_scenarios:
+            raise ValueError("조정률 시나리오가 비어 있습니다.")
+        volume = self.volume_growth if volume_growth is None else float(volume_growth)
+
+        def path(v):
+            if isinstance(v, (pd.Series, dict)):
+                s = pd.Series(v, dtype=float)
+                return s.reindex(years).ffill().bfill().fillna(0.0).to_numpy()
+            arr = np.asarray(v, dtype=float)
+            if arr.ndim == 0:
+                return np.full(n, float(arr))
+            arr = arr.ravel()
+            if arr.size == 0:
+                raise ValueError("연도별 조정률 배열이 비어 있습니다.")
+            # 전망 기간보다 짧으면 마지막 값 유지 (반복하지 않음)
+            return np.concatenate([arr[:n], np.full(max(n - arr.size, 0), arr[-1])])
+
+        cf = np.array([path(v) for v in cf_scenarios.values()]) / 100.0                   # (C, Y)
+        growth = np.asarray(premium_growth, dtype=float)
+        growth = growth[:, None] * np.ones(n) if growth.ndim == 1 else growth              # (P, Y)
+
+        premium = self.premium * np.cumprod(1 + growth, axis=-1)
+        income = (premium * (1 + self.gov_ratio + self.other_ratio))[:, None, :]
+        benefit = self.benefit * np.cumprod((1 + cf) * (1 + volume), axis=-1)
+        expenditure = (benefit * (1 + self.admin_ratio))[None, :, :]
+        return ForecastResult(years, growth[:, 0], list(cf_scenarios), premium[:, None, :], income, expenditure,
+                              self.acc_balance)
+
+
+def scenarios_from_history(history, year, keys=('S1', 'S2', 'GDP', 'MEI', 'Link'), column='전체'):
+    """분석 결과 history 의 해당 연도 '전체' 조정률(%) -> 전망 시나리오 {이름: 조정률}"""
+    out = {}
+    for k in keys:
+        by_year = history.get(k) or {}
+        value = (by_year.get(year) or by_year.get(str(year)) or {}).get(column)
+        if value is not None:
+            out[k] = float(value)
+    return out
@@ -0,0 +1,223 @@
+"""
+엔진 출력 골든 파일(golden snapshot) 회귀 검증
+- run_full_analysis 결과(history / components / bulk_sgr)를 '경로 -> 숫자' 평탄화 후 압축 npz 로 저장
+  예) '2025/history/S1/2024/병원(계)', '2025/bulk_sgr/scenario_adjustments/2025/평균/S2/의원(계)'
+- 새 실행 결과와 경로 기준으로 정렬/정합 후 벡터 연산으로 허용오차 비교, 편차 큰 순서로 출력
+- 발표된 결과 워크북(xlsx)도 같은 방식으로 평탄화하여 비교 가능 ('시트/행/열')
+
+사용 예:
+    python golden_outputs.py snapshot --out golden_sgr.npz
+    python golden_outputs.py compare golden_sgr.npz
+    python golden_outputs.py compare CF_2025_검증_리포트.xlsx --against new_report.xlsx
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SEP = '/'
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 1e-9
+DEFAULT_TOP = 20
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+def flatten(obj, prefix='', keys=None, values=None):
+    """중첩 dict/list/DataFrame/Series -> (경로 리스트, 값 리스트). 숫자가 아닌 잎(leaf)은 제외"""
+    keys = [] if keys is None else keys
+    values = [] if values is None else values
+    if isinstance(obj, pd.DataFrame):
+        arr = obj.to_numpy()
+        for i, r in enumerate(obj.index):
+            for j, c in enumerate(obj.columns):
+                v = arr[i, j]
+                if _is_number(v):
+                    keys.append(f"{prefix}{r}{SEP}{c}")
+                    values.append(float(v))
+    elif isinstance(obj, pd.Series):
+        for r, v in obj.items():
+            if _is_number(v):
+                keys.append(f"{prefix}{r}")
+                values.append(float(v))
+    elif isinstance(obj, dict):
+        for k, v in obj.items():
+            flatten(v, f"{prefix}{k}{SEP}", keys, values)
+    elif isinstance(obj, (list, tuple)):
+        for i, v in enumerate(obj):
+            flatten(v, f"{prefix}{i}{SEP}", keys, values)
+    elif isinstance(obj, np.ndarray):
+        for i, v in enumerate(obj.ravel()):
+            if _is_number(v):
+                keys.append(f"{prefix}{i}")
+                values.append(float(v))
+    elif _is_number(obj):
+        keys.append(prefix.rstrip(SEP))
+        values.append(float(obj))
+    return keys, values
+
+
+def flatten_analysis(results_by_year):
+    """{target_year: (history, components, bulk_sgr)} -> 정렬된 (keys ndarray, values ndarray)"""
+    keys, values = [], []
+    for year, (history, components, bulk_sgr) in sorted(results_by_year.items()):
+        flatten({'history': history, 'components': components, 'bulk_sgr': bulk_sgr},
+                f"{year}{SEP}", keys, values)
+    return _sorted_arrays(keys, values)
+
+
+def flatten_workbook(path):
+    """발표 결과 워크북의 숫자 셀 -> '시트/행/열' 경로"""
+    keys, values = [], []
+    for sheet, df in pd.read_excel(path, sheet_name=None, header=None).items():
+        arr = df.to_numpy()
+        rows, cols = np.nonzero(pd.notna(df).to_numpy())
+        for r, c in zip(rows, cols):
+            v = arr[r, c]
+            if _is_number(v):
+                keys.append(f"{sheet}{SEP}{r}{SEP}{c}")
+                values.append(float(v))
+    return _sorted_arrays(keys, values)
+
+
+def _sorted_arrays(keys, values):
+    k = np.asarray(keys, dtype=str)
+    v = np.asarray(values, dtype=np.float64)
+    order = np.argsort(k, kind='stable')
+    k, v = k[order], v[order]
+    # 중복 경로는 마지막 값 유지
+    if len(k):
+        last = np.append(k[1:] != k[:-1], True)
+        k, v = k[last], v[last]
+    return k, v
+
+
+def save_golden(path, keys, values, meta=None):
+    np.savez_compressed(path, keys=keys, values=values,
+                        meta=np.asarray(repr(meta or {}), dtype=str))
+
+
+def load_golden(path):
+    if str(path).lower().endswith('.xlsx'):
+        return flatten_workbook(path)
+    with np.load(path, allow_pickle=False) as z:
+        return z['keys'], z['values']
+
+
+def compare(golden, current, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    """두 (keys, values) 비교 -> dict(통계, 편차 순위 DataFrame, 누락/추가 경로)
+
+    경로 정렬 후 교집합을 searchsorted 로 정합하고, 허용오차 검사는 배열 단위로 수행.
+    NaN 은 양쪽 모두 NaN 이면 동일로 간주.
+    """
+    g_keys, g_vals = golden
+    c_keys, c_vals = current
+
+    pos = np.searchsorted(c_keys, g_keys)
+    pos_clipped = np.minimum(pos, max(len(c_keys) - 1, 0))
+    found = (pos < len(c_keys)) & (c_keys[pos_clipped] == g_keys) if len(c_keys) else np.zeros(len(g_keys), bool)
+
+    keys = g_keys[found]
+    expected = g_vals[found]
+    actual = c_vals[pos_clipped[found]]
+
+    both_nan = np.isnan(expected) & np.isnan(actual)
+    close = np.isclose(actual, expected, rtol=rtol, atol=atol) | both_nan
+    abs_diff = np.where(both_nan, 0.0, np.abs(actual - expected))
+    abs_diff = np.where(np.isnan(abs_diff), np.inf, abs_diff)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel_diff = np.where(expected != 0, abs_diff / np.abs(expected), np.where(abs_diff == 0, 0.0, np.inf))
+
+    bad = np.flatnonzero(~close)
+    ranked = bad[np.argsort(-abs_diff[bad], kind='stable')]
+    deviations = pd.DataFrame({
+        'path': keys[ranked],
+        'golden': expected[ranked],
+        'current': actual[ranked],
+        'abs_diff': abs_diff[ranked],
+        'rel_diff': rel_diff[ranked],
+    })
+
+    matched = np.zeros(len(c_keys), dtype=bool)
+    matched[pos_clipped[found]] = True
+    return {
+        'compared': int(found.sum()),
+        'mismatched': int(len(bad)),
+        'max_abs_diff': float(abs_diff.max()) if len(abs_diff) else 0.0,
+        'missing': g_keys[~found].tolist(),
+        'added': c_keys[~matched].tolist(),
+        'deviations': deviations,
+    }
+
+
+def print_comparison(result, top=DEFAULT_TOP):
+    print(f"[INFO] 비교 항목: {result['compared']:,}  불일치: {result['mismatched']:,}  "
+          f"최대 절대편차: {result['max_abs_diff']:.3g}")
+    if result['missing']:
+        print(f"[WARN] 골든에만 있는 경로 {len(result['missing'])}개 (예: {result['missing'][:3]})")
+    if result['added']:
+        print(f"[WARN] 새 결과에만 있는 경로 {len(result['added'])}개 (예: {result['added'][:3]})")
+    if result['mismatched']:
+        print(f"\n{'rank':>4}  {'abs_diff':>12}{'rel_diff':>12}{'golden':>16}{'current':>16}  path")
+        for i, row in enumerate(result['deviations'].head(top).itertuples(index=False), 1):
+            print(f"{i:>4}  {row.abs_diff:>12.4g}{row.rel_diff:>12.4g}{row.golden:>16.8g}{row.current:>16.8g}  {row.path}")
+
+
+def is_identical(result):
+    return result['mismatched'] == 0 and not result['missing'] and not result['added']
+
+
+def run_engine(data_file, years):
+    sys.path.append(os.getcwd())
+    from 파이썬용_sgr_2027 import DataProcessor
+    from analysis_cache import compute_analysis
+    raw_data = DataProcessor(data_file).raw_data
+    return {y: compute_analysis(raw_data, y) for y in years}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SGR 엔진 출력 골든 파일 회귀 검증')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    snap = sub.add_parser('snapshot', help='현재 엔진 출력을 골든 파일로 저장')
+    snap.add_argument('--out', default='golden_sgr.npz')
+
+    cmp_ = sub.add_parser('compare', help='골든 파일(npz/xlsx)과 비교')
+    cmp_.add_argument('golden')
+    cmp_.add_argument('--against', help='비교 대상 npz/xlsx (없으면 엔진 재실행)')
+    cmp_.add_argument('--rtol', type=float, default=DEFAULT_RTOL)
+    cmp_.add_argument('--atol', type=float, default=DEFAULT_ATOL)
+    cmp_.add_argument('--top', type=int, default=DEFAULT_TOP)
+
+    for p in (snap, cmp_):
+        p.add_argument('--data', default='SGR_data.xlsx')
+        p.add_argument('--years', type=int, nargs='*', default=[2024, 2025, 2026, 2027, 2028])
+    args = parser.parse_args(argv)
+
+    if args.command == 'snapshot':
+        keys, values = flatten_analysis(run_engine(args.data, args.years))
+        save_golden(args.out, keys, values, {'data': args.data, 'years': args.years})
+        print(f"[SUCCESS] {args.out} 저장: {len(keys):,}개 값 ({os.path.getsize(args.out) / 1024:.0f} KB)")
+        return 0
+
+    golden = load_golden(args.golden)
+    current = load_golden(args.against) if args.against else flatten_analysis(run_engine(args.data, args.years))
+    start = time.perf_counter()
+    result = compare(golden, current, args.rtol, args.atol)
+    print_comparison(result, args.top)
+    print(f"[INFO] 비교 시간: {(time.perf_counter() - start) * 1000:.1f} ms")
+    if is_identical(result):
+        print("[SUCCESS] 골든 출력과 동일")
+        return 0
+    print("[ERROR] 골든 출력과 다름")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+슬라이더 기반 실시간 시뮬레이션 세션 (WebSocket 채널용)
+- 클라이언트가 보내는 수정값(override) 스트림을 누적하고, 짧은 구간의 연속 입력은 하나로 병합
+- 새 입력이 들어오면 이전 계산은 폐기(superseded)되고 최신 상태만 계산
+- 이전 결과와 비교한 변경분(diff)만 전송, 동일 수정값 조합은 세션 캐시에서 즉시 응답
+- 직전 엔진의 중간 결과(MEI 지수 / SGR 구성요소 / PAF 캐시)를 수정값이 닿지 않는 계산기에 한해 다음 계산에 재사용
+"""
+
+import json
+import threading
+import time
+
+from analysis_cache import AnalysisCache, ENGINE_OTHER_STAGE, build_engine
+from metrics import timed_stage
+from result_store import data_fingerprint, overrides_fingerprint
+
+COALESCE_SECONDS = 0.08
+SESSION_CACHE_ENTRIES = 32
+# 삭제된 키 표시 (값이 None 으로 바뀐 경우와 구분, main.js applyAnalysisChanges 와 동일)
+REMOVED = {'__removed__': True}
+
+# 엔진 계산기별 연도 캐시와 입력 수정값 필드 (파이썬용_sgr_2027 CalculationEngine._apply_overrides 기준)
+ENGINE_CACHES = {
+    'mei_calc': ('_cache',),                                 # df_raw_mei_inf, df_weights
+    'sgr_calc': ('_comp_cache', '_s1_cache', '_s2_cache'),  # df_expenditure, df_gdp, df_pop, df_sgr_law, df_sgr_reval
+}
+MEI_FIELDS = ('I1', 'I2', 'I3', 'M1', 'M2', 'Z1', 'Z2')
+
+
+def affected_calculators(keys):
+    """수정값 키 -> 입력이 바뀌는 엔진 계산기 이름 집합 (상대가치 RV_ 는 계산기 입력이 아님)"""
+    out = set()
+    for key in keys:
+        key = key.strip()
+        if key.startswith('WEIGHT_') or key.rsplit('_', 1)[0] in MEI_FIELDS:
+            out.add('mei_calc')
+        elif not key.startswith('RV_'):
+            out.add('sgr_calc')
+    return out
+
+
+def reuse_engine_caches(prev, engine, changed_keys):
+    """바뀐 수정값이 닿지 않는 계산기의 연도별 캐시를 새 엔진으로 복사 -> 재사용한 계산기 이름 목록"""
+    stale = affected_calculators(changed_keys)
+    reused = []
+    for calc, attrs in ENGINE_CACHES.items():
+        if calc in stale:
+            continue
+        src, dst = getattr(prev, calc, None), getattr(engine, calc, None)
+        if src is None or dst is None or not all(hasattr(src, a) for a in attrs):
+            continue
+        for a in attrs:
+            setattr(dst, a, dict(getattr(src, a)))
+        reused.append(calc)
+    return reused
+
+
+_UNCHANGED = object()
+
+
+def _diff(prev, new):
+    if isinstance(prev, dict) and isinstance(new, dict):
+        changes = {}
+        for k, v in new.items():
+            sub = v if k not in prev else _diff(prev[k], v)
+            if sub is not _UNCHANGED:
+                changes[k] = sub
+        for k in prev:
+            if k not in new:
+                changes[k] = REMOVED
+        return changes or _UNCHANGED
+    return _UNCHANGED if prev == new else new
+
+
+def diff_tree(prev, new):
+    """JSON 호환 트리 간 변경분. 변경 없으면 None, 삭제된 키는 REMOVED (값이 None 으로 바뀌면 None)"""
+    changes = _diff(prev, new)
+    return None if changes is _UNCHANGED else changes
+
+
+class LiveSimulationSession:
+    """WebSocket 연결 1개에 대응하는 시뮬레이션 상태"""
+
+    def __init__(self, raw_data_fn, send_fn, serialize_fn, target_year=2025, base_analysis_fn=None):
+        self.raw_data_fn = raw_data_fn      # raw_data_fn(대상연도) -> 원시자료 (자료 범위 밖 연도는 전망 포함)
+        self.send_fn = send_fn
+        self.serialize_fn = serialize_fn
+        self.target_year = target_year
+        # 수정값이 없을 때는 서버 공용 캐시 결과를 사용
+        self.base_analysis_fn = base_analysis_fn
+        self.overrides = {}
+        self.cache = AnalysisCache(max_entries=SESSION_CACHE_ENTRIES)
+        self._engine = None       # 직전 계산 (원시자료 지문, 수정값, 엔진) - 중간 결과 재사용
+        self.reused = []          # 직전 계산에서 재사용한 계산기
+
+        self._generation = 0
+        self._last_sent = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='sgr-live-sim', daemon=True)
+        self._worker.start()
+
+    # --- 입력 ---
+    def handle_message(self, message):
+        msg = json.loads(message) if isinstance(message, str) else message
+        kind = msg.get('type', 'edit')
+        with self._cond:
+            if kind == 'edit':
+                for key, value in (msg.get('overrides') or {}).items():
+                    if value is None:
+                        self.overrides.pop(key, None)
+                    else:
+                        self.overrides[key] = value
+            elif kind == 'replace':
+                self.overrides = dict(msg.get('overrides') or {})
+            elif kind == 'reset':
+                self.overrides = {}
+            elif kind == 'set_year':
+                self.target_year = int(msg['year'])
+                self._last_sent = None
+            else:
+                return
+            self._generation += 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    # --- 계산 루프 ---
+    def _is_current(self, generation):
+        with self._cond:
+            return generation == self._generation and not self._closed
+
+    def _analysis_for(self, overrides, target_year):
+        if not overrides and self.base_analysis_fn is not None:
+            return self.base_analysis_fn(target_year)
+        key = (target_year, overrides_fingerprint(overrides))
+        return self.cache.get_or_compute(key, lambda: self._compute(overrides, target_year))
+
+    def _compute(self, overrides, target_year):
+        """직전 엔진과 수정값 차이를 비교해 영향 없는 계산기 캐시를 이어받은 뒤 run_full_analysis"""
+        raw_data = self.raw_data_fn(target_year)
+        data_hash = data_fingerprint(raw_data)
+        # 엔진은 build_engine 이 만든 복사본에만 수정값을 기록하므로 이전 수정값이 raw_data 에 남지 않음
+        engine = build_engine(raw_data, overrides)
+        prev = self._engine
+        self.reused = []
+        # 서버 원시자료 내용이 바뀌면(저장/재로드/연도별 전망) 재사용하지 않음
+        if prev is not None and prev[0] == data_hash:
+            changed = {k for k in set(prev[1]) | set(overrides) if prev[1].get(k) != overrides.get(k)}
+            self.reused = reuse_engine_caches(prev[2], engine, changed)
+        with timed_stage('run_full_analysis', remainder=ENGINE_OTHER_STAGE):
+            result = engine.run_full_analysis(target_year=target_year)
+        self._engine = (data_hash, dict(overrides), engine)
+        return result
+
+    def _send(self, text):
+        """전송 실패(연결 끊김 등) 시 세션 종료 -> False"""
+        try:
+            self.send_fn(text)
+            return True
+        except Exception as e:
+            print(f"[WARN] Live simulation send failed, closing session: {e}")
+            self.close()
+            return False
+
+    def _run(self):
+        handled = 0
+        while True:
+            with self._cond:
+                while self._generation == handled and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+            # 연속 입력 병합: 입력이 잠잠해질 때까지 대기
+            while True:
+                with self._cond:
+                    seen = self._generation
+                time.sleep(COALESCE_SECONDS)
+                with self._cond:
+                    if self._generation == seen:
+                        break
+
+            with self._cond:
+                generation = self._generation
+                overrides = dict(self.overrides)
+                target_year = self.target_year
+            handled = generation
+
+            start = time.time()
+            try:
+                history, components, bulk_sgr = self._analysis_for(overrides, target_year)
+            except Exception as e:
+                if self._is_current(generation) and \
+                        not self._send(json.dumps({'type': 'error', 'seq': generation, 'error': str(e)})):
+                    return
+                continue
+
+            # 계산 도중 새 입력이 오면 이 결과는 폐기
+            if not self._is_current(generation):
+                continue
+
+            payload = self.serialize_fn({'history': history, 'components': components, 'bulk_sgr': bulk_sgr})
+            if self._last_sent is None:
+                message = {'type': 'result', 'full': True, 'analysis_data': payload}
+            else:
+                message = {'type': 'result', 'full': False, 'changes': diff_tree(self._last_sent, payload) or {}}
+            self._last_sent = payload
+            message.update({
+                'seq': generation,
+                'year': target_year,
+                'elapsed_ms': round((time.time() - start) * 1000, 1),
+            })
+            if not self._send(json.dumps(message, ensure_ascii=False)):
+                return
+
+
+def serve_websocket(ws, raw_data_fn, serialize_fn, base_analysis_fn=None):
+    """flask-sock 연결 핸들러: 메시지를 세션으로 전달하고 결과를 push"""
+    send_lock = threading.Lock()
+
+    def send(text):
+        with send_lock:
+            ws.send(text)
+
+    session = LiveSimulationSession(raw_data_fn, send, serialize_fn, base_analysis_fn=base_analysis_fn)
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            try:
+                session.handle_message(message)
+            except (ValueError, KeyError) as e:
+                send(json.dumps({'type': 'error', 'error': f'Invalid message: {e}'}))
+    finally:
+        session.close()
@@ -0,0 +1,153 @@
+"""
+거시지표 연계 모형 벡터 연산 엔진
+- 산식: MEI 가 GDP 를 초과하면 GDP + 계수 x (MEI - GDP), 아니면 GDP  (기본 계수 1/3)
+- 연도 x 종별 x 시나리오(16개 MEI 조합 + 평균/최대/최소/중위수) 블록 전체를 np.where 한 번으로 계산
+- 계수(coef)와 적용 기준(threshold, rule)은 인자. 계수 배열을 넘기면 브로드캐스트로 한 번에 민감도 계산
+  예) coefs = np.linspace(0, 1, 100) -> 결과 shape (100, 연도, 종별, 시나리오)
+
+calculate_macro_link_history.py 의 연도별 루프 + df.map(link_formula) 와 같은 결과.
+
+사용 예:
+    model = MacroLinkModel(df_inf, df_weights, df_gdp, df_rv)
+    cf = model.cf(range(2020, 2028))                        # (연도, 종별, 시나리오), % 단위
+    sweep = model.cf(range(2020, 2028), coef=np.linspace(0, 1, 100))
+    df10 = model.to_frame(cf, range(2020, 2028))             # 연도/종별 long 형식
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_COEF = 1 / 3
+DATA_LAG = 2          # 적용연도 = 자료연도 + 2
+LABOR_SPAN = 3        # 인건비: (year / year-3) ** (1/3)
+STAT_COLUMNS = ['평균', '최대', '최소', '중위수']
+COST_TYPES = ('인건비', '관리비', '재료비')
+RULES = ('excess', 'symmetric')
+
+
+def link_rates(mei, gdp, coef=DEFAULT_COEF, threshold=0.0, rule='excess'):
+    """MEI 증가율 블록 + GDP 증가율 -> 연계 증가율
+
+    mei: (연도, ...) 배열, gdp: (연도,) 또는 mei 와 브로드캐스트 가능한 배열
+    coef: 스칼라 또는 1차원 배열 (배열이면 결과 앞에 계수 축 추가)
+    rule='excess': MEI - GDP > threshold 일 때만 연계, 'symmetric': 항상 GDP + coef x (MEI - GDP)
+    """
+    if rule not in RULES:
+        raise ValueError(f"rule must be one of {RULES}: {rule}")
+    mei = np.asarray(mei, dtype=float)
+    gdp = np.asarray(gdp, dtype=float)
+    if gdp.ndim and gdp.ndim < mei.ndim:
+        gdp = gdp.reshape(gdp.shape + (1,) * (mei.ndim - gdp.ndim))
+    coef = np.asarray(coef, dtype=float)
+    if coef.ndim:
+        coef = coef.reshape(coef.shape + (1,) * mei.ndim)
+
+    gap = mei - gdp
+    linked = gdp + coef * gap
+    if rule == 'symmetric':
+        return linked
+    # NaN 비교는 False -> GDP (기존 link_formula 와 동일)
+    return np.where(gap > threshold, linked, np.broadcast_to(gdp, linked.shape))
+
+
+def mei_rates(labor, mgmt, material, weights):
+    """인건비/관리비/재료비 증가율 (..., 연도, 변형 수) + 비용구조 (..., 종별, 3) -> (..., 연도, 종별, I x M x Z 시나리오)
+    앞쪽 축(배치)은 브로드캐스트 -> 입력 교란 묶음도 한 번에 계산"""
+    w = np.asarray(weights, dtype=float)[..., None, :, :, None, None, None]
+    mei = (w[..., 0, :, :, :] * labor[..., :, None, :, None, None]
+           + w[..., 1, :, :, :] * mgmt[..., :, None, None, :, None]
+           + w[..., 2, :, :, :] * material[..., :, None, None, None, :])
+    return mei.reshape(mei.shape[:-3] + (-1,))
+
+
+def scenario_stats(block):
+    """시나리오 축(마지막 축) 통계 - pandas mean/max/min/median(skipna) 과 동일"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.stack([np.nanmean(block, axis=-1), np.nanmax(block, axis=-1),
+                         np.nanmin(block, axis=-1), np.nanmedian(block, axis=-1)], axis=-1)
+
+
+class MacroLinkModel:
+    """자료(물가/비용구조/GDP/상대가치) -> 거시지표 연계 조정률 블록"""
+
+    def __init__(self, df_inf, df_weights, df_gdp, df_rv, lag=DATA_LAG):
+        self.df_inf = df_inf
+        self.df_weights = df_weights
+        self.df_gdp = df_gdp
+        self.df_rv = df_rv
+        self.lag = lag
+        self.types = list(df_weights.index)
+        self.I_cols = [c for c in df_inf.columns if '인건비' in str(c)]
+        self.M_cols = [c for c in df_inf.columns if '관리비' in str(c)]
+        self.Z_cols = [c for c in df_inf.columns if '재료비' in str(c)]
+        self.scenarios = [f"I{i.split('_')[-1]}M{m.split('_')[-1]}Z{z.split('_')[-1]}"
+                          for i in self.I_cols for m in self.M_cols for z in self.Z_cols]
+        self.columns = self.scenarios + STAT_COLUMNS
+        self._inputs = {}
+
+    def _rows(self, df, years, columns=None):
+        out = df.reindex(index=years)
+        if columns is not None:
+            out = out.reindex(columns=columns)
+        return out.to_numpy(dtype=float)
+
+    def valid_years(self, target_years):
+        """기존 스크립트에서 KeyError 로 건너뛰던 연도 제외 (자료연도/전년/3년전 행 필요)"""
+        inf_idx, gdp_idx = set(self.df_inf.index), set(self.df_gdp.index)
+        return [ty for ty in target_years
+                if {ty - self.lag, ty - self.lag - 1, ty - self.lag - LABOR_SPAN} <= inf_idx
+                and {ty - self.lag, ty - self.lag - 1} <= gdp_idx]
+
+    def inputs(self, target_years):
+        """(MEI 증가율 블록 (연도, 종별, 시나리오+통계), GDP 증가율 (연도,), RV 조정 (연도, 종별))"""
+        key = tuple(target_years)
+        if key in self._inputs:
+            return self._inputs[key]
+        dy = np.asarray(target_years) - self.lag
+
+        labor = (self._rows(self.df_inf, dy, self.I_cols) /
+                 self._rows(self.df_inf, dy - LABOR_SPAN, self.I_cols)) ** (1 / LABOR_SPAN) - 1
+        raw = self._rows(self.df_inf, dy) / self._rows(self.df_inf, dy - 1) - 1
+        cols = list(self.df_inf.columns)
+        mgmt = raw[:, [cols.index(c) for c in self.M_cols]]
+        material = raw[:, [cols.index(c) for c in self.Z_cols]]
+
+        weights = self.df_weights[list(COST_TYPES)].to_numpy(dtype=float)
+        mei = mei_rates(labor, mgmt, material, weights)                      # (연도, 종별, 시나리오)
+        mei = np.concatenate([mei, scenario_stats(mei)], axis=-1)
+
+        gdp_col = self.df_gdp['실질GDP']
+        gdp = gdp_col.reindex(dy).to_numpy(dtype=float) / gdp_col.reindex(dy - 1).to_numpy(dtype=float) - 1
+
+        # 상대가치 자료연도가 없으면 조정 0, 종별이 없으면 NaN (기존 스크립트와 동일)
+        rv = self.df_rv.reindex(columns=self.types).reindex(index=dy).to_numpy(dtype=float) - 1
+        rv[~np.isin(dy, self.df_rv.index)] = 0.0
+
+        self._inputs[key] = (mei, gdp, rv)
+        return self._inputs[key]
+
+    def cf(self, target_years, coef=DEFAULT_COEF, threshold=0.0, rule='excess'):
+        """조정률(%) = (연계 증가율 - 상대가치 변화) x 100 -> ([계수,] 연도, 종별, 시나리오)"""
+        mei, gdp, rv = self.inputs(list(target_years))
+        return (link_rates(mei, gdp, coef, threshold, rule) - rv[..., None]) * 100
+
+    def to_frame(self, block, target_years, types=None, label='종별', row_labels=None):
+        """(연도, 종별, 시나리오) 블록 -> 연도/종별 long 형식 DataFrame (스크립트 출력 형식)
+        row_labels: 블록 두 번째 축의 라벨 (기본 self.types, 유형 집계 블록은 그룹명)"""
+        target_years = list(target_years)
+        row_labels = list(row_labels or self.types)
+        types = types or row_labels
+        pos = [row_labels.index(t) if t in row_labels else None for t in types]
+        frames = []
+        for i, ty in enumerate(target_years):
+            rows = np.array([block[i, p] if p is not None else np.full(block.shape[-1], np.nan) for p in pos])
+            df = pd.DataFrame(rows, index=types, columns=self.columns)
+            df.insert(0, label, types)
+            df.insert(0, '연도', ty)
+            frames.append(df.reset_index(drop=True))
+        if not frames:
+            return pd.DataFrame(columns=['연도', label] + self.columns)
+        return pd.concat(frames, ignore_index=True)
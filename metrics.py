@@ -0,0 +1,279 @@
+"""
+Prometheus 텍스트 형식 메트릭 (/metrics)
+- 라우트별 요청 지연 히스토그램, 처리 중 요청 수(in-flight), 상태 코드별 요청 수
+- 엔진 단계별 소요 시간 히스토그램 (run_full_analysis 및 MEI/SGR/PAF/최종 조정률 세부 단계)
+- 결과 캐시 적중률은 수집(scrape) 시점에 콜백으로 계산
+- 외부 라이브러리 없이 요청당 락 1회 + bisect 수준의 비용
+"""
+
+import bisect
+import functools
+import threading
+import time
+
+# 초 단위 (Prometheus 기본 버킷 + 장시간 분석용 상한 확장)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, '')) for n in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f'{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}'
+                                for k, v in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 버킷별 개수(누적 아님) + 합계 + 전체 개수
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = [(k, (list(s[0]), s[1], s[2])) for k, s in self._values.items()]
+        lines = self.header()
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float('inf'),), counts):
+                cumulative += c
+                le = 'le="{}"'.format(_format_value(bound) if bound != float('inf') else '+Inf')
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {n}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn):
+        """수집 시점 콜백: fn() -> [Metric, ...] (캐시 통계처럼 외부 상태를 읽는 값)"""
+        self._collectors.append(fn)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            try:
+                for metric in fn():
+                    lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f'# collector error: {_escape(e)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'sgr_http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method')))
+REQUESTS_TOTAL = registry.register(Counter(
+    'sgr_http_requests_total', 'HTTP requests by route and status', ('route', 'method', 'status')))
+IN_FLIGHT = registry.register(Gauge(
+    'sgr_http_requests_in_flight', 'Requests currently being processed', ('route',)))
+STAGE_DURATION = registry.register(Histogram(
+    'sgr_engine_stage_duration_seconds', 'Calculation engine stage duration', ('stage',)))
+
+
+def observe_stage(stage, seconds):
+    STAGE_DURATION.observe(seconds, stage=stage)
+
+
+# 스레드별 세부 단계 측정 상태: totals(바깥 timed_stage 범위의 단계별 합계), stack(진행 중 단계)
+_stage_scope = threading.local()
+
+
+class timed_stage:
+    """with timed_stage('run_full_analysis', remainder='engine_other'): ... -> 엔진 단계 히스토그램 기록
+    - 범위 안에서 stage_timer 로 감싼 세부 단계는 호출마다가 아니라 단계별 합계로 1회씩 기록
+    - remainder: 전체 시간에서 세부 단계(자기 시간)를 뺀 나머지를 기록할 단계 이름
+    """
+
+    def __init__(self, stage, remainder=None):
+        self.stage = stage
+        self.remainder = remainder
+
+    def __enter__(self):
+        self.totals = None
+        if getattr(_stage_scope, 'totals', None) is None:
+            self.totals = _stage_scope.totals = {}
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        observe_stage(self.stage, elapsed)
+        if self.totals is not None:
+            _stage_scope.totals = None
+            for stage, seconds in self.totals.items():
+                observe_stage(stage, seconds)
+            if self.remainder and self.totals:
+                observe_stage(self.remainder, max(elapsed - sum(self.totals.values()), 0.0))
+        return False
+
+
+def stage_timer(stage, fn):
+    """fn 호출 시간을 세부 단계 stage 로 누적 (자기 시간 기준: 다른 단계 호출 시간은 제외,
+    같은 단계의 중첩/재귀 호출은 가장 바깥 호출만 측정)"""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        stack = getattr(_stage_scope, 'stack', None)
+        if stack is None:
+            stack = _stage_scope.stack = []
+        if any(frame[0] == stage for frame in stack):
+            return fn(*args, **kwargs)
+        frame = [stage, 0.0]            # [단계, 하위 단계 시간]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            own = elapsed - frame[1]
+            totals = getattr(_stage_scope, 'totals', None)
+            if totals is None:
+                observe_stage(stage, own)
+            else:
+                totals[stage] = totals.get(stage, 0.0) + own
+    wrapper.__sgr_stage__ = stage
+    return wrapper
+
+
+def instrument_stages(stage_methods):
+    """{단계: [(클래스, 메서드명), ...]} -> 메서드를 stage_timer 로 교체 (이미 교체된 메서드는 건너뜀)"""
+    for stage, methods in stage_methods.items():
+        for cls, attr in methods:
+            fn = vars(cls).get(attr)
+            if fn is None or getattr(fn, '__sgr_stage__', None):
+                continue
+            setattr(cls, attr, stage_timer(stage, fn))
+
+
+def cache_collector(caches):
+    """caches: {이름: stats() 를 가진 객체} -> 적중/미스/적중률 메트릭"""
+    def collect():
+        hits = Counter('sgr_cache_hits_total', 'Result cache hits', ('cache',))
+        misses = Counter('sgr_cache_misses_total', 'Result cache misses', ('cache',))
+        ratio = Gauge('sgr_cache_hit_ratio', 'Result cache hit ratio', ('cache',))
+        entries = Gauge('sgr_cache_entries', 'Entries held in the result cache', ('cache',))
+        for name, cache in caches.items():
+            s = cache.stats()
+            hits.inc(s.get('hits', 0), cache=name)
+            misses.inc(s.get('misses', 0), cache=name)
+            ratio.set(s.get('hit_ratio', 0.0), cache=name)
+            if 'entries' in s:
+                entries.set(s['entries'], cache=name)
+        return [hits, misses, ratio, entries]
+    return collect
+
+
+def install(app):
+    """Flask app 에 요청 계측 훅 등록 (중복 등록 방지)"""
+    from flask import g, request
+
+    if app.extensions.get('sgr_metrics'):
+        return
+    app.extensions['sgr_metrics'] = True
+
+    def _route():
+        rule = request.url_rule
+        return rule.rule if rule is not None else 'unmatched'
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+        g._metrics_route = _route()
+        IN_FLIGHT.inc(route=g._metrics_route)
+
+    @app.after_request
+    def _metrics_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_end(exc):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return
+        route = g.pop('_metrics_route', 'unmatched')
+        status = g.pop('_metrics_status', 500)
+        IN_FLIGHT.dec(route=route)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, route=route, method=request.method)
+        REQUESTS_TOTAL.inc(route=route, method=request.method, status=status)
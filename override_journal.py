@@ -0,0 +1,334 @@
+"""
+수정값(override) 저널 + 셀 좌표 인덱스 + 백그라운드 압축(compaction)
+- 저장 요청은 저널 파일(JSON Lines)에 추가 후 fsync 하고 즉시 반환, 메모리 원시자료에는 바로 반영
+- (시트, 행 라벨(연도), 열 이름) -> 셀 좌표 인덱스를 워크북 로드 시 한 번만 구성 (행/열 탐색 반복 제거)
+- 백그라운드 스레드가 누적된 수정값을 워크북에 기록: 임시 파일 저장 후 원자적 교체(os.replace),
+  교체가 끝난 항목만 저널에서 제거 -> 기록 도중 프로세스가 종료돼도 다음 시작 시 저널 재적용
+- 워크북에 없는 셀(예: 의원(계)_2023)은 저장 시점에 거부. 이후 워크북이 바뀌어 못 찾는 셀은 저널에 남기고
+  status()['unresolved'] 로 보고
+- 압축(워크북 교체)과 on_compacted(재로드)는 같은 기록 락 안에서 실행 -> 재로드 도중 다음 압축이 끼어들지 않음
+
+수정값 키 형식 (main.js saveAllToExcelFile 과 동일):
+    I1_2025 / M2_2025 / Z1_2025    -> factor_pd   (인건비_1 / 관리비_2 / 재료비_1)
+    GDP_2025 / POP_2025            -> GDP         (실질GDP / 영안인구)
+    NHI_POP_2025                   -> pop         (건보대상자수)
+    LAW_{종별}_2025 / RV_{종별}_2025 / CF_{종별}_2025 -> law / rvs / cf_t
+    RATE_{종별}_2025               -> Sheet1      (급여율)
+    WEIGHT_{종별}_{비용유형}        -> cost_structure (행: 비용유형, 열: 종별)
+    {종별}_2025                    -> expenditure_real
+"""
+
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+from openpyxl import load_workbook
+
+COMPACT_DELAY_SECONDS = 1.0
+WORKER_IDLE_SECONDS = 30.0   # 대기 요청이 없으면 압축 스레드 종료 (다음 저장 시 재시작)
+
+MEI_CODES = {'I': '인건비', 'M': '관리비', 'Z': '재료비'}
+
+# 워크북 시트명 -> raw_data 키
+SHEET_KEYS = {
+    'expenditure_real': 'df_expenditure',
+    'cost_structure': 'df_weights',
+    'factor_pd': 'df_raw_mei_inf',
+    'GDP': 'df_gdp',
+    'pop': 'df_pop',
+    'cf_t': 'df_sgr_reval',
+    'law': 'df_sgr_law',
+    'rvs': 'df_rel_value',
+    'Sheet1': 'df_rate_py',
+}
+
+_PREFIXED = (
+    ('NHI_POP_', 'pop', '건보대상자수'),
+    ('GDP_', 'GDP', '실질GDP'),
+    ('POP_', 'GDP', '영안인구'),
+)
+_TYPED = (
+    ('LAW_', 'law'),
+    ('RV_', 'rvs'),
+    ('CF_', 'cf_t'),
+    ('RATE_', 'Sheet1'),
+)
+
+
+def _year(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_override_key(key):
+    """수정값 키 -> (시트명, 행 라벨, 열 이름). 해석 불가 시 None"""
+    key = str(key).strip()
+    for prefix, sheet, column in _PREFIXED:
+        if key.startswith(prefix):
+            year = _year(key[len(prefix):])
+            return (sheet, year, column) if year is not None else None
+    if key.startswith('WEIGHT_'):
+        htype, _, cost = key[len('WEIGHT_'):].rpartition('_')
+        return ('cost_structure', cost, htype) if htype and cost else None
+    for prefix, sheet in _TYPED:
+        if key.startswith(prefix):
+            htype, _, year = key[len(prefix):].rpartition('_')
+            year = _year(year)
+            return (sheet, year, htype) if htype and year is not None else None
+    head, _, year = key.rpartition('_')
+    year = _year(year)
+    if year is None or not head:
+        return None
+    if len(head) >= 2 and head[0] in MEI_CODES and head[1:].isdigit():
+        return ('factor_pd', year, f"{MEI_CODES[head[0]]}_{head[1:]}")
+    return ('expenditure_real', year, head)
+
+
+def _label(value):
+    """셀 값 -> 인덱스 라벨 (연도는 int 로 통일)"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return value.strip() if isinstance(value, str) else value
+
+
+class CellIndex:
+    """(시트, 행 라벨, 열 이름) -> (row, col) 1-based 좌표. 워크북 파일이 바뀌면 재구성"""
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = None
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def _build(self):
+        cells = {}
+        wb = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                rows = ws.iter_rows(values_only=True)
+                header = next(rows, None)
+                if not header:
+                    continue
+                col_idx = {_label(h): j for j, h in enumerate(header, 1) if h is not None and j > 1}
+                row_idx = {}
+                for i, row in enumerate(rows, 2):
+                    if row and row[0] is not None:
+                        row_idx.setdefault(_label(row[0]), i)
+                cells[ws.title] = (row_idx, col_idx)
+        finally:
+            wb.close()
+        return cells
+
+    def refresh(self):
+        with self._lock:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp != self._stamp:
+                self._cells = self._build()
+                self._stamp = stamp
+        return self
+
+    def locate(self, sheet, row_label, column):
+        entry = self._cells.get(sheet)
+        if entry is None:
+            return None
+        row_idx, col_idx = entry
+        r, c = row_idx.get(_label(row_label)), col_idx.get(_label(column))
+        return (r, c) if r is not None and c is not None else None
+
+
+class OverrideJournal:
+    """워크북 수정값 저널. append() 는 fsync 후 즉시 반환, compaction 은 백그라운드 스레드"""
+
+    def __init__(self, workbook_path, journal_path=None, on_compacted=None):
+        self.workbook_path = workbook_path
+        self.journal_path = journal_path or workbook_path + '.journal'
+        self.index = CellIndex(workbook_path)
+        self.on_compacted = on_compacted
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._seq = 0
+        self._pending = {}  # (sheet, row, col) -> (seq, value)
+        self._wake = threading.Event()
+        self._worker = None
+        self.last_error = None
+        self.unresolved = []      # 워크북에서 찾지 못해 저널에 남은 셀
+        self.unapplied = []       # 원시자료에서 찾지 못한 셀 (마지막 apply_to_raw_data)
+        self._recover()
+
+    # --- 저널 파일 ---
+    def _recover(self):
+        """이전 프로세스가 남긴 미반영 저널 복원"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 기록 도중 중단된 마지막 줄
+                self._seq = max(self._seq, rec['seq'])
+                self._pending[tuple(rec['cell'])] = (rec['seq'], rec['value'])
+        if self._pending:
+            print(f"[INFO] Override journal: {len(self._pending)} pending cell(s) recovered")
+
+    def _rewrite_journal(self, entries):
+        tmp = self.journal_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for cell, (seq, value) in entries.items():
+                f.write(json.dumps({'seq': seq, 'cell': list(cell), 'value': value}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_path)
+
+    @property
+    def write_lock(self):
+        """워크북 기록/재로드 직렬화 락 (압축 중에는 on_compacted 까지 보유)"""
+        return self._write_lock
+
+    def append(self, overrides):
+        """수정값 기록 -> (적용된 셀 목록, 거부된 키 목록). 해석 불가 키와 워크북에 없는 셀은 거부"""
+        accepted, rejected = [], []
+        lines = []
+        self.index.refresh()
+        with self._lock:
+            for key, value in overrides.items():
+                cell = parse_override_key(key)
+                if cell is None or value is None or self.index.locate(*cell) is None:
+                    rejected.append(key)
+                    continue
+                self._seq += 1
+                self._pending[cell] = (self._seq, value)
+                accepted.append(cell)
+                lines.append(json.dumps({'seq': self._seq, 'cell': list(cell), 'value': value},
+                                        ensure_ascii=False))
+            if lines:
+                with open(self.journal_path, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+        if accepted:
+            self.schedule_compaction()
+        return accepted, rejected
+
+    def pending(self):
+        with self._lock:
+            return {cell: value for cell, (_, value) in self._pending.items()}
+
+    # --- 메모리 반영 ---
+    def apply_to_raw_data(self, raw_data, cells=None):
+        """raw_data 에 수정값을 반영한 새 dict 반환 (변경된 시트만 복사, 원본 객체는 그대로)"""
+        pending = self.pending()
+        if cells is not None:
+            pending = {c: pending[c] for c in cells if c in pending}
+        patched = dict(raw_data)
+        copied = set()
+        unapplied = []
+        for (sheet, row, col), value in pending.items():
+            key = SHEET_KEYS.get(sheet)
+            df = patched.get(key)
+            if not isinstance(df, pd.DataFrame):
+                unapplied.append((sheet, row, col))
+                continue
+            if row in df.index and col in df.columns:
+                r, c = row, col
+            elif col in df.index and row in df.columns:
+                r, c = col, row  # 비용구조처럼 전치되어 로드된 시트
+            else:
+                unapplied.append((sheet, row, col))
+                continue
+            if key not in copied:
+                df = patched[key] = df.copy()
+                copied.add(key)
+            df.loc[r, c] = value
+        self.unapplied = unapplied
+        if unapplied:
+            print(f"[WARN] Override cells not in raw data (kept in journal): {unapplied[:5]}")
+        return patched
+
+    # --- 백그라운드 압축 ---
+    def schedule_compaction(self):
+        with self._worker_lock:
+            self._wake.set()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='sgr-journal-compact', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            if not self._wake.wait(timeout=WORKER_IDLE_SECONDS):
+                # 종료 판단과 schedule_compaction 의 재시작 판단을 같은 락으로 묶음 (요청 유실 방지)
+                with self._worker_lock:
+                    if not self._wake.is_set():
+                        self._worker = None
+                        return
+                continue
+            # 연속 저장 요청은 잠시 모아서 한 번에 기록
+            time.sleep(COMPACT_DELAY_SECONDS)
+            self._wake.clear()
+            try:
+                self.compact()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[ERROR] Override journal compaction failed: {e}")
+
+    def compact(self):
+        """저널 -> 워크북 기록. 반영 완료된 항목만 저널에서 제거"""
+        with self._write_lock:
+            with self._lock:
+                snapshot = dict(self._pending)
+            if not snapshot:
+                return 0
+
+            self.index.refresh()
+            located = {cell: self.index.locate(*cell) for cell in snapshot}
+            wb = load_workbook(self.workbook_path) if any(located.values()) else None
+            written = {}
+            unresolved = []
+            for cell, (seq, value) in snapshot.items():
+                pos = located[cell]
+                if pos is None or cell[0] not in wb.sheetnames:
+                    unresolved.append(cell)
+                    continue
+                wb[cell[0]].cell(row=pos[0], column=pos[1]).value = value
+                written[cell] = seq
+            if unresolved:
+                print(f"[WARN] Override target not found (kept in journal): {unresolved[:5]}")
+            self.unresolved = unresolved
+            self.last_error = None
+            if not written:
+                # 기록할 셀이 없으면 워크북 저장/재로드(on_compacted) 생략
+                return 0
+
+            tmp = os.path.join(os.path.dirname(os.path.abspath(self.workbook_path)),
+                               f".{os.path.basename(self.workbook_path)}.compact.tmp")
+            wb.save(tmp)
+            with open(tmp, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, self.workbook_path)
+
+            with self._lock:
+                # 기록 중 같은 셀이 다시 수정됐으면(seq 증가) 저널에 남김
+                for cell, seq in written.items():
+                    if self._pending.get(cell, (None,))[0] == seq:
+                        del self._pending[cell]
+                self._rewrite_journal(self._pending)
+
+            print(f"[SUCCESS] Override journal compacted: {len(written)} cell(s) -> {self.workbook_path}")
+            if self.on_compacted:
+                self.on_compacted()
+        return len(written)
+
+    def status(self):
+        with self._lock:
+            n = len(self._pending)
+        return {'pending_cells': n, 'journal': self.journal_path, 'last_error': self.last_error,
+                'unresolved': ['/'.join(map(str, c)) for c in self.unresolved],
+                'unapplied': ['/'.join(map(str, c)) for c in self.unapplied]}
@@ -0,0 +1,216 @@
+"""
+연도별 run_full_analysis 병렬 실행 (프로세스 풀 + 공유 메모리)
+- 원시자료의 숫자 DataFrame/Series/ndarray 를 공유 메모리 1개 블록에 한 번만 복사하고,
+  워커는 시작 시 블록에 연결하여 복사 없이(zero-copy) DataFrame 을 재구성 -> 작업마다 pickle 하지 않음
+- 작업 단위는 대상 연도 1개 (연도 번호 + 사용자 수정값만 전달)
+- 수정값이 있으면 엔진이 raw_data 를 제자리 수정하므로 작업마다 쓰기 가능한 개별 복사본 사용
+- 결과는 {연도: (history, components, bulk_sgr)} 와 연도 통합 history 로 병합
+
+사용 예:
+    from parallel_analysis import run_years, merge_history
+    results = run_years(processor.raw_data, range(2020, 2029))
+    history = merge_history(results)
+
+    python parallel_analysis.py --years 2020 2028 --workers 4
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+ALIGN_BYTES = 64
+
+# 워커 프로세스 전역 상태: (SharedMemory, raw_data)
+_worker_state = None
+
+
+def _shareable(values):
+    """단일 숫자 dtype 배열만 공유 (혼합 dtype 은 변환 시 자료형이 바뀌므로 pickle 로 전달)"""
+    return isinstance(values, np.ndarray) and values.dtype.kind in 'biuf' and values.size > 0
+
+
+def _frame_values(df):
+    if len(set(df.dtypes)) != 1:
+        return None
+    values = df.to_numpy()
+    return values if _shareable(values) else None
+
+
+class SharedRawData:
+    """raw_data dict -> 공유 메모리 블록 + 재구성용 메타정보(spec)"""
+
+    def __init__(self, raw_data):
+        arrays, entries, offset = [], {}, 0
+        for key, obj in raw_data.items():
+            if isinstance(obj, pd.DataFrame):
+                values, kind = _frame_values(obj), 'frame'
+            elif isinstance(obj, pd.Series):
+                values, kind = obj.to_numpy(), 'series'
+            elif isinstance(obj, np.ndarray):
+                values, kind = obj, 'array'
+            else:
+                values, kind = None, 'object'
+            if values is None or not _shareable(values):
+                entries[key] = ('object', obj)
+                continue
+            values = np.ascontiguousarray(values)
+            offset = -(-offset // ALIGN_BYTES) * ALIGN_BYTES
+            meta = {'offset': offset, 'shape': values.shape, 'dtype': values.dtype.str}
+            if kind == 'frame':
+                meta.update(index=obj.index, columns=obj.columns)
+            elif kind == 'series':
+                meta.update(index=obj.index, name=obj.name)
+            entries[key] = (kind, meta)
+            arrays.append((offset, values))
+            offset += values.nbytes
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for start, values in arrays:
+            np.ndarray(values.shape, values.dtype, buffer=self.shm.buf, offset=start)[...] = values
+        self.entries = entries
+        self.shared_bytes = offset
+
+    def spec(self):
+        return self.shm.name, self.entries
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def attach(spec):
+    """spec -> (SharedMemory, raw_data). 공유 배열은 읽기 전용 뷰 (워커 간 입력 오염 방지)"""
+    name, entries = spec
+    shm = shared_memory.SharedMemory(name=name)
+    raw_data = {}
+    for key, (kind, meta) in entries.items():
+        if kind == 'object':
+            raw_data[key] = meta
+            continue
+        arr = np.ndarray(meta['shape'], np.dtype(meta['dtype']), buffer=shm.buf, offset=meta['offset'])
+        arr.flags.writeable = False
+        if kind == 'frame':
+            raw_data[key] = pd.DataFrame(arr, index=meta['index'], columns=meta['columns'], copy=False)
+        elif kind == 'series':
+            raw_data[key] = pd.Series(arr, index=meta['index'], name=meta['name'], copy=False)
+        else:
+            raw_data[key] = arr
+    return shm, raw_data
+
+
+def private_copy(raw_data):
+    """원시자료(공유 뷰 포함) -> 쓰기 가능한 개별 복사본 (DataFrame/Series/ndarray 만 복사, 나머지는 그대로)"""
+    return {key: obj.copy() if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)) else obj
+            for key, obj in raw_data.items()}
+
+
+def _init_worker(spec):
+    global _worker_state
+    _worker_state = attach(spec)
+
+
+def _run_year(target_year, overrides):
+    from analysis_cache import compute_analysis
+    start = time.perf_counter()
+    # 수정값이 있으면 build_engine 이 복사본을 만들어 공유(읽기 전용) 배열에 쓰지 않음
+    result = compute_analysis(_worker_state[1], target_year, overrides)
+    return target_year, result, time.perf_counter() - start
+
+
+def run_years(raw_data, years, overrides=None, max_workers=None, timings=None):
+    """대상 연도들을 프로세스 풀에서 병렬 실행 -> {연도: (history, components, bulk_sgr)}
+
+    max_workers=1 이거나 연도가 1개면 현재 프로세스에서 순차 실행.
+    timings(dict)를 넘기면 연도별 계산 시간(초)을 채움.
+    """
+    years = [int(y) for y in years]
+    workers = min(max_workers or os.cpu_count() or 1, len(years))
+    results = {}
+    if workers <= 1:
+        from analysis_cache import compute_analysis
+        for y in years:
+            start = time.perf_counter()
+            results[y] = compute_analysis(raw_data, y, overrides)
+            if timings is not None:
+                timings[y] = time.perf_counter() - start
+        return results
+
+    with SharedRawData(raw_data) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.spec(),)) as pool:
+            futures = [pool.submit(_run_year, y, overrides) for y in years]
+            for f in futures:
+                y, result, seconds = f.result()
+                results[y] = result
+                if timings is not None:
+                    timings[y] = seconds
+    return dict(sorted(results.items()))
+
+
+def _merge(base, new):
+    for k, v in new.items():
+        if isinstance(v, dict) and isinstance(base.get(k), dict):
+            _merge(base[k], v)
+        else:
+            base[k] = v
+    return base
+
+
+def merge_history(results):
+    """연도별 history 를 하나로 병합 (같은 항목은 늦은 대상 연도 결과 우선, 'years' 는 합집합)"""
+    merged = {}
+    years = set()
+    for _, (history, _, _) in sorted(results.items()):
+        history = copy.deepcopy(history or {})
+        years.update(history.pop('years', None) or [])
+        _merge(merged, history)
+    if years:
+        merged['years'] = sorted(years)
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='연도별 SGR 분석 병렬 실행')
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    parser.add_argument('--years', type=int, nargs=2, default=[2020, 2028], metavar=('FROM', 'TO'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--compare', action='store_true', help='순차 실행 시간과 비교')
+    args = parser.parse_args(argv)
+
+    sys.path.append(os.getcwd())
+    from 파이썬용_sgr_2027 import DataProcessor
+    raw_data = DataProcessor(args.data).raw_data
+    years = list(range(args.years[0], args.years[1] + 1))
+
+    timings = {}
+    start = time.perf_counter()
+    results = run_years(raw_data, years, max_workers=args.workers, timings=timings)
+    elapsed = time.perf_counter() - start
+    for y, s in timings.items():
+        print(f"  {y}: {s:.2f}s")
+    print(f"[SUCCESS] {len(results)}개 연도 병렬 실행: {elapsed:.2f}s (연도별 합계 {sum(timings.values()):.2f}s)")
+
+    if args.compare:
+        start = time.perf_counter()
+        run_years(raw_data, years, max_workers=1)
+        sequential = time.perf_counter() - start
+        print(f"[INFO] 순차 실행: {sequential:.2f}s -> 가속 {sequential / elapsed:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
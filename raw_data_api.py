@@ -0,0 +1,138 @@
+"""
+원시자료 조회 API (시트 단위 / 행·열 선택 / 연도 범위 / 페이지 단위)
+- 로드된 raw_data(DataFrame)를 시트별 열 배열(columnar)로 한 번만 변환하여 보관
+- 요청마다 보이는 구간만 잘라서 반환 -> 워크북이 커져도 첫 화면 응답 시간 일정
+"""
+
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+# raw_data 키 -> 화면 표시용 시트명 (main.js 요청 순서와 동일)
+SHEET_DISPLAY_NAMES = {
+    'df_expenditure': '진료비_실제',
+    'df_weights': '종별비용구조',
+    'df_raw_mei_inf': '생산요소_물가',
+    'df_gdp': '1인당GDP',
+    'df_pop': '건보대상',
+    'df_sgr_reval': '연도별환산지수',
+    'df_sgr_law': '법과제도',
+    'df_rel_value': '상대가치변화',
+    'df_num': '기관수',
+    'df_contract': '수가계약결과',
+    'df_finance': '건보_재정통계',
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class _SheetColumns:
+    """시트 1개의 열 배열 표현 (index 배열 + 열 이름 -> ndarray)"""
+
+    def __init__(self, name, df):
+        self.name = name
+        self.index_name = df.index.name or '연도'
+        self.index = np.asarray(df.index.tolist(), dtype=object)
+        self.columns = [str(c) for c in df.columns]
+        self.arrays = {str(c): df[c].to_numpy() for c in df.columns}
+        # 연도 필터용 숫자 인덱스 (숫자가 아니면 NaN)
+        self.years = pd.to_numeric(pd.Series(self.index), errors='coerce').to_numpy(dtype=float)
+        self.has_years = not np.isnan(self.years).all()
+
+    @property
+    def n_rows(self):
+        return len(self.index)
+
+
+def _cell(value):
+    if value is None:
+        return None
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if (math.isnan(value) or math.isinf(value)) else float(value)
+    return value
+
+
+class RawDataStore:
+    """raw_data 딕셔너리를 시트별 열 배열로 캐시하고 부분 조회를 제공"""
+
+    def __init__(self, raw_data, display_names=None):
+        self.display_names = display_names if display_names is not None else SHEET_DISPLAY_NAMES
+        self._sheets = {}
+        for key, df in raw_data.items():
+            if not isinstance(df, pd.DataFrame) or df.empty:
+                continue
+            name = self.display_names.get(key, key)
+            self._sheets[name] = _SheetColumns(name, df)
+
+    def sheet_names(self):
+        ordered = [n for n in self.display_names.values() if n in self._sheets]
+        return ordered + [n for n in self._sheets if n not in ordered]
+
+    def describe(self):
+        """시트 목록 + 행/열 개수 (탭 렌더링용, 데이터 본문 없음)"""
+        return [{
+            'name': name,
+            'total_rows': self._sheets[name].n_rows,
+            'columns': self._sheets[name].columns,
+        } for name in self.sheet_names()]
+
+    def query(self, sheet, columns=None, year_from=None, year_to=None, offset=0, limit=DEFAULT_PAGE_SIZE):
+        """시트 일부 조회 -> {'headers', 'rows', 'total_rows', 'offset', 'limit'}
+
+        columns: 반환할 열 목록 (None 이면 전체)
+        year_from / year_to: 인덱스(연도) 범위 필터 (양 끝 포함)
+        """
+        if sheet not in self._sheets:
+            raise KeyError(f"Unknown sheet: {sheet}")
+        sc = self._sheets[sheet]
+
+        cols = [c for c in (columns or sc.columns) if c in sc.arrays]
+
+        mask = np.ones(sc.n_rows, dtype=bool)
+        # 종별비용구조처럼 연도 인덱스가 없는 시트는 연도 필터 무시
+        if sc.has_years and year_from is not None:
+            mask &= sc.years >= year_from
+        if sc.has_years and year_to is not None:
+            mask &= sc.years <= year_to
+        row_idx = np.flatnonzero(mask)
+
+        total = len(row_idx)
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        page_idx = row_idx[offset:offset + limit]
+
+        index_vals = sc.index[page_idx]
+        col_vals = [sc.arrays[c][page_idx] for c in cols]
+        rows = [
+            [_cell(index_vals[i])] + [_cell(v[i]) for v in col_vals]
+            for i in range(len(page_idx))
+        ]
+
+        return {
+            'sheet': sheet,
+            'headers': [sc.index_name] + cols,
+            'rows': rows,
+            'total_rows': total,
+            'offset': offset,
+            'limit': limit,
+        }
+
+
+_store_lock = threading.Lock()
+_store_cache = (None, None)
+
+
+def get_raw_data_store(raw_data):
+    """같은 raw_data 객체에 대해서는 변환 결과를 재사용 (reload_data 시 자동 갱신)"""
+    global _store_cache
+    with _store_lock:
+        src, store = _store_cache
+        if src is not raw_data:
+            store = RawDataStore(raw_data)
+            _store_cache = (raw_data, store)
+        return store
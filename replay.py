@@ -0,0 +1,197 @@
+"""
+반사실 과거 재현 (counterfactual replay, 벡터 연산)
+- "2014년부터 S2 를 적용했다면 지금 환산지수/진료비는?" : 시작연도부터 모형 조정률을 재귀 적용
+  환산지수_T' = 환산지수_{T-1}' x (1 + 조정률_T')          (시작 전 연도는 실적)
+  진료비_T'   = 진료비_T x 환산지수_T' / 환산지수_T        (진료량은 실적 유지, 가격만 교체)
+  조정률_T' 은 재현된 환산지수(SGR 환산지수 요인)와 재현된 진료비(UAF 격차)로 계산 -> 다음 해 입력
+  (S2 격차는 AE_{y-1} x 환산지수 변화 / AE_y 비율이라 가격 교체가 상쇄되어 1년 전망 조정률과 같고,
+   S1 누적 격차는 재현 진료비 수준에 의존하므로 경로가 달라짐)
+- 모형(S1 / S2 / Link) x MEI 시나리오(16개 + 통계) 전체를 시나리오 배치 축으로 한 번에 재현
+  (attribution.RateKernel 에 재현 진료비/환산지수를 (시나리오, 연도, 종별) 배열로 넣고 대각 성분 사용)
+- 모형 조정률이 결측(자료 부족)인 연도는 실제 환산지수 변화율로 대체하고 '대체' 로 표시
+- 결과: 연도별 재현 조정률/환산지수/진료비, 실적 대비 진료비 격차와 누적 격차
+
+사용 예:
+    res = counterfactual_replay(processor.raw_data, start=2014)
+    res.summary(scenario='평균')                  # 모형 x 종별 최종연도 환산지수 비율 / 누적 진료비 격차
+    res.scenario_table('S2')                      # 시나리오별 누적 진료비 격차
+    python replay.py --start 2014 --end 2026 --scenario 평균
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from attribution import RateKernel, RATE_MODELS, EXCLUDED_COLUMNS
+
+DEFAULT_START = 2014
+TOTAL_LABEL = '전체'
+REPLAYED_KEYS = ('df_expenditure', 'df_sgr_reval')
+
+
+class ReplayResult:
+    """모형별 재현 경로 (시나리오, 연도, 종별) + 실적 (연도, 종별)"""
+
+    def __init__(self, years, types, scenarios, actual, rates, cf, expenditure, fallback):
+        self.years = [int(y) for y in years]
+        self.types = list(types)
+        self.scenarios = list(scenarios)
+        self.actual = actual                # {'rate': %, 'cf': 환산지수, 'expenditure': 진료비} (Y, T)
+        self.rates = rates                  # {모형: (S, Y, T)} 재현 조정률(%)
+        self.cf = cf                        # {모형: (S, Y, T)} 재현 환산지수
+        self.expenditure = expenditure      # {모형: (S, Y, T)} 재현 진료비
+        self.fallback = fallback            # {모형: (S, Y, T)} 실제 변화율로 대체한 연도
+
+    @property
+    def models(self):
+        return list(self.rates)
+
+    def gap(self, model):
+        """재현 진료비 - 실제 진료비 (S, Y, T)"""
+        return self.expenditure[model] - self.actual['expenditure']
+
+    def cumulative_gap(self, model):
+        """시작연도부터의 누적 진료비 격차 (S, Y, T)"""
+        return np.cumsum(np.nan_to_num(self.gap(model)), axis=1)
+
+    def _year_pos(self, year):
+        return len(self.years) - 1 if year is None else self.years.index(int(year))
+
+    def summary(self, year=None, scenario='평균'):
+        """모형 x 종별(+전체) 표: 해당 연도 실제/재현 환산지수, 비율, 진료비 격차, 누적 격차, 대체 연도 수"""
+        y, s = self._year_pos(year), self.scenarios.index(scenario)
+        actual_cf, actual_exp = self.actual['cf'][y], self.actual['expenditure'][y]
+        frames = []
+        for m in self.models:
+            df = pd.DataFrame({
+                '모형': m,
+                '종별': self.types,
+                '실제_환산지수': actual_cf,
+                '재현_환산지수': self.cf[m][s, y],
+                '실제_진료비': actual_exp,
+                '재현_진료비': self.expenditure[m][s, y],
+                '누적_격차': self.cumulative_gap(m)[s, y],
+                '대체_연도수': self.fallback[m][s, :y + 1].sum(axis=0),
+            })
+            total = df[['실제_진료비', '재현_진료비', '누적_격차']].sum()
+            df.loc[len(df)] = {'모형': m, '종별': TOTAL_LABEL, '실제_환산지수': np.nan, '재현_환산지수': np.nan,
+                               '실제_진료비': total['실제_진료비'], '재현_진료비': total['재현_진료비'],
+                               '누적_격차': total['누적_격차'], '대체_연도수': int(df['대체_연도수'].max())}
+            frames.append(df)
+        df = pd.concat(frames, ignore_index=True)
+        # 전체 행 비율 = 진료비 합계 비율 (진료량 고정이므로 실제 진료비 가중 환산지수 비율과 같음)
+        df.insert(4, '환산지수_비율', np.where(df['종별'] == TOTAL_LABEL, df['재현_진료비'] / df['실제_진료비'],
+                                          df['재현_환산지수'] / df['실제_환산지수']))
+        df.insert(7, '진료비_격차', df['재현_진료비'] - df['실제_진료비'])
+        df.insert(0, '연도', self.years[y])
+        return df
+
+    def scenario_table(self, model, year=None):
+        """시나리오 x (종별 + 전체) 누적 진료비 격차"""
+        y = self._year_pos(year)
+        cum = self.cumulative_gap(model)[:, y]
+        df = pd.DataFrame(cum, index=pd.Index(self.scenarios, name='시나리오'), columns=self.types)
+        df[TOTAL_LABEL] = cum.sum(axis=1)
+        return df
+
+    def to_frame(self, model=None, scenario=None):
+        """long 형식: 모형, 시나리오, 연도, 종별, 실제/재현 조정률, 환산지수, 진료비, 격차, 누적 격차, 대체"""
+        models = [model] if model else self.models
+        s_pos = [self.scenarios.index(scenario)] if scenario else list(range(len(self.scenarios)))
+        frames = []
+        for m in models:
+            index = pd.MultiIndex.from_product([[m], [self.scenarios[i] for i in s_pos], self.years, self.types],
+                                               names=['모형', '시나리오', '연도', '종별'])
+            n = len(s_pos)
+            cols = {
+                '실제_조정률(%)': np.broadcast_to(self.actual['rate'], (n,) + self.actual['rate'].shape),
+                '재현_조정률(%)': self.rates[m][s_pos],
+                '실제_환산지수': np.broadcast_to(self.actual['cf'], (n,) + self.actual['cf'].shape),
+                '재현_환산지수': self.cf[m][s_pos],
+                '실제_진료비': np.broadcast_to(self.actual['expenditure'], (n,) + self.actual['expenditure'].shape),
+                '재현_진료비': self.expenditure[m][s_pos],
+                '진료비_격차': self.gap(m)[s_pos],
+                '누적_격차': self.cumulative_gap(m)[s_pos],
+                '대체': self.fallback[m][s_pos],
+            }
+            frames.append(pd.DataFrame({k: v.ravel() for k, v in cols.items()}, index=index).reset_index())
+        return pd.concat(frames, ignore_index=True)
+
+
+def _last_actual_year(raw_data, types):
+    """실적 진료비와 환산지수가 모두 있는 마지막 연도"""
+    exp = raw_data['df_expenditure'].reindex(columns=types).dropna()
+    cf = raw_data['df_sgr_reval'].reindex(columns=types).dropna()
+    return int(min(exp.index.max(), cf.index.max()))
+
+
+def counterfactual_replay(raw_data, start=DEFAULT_START, end=None, models=RATE_MODELS, types=None):
+    """start ~ end 연도에 모형 조정률을 재귀 적용한 반사실 경로 -> ReplayResult"""
+    start = int(start)
+    types = list(types) if types is not None else \
+        [t for t in raw_data['df_weights'].index if t not in EXCLUDED_COLUMNS]
+    end = _last_actual_year(raw_data, types) if end is None else int(end)
+    if end < start:
+        raise ValueError(f"end({end}) 가 start({start}) 보다 앞섭니다.")
+    # 기준 배열: start-13 ~ end (마지막 연도 실적까지 포함)
+    full = RateKernel(raw_data, range(start, end + 2), types)
+    kernels = {T: RateKernel(raw_data, [T], types) for T in range(start, end + 1)}
+    S = len(full.scenarios)
+    pos = np.arange(start, end + 1) - full.years[0]
+    cf_actual, exp_actual = full.base['df_sgr_reval'], full.base['df_expenditure']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        actual_rate = cf_actual[pos] / cf_actual[pos - 1] - 1
+
+    rates, cf, expenditure, fallback = {}, {}, {}, {}
+    for m in models:
+        x = dict(full.base)
+        for key in REPLAYED_KEYS:
+            x[key] = np.broadcast_to(full.base[key], (S,) + full.base[key].shape).copy()
+        r_path = np.empty((S, len(pos), len(types)))
+        for i, T in enumerate(range(start, end + 1)):
+            k = kernels[T]
+            lo = k.years[0] - full.years[0]
+            window = {key: (arr if key == 'df_weights' else arr[..., lo:lo + len(k.years), :])
+                      for key, arr in x.items()}
+            out = np.broadcast_to(k.rates(window, [m])[m], (S, 1, len(types), S))
+            r_path[:, i] = out[np.arange(S), 0, :, np.arange(S)] / 100.0      # 배치 s 의 시나리오 s 조정률
+            p = pos[i]
+            x['df_sgr_reval'][:, p] = x['df_sgr_reval'][:, p - 1] * (1 + np.where(np.isnan(r_path[:, i]),
+                                                                                   actual_rate[i], r_path[:, i]))
+            x['df_expenditure'][:, p] = exp_actual[p] * x['df_sgr_reval'][:, p] / cf_actual[p]
+        fallback[m] = np.isnan(r_path) & ~np.isnan(actual_rate)
+        rates[m] = np.where(fallback[m], actual_rate, r_path) * 100
+        cf[m] = x['df_sgr_reval'][:, pos]
+        expenditure[m] = x['df_expenditure'][:, pos]
+    actual = {'rate': actual_rate * 100, 'cf': cf_actual[pos], 'expenditure': exp_actual[pos]}
+    return ReplayResult(range(start, end + 1), types, full.scenarios, actual, rates, cf, expenditure, fallback)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='반사실 과거 재현 (모형 조정률 재귀 적용)')
+    parser.add_argument('--start', type=int, default=DEFAULT_START)
+    parser.add_argument('--end', type=int, default=None)
+    parser.add_argument('--scenario', default='평균')
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    parser.add_argument('--out', default=None, help='엑셀 저장 경로 (요약 + 시나리오별 + 상세)')
+    args = parser.parse_args(argv)
+
+    from 파이썬용_sgr_2027 import DataProcessor
+    processor = DataProcessor(args.data)
+    res = counterfactual_replay(processor.raw_data, args.start, args.end)
+    print(f"=== [{res.years[0]}~{res.years[-1]}년 반사실 재현 (시나리오: {args.scenario})] ===")
+    summary = res.summary(scenario=args.scenario)
+    print(summary[summary['종별'] == TOTAL_LABEL].drop(columns=['종별', '실제_환산지수', '재현_환산지수'])
+          .round(4).to_string(index=False))
+    if args.out:
+        with pd.ExcelWriter(args.out) as writer:
+            summary.to_excel(writer, sheet_name='요약', index=False)
+            for m in res.models:
+                res.scenario_table(m).to_excel(writer, sheet_name=f'{m}_시나리오별')
+            res.to_frame(scenario=args.scenario).to_excel(writer, sheet_name='상세', index=False)
+        print(f"[SUCCESS] 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
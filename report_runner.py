@@ -0,0 +1,450 @@
+"""
+통합 리포트 실행기 (단일 프로세스 데이터 로드 + 공유 중간결과 + 리포트 플러그인)
+- 워크북은 한 번만 로드하고 MEI / UAF / SGR 구성요소 / CF 지수 등 공통 중간결과는 연도별로 1회만 계산
+- 각 리포트는 @report 로 등록된 플러그인: ctx 를 받아 [(시트명, DataFrame, index 여부), ...] 반환
+- 시트 구성(계산)은 메인 프로세스에서 순차 실행, 서로 독립인 엑셀 파일 저장은 병렬 실행
+
+대상 스크립트 (개별 실행도 그대로 가능):
+    export_grouped_cf_all_scenarios.py, export_final_cf_all_years.py, export_final_uaf_report.py,
+    export_macro_models_history.py, generate_ae_tge_report.py,
+    calculate_mei_growth_model.py, calculate_macro_link_history.py
+
+사용 예:
+    python report_runner.py                       (전체 리포트)
+    python report_runner.py grouped_cf uaf --out-dir reports --workers 4
+    python report_runner.py --list
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings('ignore')
+
+sys.path.append(os.getcwd())
+from 파이썬용_sgr_2027 import DataProcessor, SgrCalculator, MeiCalculator, FinalRateCalculator
+from excel_stream import write_frames
+from macro_link import link_rates
+from aggregation_matrix import AggregationMatrix, TYPE_GROUPS_5
+
+CF_YEARS = range(2020, 2028)
+TGE_YEARS = range(2014, 2027)
+CATEGORIES_10 = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국']
+TYPES_5 = ['병원', '의원', '치과', '한방', '약국']
+
+# 이름 -> {'build': fn(ctx), 'output': 파일명, 'title': 설명}
+REPORTS = {}
+
+
+def report(name, output, title):
+    def register(build_fn):
+        REPORTS[name] = {'build': build_fn, 'output': output, 'title': title}
+        return build_fn
+    return register
+
+
+class ReportContext:
+    """로드된 데이터와 계산기, 연도별 공통 중간결과(지연 계산 + 메모)"""
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.processor = DataProcessor(data_file)
+        self.data = self.processor.data
+        self.hospital_types = self.processor.HOSPITAL_TYPES
+        self.group_mapping = self.processor.GROUP_MAPPING
+        self.sgr_calc = SgrCalculator(self.data, self.hospital_types)
+        self.mei_calc = MeiCalculator(self.data, self.hospital_types)
+        self.final_calc = FinalRateCalculator(self.data, self.group_mapping)
+        self._memo = {}
+        self.computed = 0
+        self.reused = 0
+
+    def _get(self, key, factory):
+        if key in self._memo:
+            self.reused += 1
+        else:
+            self._memo[key] = factory()
+            self.computed += 1
+        return self._memo[key]
+
+    # --- 엔진 계산기 기반 ---
+    def mei_index(self, year):
+        return self._get(('mei_index', year), lambda: self.mei_calc.calc_mei_index_by_year(year))
+
+    def paf(self, year, model):
+        fn = self.sgr_calc.calc_paf_s1 if model == 'S1' else self.sgr_calc.calc_paf_s2
+        return self._get(('paf', year, model), lambda: fn(year))
+
+    def sgr_components(self, year):
+        return self._get(('sgr_components', year), lambda: self.sgr_calc._calc_sgr_components(year))
+
+    def sgr_index(self, year, model):
+        return self._get(('sgr_index', year, model),
+                         lambda: self.sgr_calc.calc_sgr_index(self.sgr_components(year), model=model))
+
+    def rv_idx(self, year):
+        """year-1 상대가치 변화지수 (종별 정렬, 결측 1.0)"""
+        def build():
+            try:
+                return self.data['df_rel_value'].loc[year - 1].reindex(self.hospital_types).fillna(1.0)
+            except KeyError:
+                return pd.Series(1.0, index=self.hospital_types)
+        return self._get(('rv_idx', year), build)
+
+    def cf_index(self, year, model):
+        """10개 종별 x MEI 시나리오 CF 지수: S1 = MEI x (1+UAF_S1), S2 = MEI x (1+UAF_S2) - (RV-1)"""
+        def build():
+            df_mei = self.mei_index(year)
+            if df_mei is None:
+                return None
+            if model == 'S1':
+                return df_mei.multiply(1 + self.paf(year, 'S1'), axis=0)
+            return df_mei.multiply(1 + self.paf(year, 'S2'), axis=0).sub(self.rv_idx(year) - 1, axis=0)
+        return self._get(('cf_index', year, model), build)
+
+    def group_cf_index(self, year, model):
+        """CF 지수의 5개 유형 통합 (T-2 진료비 가중)"""
+        def build():
+            cf = self.cf_index(year, model)
+            return None if cf is None else self.final_calc._group_and_weight_average(cf, year)
+        return self._get(('group_cf_index', year, model), build)
+
+    def macro_final_rate(self, year):
+        """(10개 종별, 5개 그룹) 거시지표 모형 지수 - MEI(T) + SGR 구성요소(T-2)"""
+        def build():
+            df_mei = self.mei_index(year)
+            comp = self.sgr_components(year - 2)
+            if df_mei is None or comp is None:
+                return None
+            return self.final_calc.calc_macro_final_rate(df_mei, comp, year)
+        return self._get(('macro_final_rate', year), build)
+
+    # --- MEI 증가율 / 거시지표 연계 모형 (calculate_* 스크립트와 동일 산식) ---
+    def mei_16(self, data_year):
+        """data_year 기준 16개 시나리오 MEI 지수 + 통계 (calculate_mei_growth_model.MeiCalculator)"""
+        def build():
+            from calculate_mei_growth_model import MeiCalculator as GrowthMeiCalculator
+            calc = GrowthMeiCalculator({'df_weights': self.data['df_weights'],
+                                        'df_raw_mei_inf': self.data['df_raw_mei_inf']})
+            return calc.calc_mei_16(data_year)
+        return self._get(('mei_16', data_year), build)
+
+    def gdp_rate(self, data_year):
+        def build():
+            df_gdp = self.data['df_gdp']
+            try:
+                return df_gdp.loc[data_year, '실질GDP'] / df_gdp.loc[data_year - 1, '실질GDP'] - 1
+            except KeyError:
+                return None
+        return self._get(('gdp_rate', data_year), build)
+
+    def type5_weighted(self, df_10, exp_year):
+        """10개 종별 -> 5개 유형 진료비 가중평균 (calculate_* 스크립트의 유형 통합과 동일)"""
+        df_exp = self.data['df_expenditure']
+        if exp_year not in df_exp.index:
+            return None
+        return self.type5_matrix.aggregate_frame(df_10, df_exp, exp_year).reindex(TYPES_5)
+
+    @property
+    def type5_matrix(self):
+        return self._get('type5_matrix', lambda: AggregationMatrix(TYPE_GROUPS_5, CATEGORIES_10))
+
+
+# ----------------------------------------------------------------------
+# 리포트 플러그인
+# ----------------------------------------------------------------------
+@report('grouped_cf', 'SGR_CF_유형별_최종_분석표.xlsx', '유형별(5개) 전 시나리오 CF')
+def build_grouped_cf(ctx):
+    rates = {'S1_현행': {}, 'S2_개선': {}}
+    for y in CF_YEARS:
+        for label, model in (('S1_현행', 'S1'), ('S2_개선', 'S2')):
+            g = ctx.group_cf_index(y, model)
+            if g is not None:
+                rates[label][y] = (g - 1) * 100
+
+    sheets = []
+    for label, by_year in rates.items():
+        for y, df in by_year.items():
+            sheets.append((f'{label}_{y}년', df, True))
+    for label, by_year in rates.items():
+        summary = pd.DataFrame(index=list(ctx.group_mapping.keys()))
+        for y, df in by_year.items():
+            summary[f"{y}년"] = df['평균']
+        sheets.append((f'{label}_평균추이', summary, True))
+        sheets.append((f'{label}_등위추이', summary.rank(ascending=False, axis=0), True))
+    return sheets
+
+
+@report('final_cf', 'SGR_CF_최종_전연도_분석표.xlsx', '종별(10개) 전연도 CF')
+def build_final_cf(ctx):
+    types = ctx.hospital_types
+    years = [y for y in CF_YEARS if ctx.cf_index(y, 'S1') is not None]
+    if not years:
+        return []
+
+    summary = []
+    for y in years:
+        s1, s2 = ctx.cf_index(y, 'S1'), ctx.cf_index(y, 'S2')
+        summary.append(pd.DataFrame({
+            '연도': y,
+            '종별': types,
+            '현행_S1_조정률(%)': ((s1 - 1) * 100)['평균'].values,
+            '개선_S2_조정률(%)': ((s2 - 1) * 100)['평균'].values,
+            '현행_S1_인덱스': s1['평균'].values,
+            '개선_S2_인덱스': s2['평균'].values,
+            '상대가치차감율(%)': ((ctx.rv_idx(y) - 1) * 100).values,
+            'UAF_S1(%)': (ctx.paf(y, 'S1').reindex(types) * 100).values,
+            'UAF_S2(%)': (ctx.paf(y, 'S2').reindex(types) * 100).values,
+        }))
+    sheets = [('전연도_평균_요약', pd.concat(summary), False)]
+
+    for model in ('S1', 'S2'):
+        for mode in ('Rate', 'Index'):
+            combined = pd.DataFrame(index=types)
+            for y in years:
+                idx = ctx.cf_index(y, model)['평균']
+                combined[f"{y}년"] = (idx - 1) * 100 if mode == 'Rate' else idx
+            sheets.append((f'{model}_{mode}_추이', combined, True))
+
+    if 2025 in years:
+        for model in ('S1', 'S2'):
+            idx = ctx.cf_index(2025, model)
+            sheets.append((f'2025_{model}_조정률(%)', (idx - 1) * 100, True))
+            sheets.append((f'2025_{model}_지수', idx, True))
+    return sheets
+
+
+@report('uaf', 'SGR_UAF_최종_분석_표.xlsx', '현행/개선 UAF 연도별·종별')
+def build_uaf(ctx):
+    index = [f"UAF_{T}" for T in CF_YEARS]
+    df_s1 = pd.DataFrame([ctx.paf(T, 'S1') for T in CF_YEARS], index=index) * 100
+    df_s2 = pd.DataFrame([ctx.paf(T, 'S2') for T in CF_YEARS], index=index) * 100
+    comparison = pd.DataFrame({
+        '연도': [f"{T}년용" for T in CF_YEARS],
+        '현행(S1) UI_상급': df_s1['상급종합'],
+        '개선(S2) UI_상급': df_s2['상급종합'],
+        '현행(S1) UI_의원': df_s1['의원'],
+        '개선(S2) UI_의원': df_s2['의원']
+    })
+    return [
+        ('S1_현행_연도별', df_s1, True),
+        ('S1_현행_종별', df_s1.T, True),
+        ('S2_개선_연도별', df_s2, True),
+        ('S2_개선_종별', df_s2.T, True),
+        ('주요종별_비교', comparison, False),
+    ]
+
+
+@report('macro_history', '거시지표모형_전연도_분석표.xlsx', '거시지표 모형 전연도')
+def build_macro_history(ctx):
+    models = ['실질 GDP 모형', 'MEI 모형', '거시지표 연계 모형']
+    groups = list(ctx.group_mapping.keys())
+    res_10 = {m: pd.DataFrame(index=ctx.hospital_types) for m in models}
+    res_group = {m: pd.DataFrame(index=groups) for m in models}
+    for y in CF_YEARS:
+        out = ctx.macro_final_rate(y)
+        if out is None:
+            continue
+        df_10, df_group = out
+        for m in models:
+            res_10[m][f"{y}년"] = ((df_10[m] - 1) * 100).round(2)
+            res_group[m][f"{y}년"] = ((df_group[m] - 1) * 100).round(2)
+
+    sheets = []
+    for m in models:
+        sheets.append((f"{m[:10]}_10종", res_10[m], True))
+        sheets.append((f"{m[:10]}_5그룹", res_group[m], True))
+    if '2025년' in res_group['실질 GDP 모형'].columns:
+        sheets.append(('2025년_모형별_비교', pd.DataFrame({m: res_group[m]['2025년'] for m in models}), True))
+    return sheets
+
+
+@report('tge_ae', '진료비_상세_분석_리포트.xlsx', '실제진료비 vs 목표진료비')
+def build_tge_ae(ctx):
+    types = ctx.hospital_types
+    ae_actual = ctx.data['df_expenditure']
+    tge = {'S1': [], 'S2': []}
+    for year in TGE_YEARS:
+        comp = ctx.sgr_components(year)
+        for model in ('S1', 'S2'):
+            try:
+                tge[model].append(ae_actual.loc[year - 1] * ctx.sgr_index(year, model) if comp
+                                  else pd.Series(np.nan, index=types))
+            except KeyError:
+                tge[model].append(pd.Series(np.nan, index=types))
+    df_s1 = pd.DataFrame(tge['S1'], index=TGE_YEARS)
+    df_s2 = pd.DataFrame(tge['S2'], index=TGE_YEARS)
+    df_ae = ae_actual.loc[TGE_YEARS]
+
+    # 종별 x 연도 비교표 (열 연산으로 구성)
+    long = pd.DataFrame({
+        '연도': np.repeat(list(TGE_YEARS), len(types)),
+        '종별': np.tile(types, len(TGE_YEARS)),
+        '실제진료비(AE)': df_ae[types].to_numpy().ravel(),
+        '목표진료비(S1)': df_s1[types].to_numpy().ravel(),
+        '목표진료비(S2)': df_s2[types].to_numpy().ravel(),
+    })
+    long['격차율(S1%)'] = (long['목표진료비(S1)'] - long['실제진료비(AE)']) / long['실제진료비(AE)'] * 100
+    long['격차율(S2%)'] = (long['목표진료비(S2)'] - long['실제진료비(AE)']) / long['실제진료비(AE)'] * 100
+    return [
+        ('1_실제진료비(AE)', df_ae, True),
+        ('2_목표진료비_현행(S1)', df_s1, True),
+        ('3_목표진료비_개선(S2)', df_s2, True),
+        ('4_종합비교_데이터', long, False),
+    ]
+
+
+def _stack_by_year(by_year, label):
+    frames = []
+    for ty, df in sorted(by_year.items()):
+        tmp = df.copy()
+        tmp['연도'] = ty
+        frames.append(tmp.reset_index().rename(columns={'index': label}))
+    if not frames:
+        return None
+    out = pd.concat(frames, ignore_index=True)
+    return out[['연도', label] + [c for c in out.columns if c not in ['연도', label]]]
+
+
+@report('mei_growth', 'MEI_증가율모형_결과.xlsx', 'MEI 증가율 모형 (MEI - 상대가치)')
+def build_mei_growth(ctx):
+    res_10, res_5 = {}, {}
+    for ty in CF_YEARS:
+        dy = ty - 2
+        df_mei = ctx.mei_16(dy)
+        if df_mei is None:
+            continue
+        try:
+            rv = ctx.data['df_rel_value'].loc[dy].reindex(df_mei.index)
+        except KeyError:
+            rv = pd.Series(1.0, index=df_mei.index)
+        df_cf_all = df_mei.subtract(rv, axis=0) + 1
+        res_10[ty] = (df_cf_all.reindex(CATEGORIES_10) - 1) * 100
+        df_5 = ctx.type5_weighted(df_cf_all, dy)
+        if df_5 is not None:
+            res_5[ty] = (df_5 - 1) * 100
+
+    sheets = []
+    df10, df5 = _stack_by_year(res_10, '종별'), _stack_by_year(res_5, '유형')
+    if df10 is not None:
+        sheets.append(('10개_종별_조정률', df10, False))
+    if df5 is not None:
+        sheets.append(('5개_유형별_조정률', df5, False))
+    return sheets
+
+
+@report('macro_link_history', '거시지표연계모형_CF_2020_2027.xlsx', '거시지표 연계 모형 (GDP + 1/3 초과분)')
+def build_macro_link_history(ctx):
+    res_10, res_5 = {}, {}
+    for ty in CF_YEARS:
+        dy = ty - 2
+        gdp_rate = ctx.gdp_rate(dy)
+        df_mei = ctx.mei_16(dy)
+        if gdp_rate is None or df_mei is None:
+            continue
+        # 시나리오 MEI 증가율 = MEI 지수 - 1 (비용구조 가중치 합 = 1)
+        m = df_mei.to_numpy(dtype=float) - 1
+        df_base = pd.DataFrame(link_rates(m, gdp_rate), index=df_mei.index, columns=df_mei.columns)
+        try:
+            rv_rate = (ctx.data['df_rel_value'].loc[dy] - 1).reindex(df_mei.index)
+        except KeyError:
+            rv_rate = 0
+        df_cf_all = df_base.subtract(rv_rate, axis=0) * 100
+        res_10[ty] = df_cf_all.reindex(CATEGORIES_10)
+        df_5 = ctx.type5_weighted(df_cf_all, dy)
+        if df_5 is not None:
+            res_5[ty] = df_5
+
+    return [
+        ('10개_종별_조정률', _stack_by_year(res_10, '종별'), False),
+        ('5개_유형별_조정률', _stack_by_year(res_5, '유형'), False),
+    ]
+
+
+# ----------------------------------------------------------------------
+# 실행
+# ----------------------------------------------------------------------
+def write_report(path, sheets):
+    """시트 목록을 엑셀 파일로 저장 (작업 프로세스에서 실행) -> (경로, 소요 초)"""
+    start = time.time()
+    write_frames(path, sheets)
+    return path, time.time() - start
+
+
+def run_reports(names=None, data_file='SGR_data.xlsx', out_dir='.', workers=None):
+    """선택 리포트 실행 -> {이름: {'path', 'build_s', 'write_s'} 또는 {'error'}}"""
+    names = list(names) if names else list(REPORTS)
+    unknown = [n for n in names if n not in REPORTS]
+    if unknown:
+        raise KeyError(f"Unknown report(s): {unknown}")
+
+    start = time.time()
+    ctx = ReportContext(data_file)
+    print(f"[INFO] 데이터 로드: {time.time() - start:.2f}s ({data_file})")
+    os.makedirs(out_dir, exist_ok=True)
+
+    # 1) 시트 구성: 공통 중간결과를 공유하도록 한 프로세스에서 순차 실행
+    built, results = {}, {}
+    for name in names:
+        t0 = time.time()
+        try:
+            built[name] = REPORTS[name]['build'](ctx)
+            results[name] = {'build_s': round(time.time() - t0, 3)}
+        except Exception as e:
+            print(f"[ERROR] {name} 리포트 구성 실패: {e}")
+            results[name] = {'error': str(e)}
+    print(f"[INFO] 중간결과 계산 {ctx.computed}건, 재사용 {ctx.reused}건")
+
+    # 2) 파일 저장: 리포트 간 독립 -> 병렬
+    jobs = {name: os.path.join(out_dir, REPORTS[name]['output']) for name in built if built[name]}
+    if workers == 1 or len(jobs) <= 1:
+        for name, path in jobs.items():
+            results[name].update(dict(zip(('path', 'write_s'), write_report(path, built[name]))))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+            futures = {pool.submit(write_report, path, built[name]): name for name, path in jobs.items()}
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    results[name].update(dict(zip(('path', 'write_s'), fut.result())))
+                except Exception as e:
+                    print(f"[ERROR] {name} 저장 실패: {e}")
+                    results[name]['error'] = str(e)
+
+    for name in names:
+        r = results[name]
+        if 'error' in r:
+            continue
+        if 'path' in r:
+            print(f"[SUCCESS] {name:<20} -> {r['path']} (구성 {r['build_s']:.2f}s / 저장 {r['write_s']:.2f}s)")
+        else:
+            print(f"[WARN] {name}: 산출 결과 없음")
+    print(f"[INFO] 전체 소요: {time.time() - start:.2f}s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SGR 리포트 통합 실행기')
+    parser.add_argument('reports', nargs='*', help='실행할 리포트 이름 (기본: 전체)')
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--workers', type=int, help='저장 병렬 프로세스 수 (1 = 순차)')
+    parser.add_argument('--list', action='store_true', help='등록된 리포트 목록')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, spec in REPORTS.items():
+            print(f"{name:<20} {spec['output']:<36} {spec['title']}")
+        return 0
+    results = run_reports(args.reports, args.data, args.out_dir, args.workers)
+    return 1 if any('error' in r for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+다중 프로세스 공유 분석 결과 저장소 (SQLite)
+- 키: (원시자료 해시, target_year, 사용자 수정값 해시)
+- 한 워커가 계산한 결과를 다른 워커가 재사용 (run_full_analysis 중복 실행 방지)
+- 파일 락 기반 single-flight: 같은 키를 두 프로세스가 동시에 계산하지 않음
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+DEFAULT_DB_PATH = os.environ.get('SGR_RESULT_STORE', 'sgr_result_cache.sqlite')
+LOCK_POLL_SECONDS = 0.1
+LOCK_STALE_SECONDS = 600
+
+LOCK_HEARTBEAT_SECONDS = 30
+FINGERPRINT_MEMO_ENTRIES = 8
+
+# raw_data 별 (raw_data, 시트 객체들, 자료 버전, 해시): 같은 dict/시트 객체이고 버전이 같으면 해시 재사용
+# - 사본을 두지 않으므로 메모리 추가 부담 없음 (원시자료/전망 자료 몇 개를 참조만 함)
+# - 원시자료를 제자리 수정하는 코드는 bump_data_version() 호출 (저널 반영 등)
+_fingerprint_memo = {}
+_data_version = 0
+
+
+def bump_data_version():
+    """원시자료 제자리 수정 후 호출 -> 이후 data_fingerprint 는 내용을 다시 해시"""
+    global _data_version
+    _data_version += 1
+    _fingerprint_memo.clear()
+
+
+def data_fingerprint(raw_data):
+    """raw_data(dict of DataFrame) 내용 기반 해시 (프로세스 간 동일)"""
+    frames = tuple(raw_data.items())
+    memo = _fingerprint_memo.get(id(raw_data))
+    if memo is not None and memo[0] is raw_data and memo[2] == _data_version and len(memo[1]) == len(frames) \
+            and all(k1 == k2 and v1 is v2 for (k1, v1), (k2, v2) in zip(memo[1], frames)):
+        return memo[3]
+
+    h = hashlib.sha256()
+    for key in sorted(raw_data.keys()):
+        df = raw_data[key]
+        h.update(str(key).encode('utf-8'))
+        if isinstance(df, pd.DataFrame):
+            h.update(repr(list(df.columns)).encode('utf-8'))
+            h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        else:
+            h.update(repr(df).encode('utf-8'))
+    digest = h.hexdigest()[:16]
+    if len(_fingerprint_memo) >= FINGERPRINT_MEMO_ENTRIES:
+        _fingerprint_memo.clear()
+    _fingerprint_memo[id(raw_data)] = (raw_data, frames, _data_version, digest)
+    return digest
+
+
+def overrides_fingerprint(overrides):
+    if not overrides:
+        return 'base'
+    payload = json.dumps(overrides, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _file_id(st):
+    return (st.st_dev, st.st_ino)
+
+
+class FileLock:
+    """O_EXCL 락 파일 기반 프로세스 간 배타 락 (Windows/Linux 공통)
+    - 보유 중에는 하트비트 스레드가 락 파일 mtime 을 갱신 (오래 걸리는 계산도 stale 판정되지 않음)
+    - stale 락 회수는 고유 이름으로 rename 후 삭제 (여러 대기자 중 한 명만 회수)
+    """
+
+    def __init__(self, path, stale_seconds=LOCK_STALE_SECONDS, heartbeat_seconds=None):
+        self.path = path
+        self.stale_seconds = stale_seconds
+        self.heartbeat_seconds = heartbeat_seconds or min(LOCK_HEARTBEAT_SECONDS, stale_seconds / 3)
+        self._fd = None
+        self._file_id = None
+        self._stop = None
+        self._heartbeat = None
+
+    def try_acquire(self):
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._break_if_stale()
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        self._file_id = _file_id(os.fstat(fd))
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, args=(self._stop,),
+                                           name='result-store-lock-heartbeat', daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _owned(self):
+        """락 파일이 아직 이 객체가 만든 파일인지 (회수되어 다른 프로세스가 새로 만들었을 수 있음)"""
+        try:
+            return _file_id(os.stat(self.path)) == self._file_id
+        except OSError:
+            return False
+
+    def _beat(self, stop):
+        while not stop.wait(self.heartbeat_seconds):
+            if not self._owned():
+                return
+            try:
+                os.utime(self.path)
+            except OSError:
+                return
+
+    def _break_if_stale(self):
+        """계산 도중 죽은 프로세스의 락 회수
+        - 확인 후 바로 삭제하면, 그 사이 다른 대기자가 회수하고 새로 만든 락까지 지울 수 있음
+        - rename 은 원자적이라 같은 락 파일을 두 대기자가 동시에 옮길 수 없음
+        - 옮긴 파일이 새 락이었다면(확인과 rename 사이에 생성) 원래 이름으로 되돌림
+        """
+        grave = '{}.{}.{}.stale'.format(self.path, os.getpid(), threading.get_ident())
+        try:
+            if time.time() - os.path.getmtime(self.path) <= self.stale_seconds:
+                return
+            os.rename(self.path, grave)
+        except OSError:
+            return
+        try:
+            if time.time() - os.path.getmtime(grave) <= self.stale_seconds:
+                try:
+                    os.link(grave, self.path)   # 비어 있을 때만 복원 (이미 새 락이 있으면 실패)
+                except OSError:
+                    pass
+        finally:
+            try:
+                os.remove(grave)
+            except OSError:
+                pass
+
+    def release(self):
+        if self._fd is not None:
+            self._stop.set()
+            self._heartbeat.join()
+            owned = self._owned()
+            os.close(self._fd)
+            self._fd = None
+            if owned:   # 회수된 뒤 다른 프로세스가 만든 락은 지우지 않음
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+
+class SharedResultStore:
+    """SQLite 파일에 분석 결과를 저장하여 모든 워커 프로세스가 공유"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.lock_dir = db_path + '.locks'
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    data_hash TEXT NOT NULL,
+                    target_year INTEGER NOT NULL,
+                    override_hash TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (data_hash, target_year, override_hash)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def make_key(raw_data, target_year, overrides=None):
+        return (data_fingerprint(raw_data), int(target_year), overrides_fingerprint(overrides))
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT payload FROM results WHERE data_hash=? AND target_year=? AND override_hash=?',
+                key).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, key, value):
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 3)
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                (*key, sqlite3.Binary(payload), time.time()))
+
+    def get_or_compute(self, key, compute_fn, wait_timeout=LOCK_STALE_SECONDS):
+        """저장소 조회 -> 없으면 락을 잡은 한 프로세스만 계산, 나머지는 결과 대기"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        lock = FileLock(os.path.join(self.lock_dir, '{}_{}_{}.lock'.format(*key)))
+        deadline = time.time() + wait_timeout
+        while not lock.try_acquire():
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self.get(key)
+            if value is not None:
+                return value
+            if time.time() > deadline:
+                print(f"[WARN] Result store lock timeout for {key}, computing locally")
+                return compute_fn()
+
+        try:
+            # 락 대기 중 다른 워커가 저장했을 수 있음
+            value = self.get(key)
+            if value is None:
+                value = compute_fn()
+                if value is not None:
+                    self.put(key, value)
+            return value
+        finally:
+            lock.release()
+
+    def stats(self):
+        """이 프로세스 기준 조회 통계"""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_ratio': (self.hits / total) if total else 0.0}
+
+    def purge(self, keep_data_hash=None):
+        """현재 원시자료 해시 외의 오래된 결과 삭제"""
+        with self._connect() as conn:
+            if keep_data_hash is None:
+                conn.execute('DELETE FROM results')
+            else:
+                conn.execute('DELETE FROM results WHERE data_hash != ?', (keep_data_hash,))
@@ -0,0 +1,32 @@
+"""
+테스트용 합성 원시자료 (load_all_data() 와 같은 키/구조)
+- 병원/의원 2개 유형, 연도별 누적 성장 계열
+- 같은 seed 면 항상 같은 자료 (난수 추출 순서 고정)
+"""
+
+import numpy as np
+import pandas as pd
+
+TYPES = ['병원', '의원']
+
+
+def synthetic_raw_data(years, seed, mei_cols, exp_growth=(0.0, 0.1), mei_missing_tail=0):
+    """years: 연도 목록, mei_cols: df_raw_mei_inf 열, mei_missing_tail: 물가지수 최근 결측 연수"""
+    years = list(years)
+    rng = np.random.default_rng(seed)
+    grow = lambda n, lo, hi: np.cumprod(1 + rng.uniform(lo, hi, n))
+    mei_years = years[:len(years) - mei_missing_tail]
+    return {
+        'df_expenditure': pd.DataFrame({t: 1000 * grow(len(years), *exp_growth) for t in TYPES}, index=years),
+        'df_weights': pd.DataFrame({'인건비': [0.5, 0.4], '관리비': [0.3, 0.4], '재료비': [0.2, 0.2]}, index=TYPES),
+        'df_raw_mei_inf': pd.DataFrame(
+            100 * np.cumprod(1 + rng.uniform(0, 0.05, (len(mei_years), len(mei_cols))), axis=0),
+            index=mei_years, columns=list(mei_cols)),
+        'df_gdp': pd.DataFrame({'실질GDP': 1000 * grow(len(years), 0.0, 0.04),
+                                '영안인구': 50 * grow(len(years), 0.0, 0.005)}, index=years),
+        'df_pop': pd.DataFrame({'건보대상자수': 48 * grow(len(years), 0.0, 0.005),
+                                '건보_고령화반영후(대상자수)': 49 * grow(len(years), 0.0, 0.01)}, index=years),
+        'df_sgr_law': pd.DataFrame({t: rng.uniform(0.99, 1.03, len(years)) for t in TYPES}, index=years),
+        'df_sgr_reval': pd.DataFrame({t: 70 * grow(len(years), 0.0, 0.03) for t in TYPES}, index=years),
+        'df_rel_value': pd.DataFrame({'병원': 1.01, '의원': 0.99}, index=years),
+    }
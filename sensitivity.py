@@ -0,0 +1,189 @@
+"""
+원자료 셀별 최종 조정률 국소 민감도 (Jacobian, 배치 교란)
+- 목표연도 최종 조정률(S1 / S2 / Link, 종별 x MEI 시나리오)을 결정하는 모든 원자료 셀
+  (진료비, GDP, 건보대상, 법과제도, 환산지수, 상대가치, 생산요소 물가, 비용구조)에 대해 중앙차분 d조정률/d셀 계산
+- 셀마다 +h / -h 교란 입력을 배치 축으로 쌓아 attribution.RateKernel 에 한 번에 통과
+  (엑셀을 고쳐 다시 돌리던 작업을 셀 수와 무관하게 청크당 1회 계산으로 대체)
+- 결과: 민감도(%p / 입력 단위), 탄력성(입력 1% 증가 시 %p), 탄력성 절댓값 순 랭킹 표
+- PAF 상하한(+-5%) 꺾임: +h / -h 중 한쪽만 상하한을 넘으면 기준점과 같은 쪽의 한쪽 차분 사용 (one_sided 표시)
+- 자료 범위 밖 연도 대체(엔진 _safe_get)로 한 셀이 여러 연도 행에 쓰이면 한 셀로 묶어 함께 교란
+
+사용 예:
+    res = jacobian(processor.raw_data, 2026)
+    res.ranking(scenario='평균', top=20)               # 셀별 최대 |탄력성| 순위
+    res.table(model='S1', type_name='의원', top=10)    # 특정 종별 조정률에 대한 셀 순위
+    python sensitivity.py 2026 --top 30
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import attribution
+from attribution import RateKernel, RATE_MODELS
+
+DEFAULT_REL_STEP = 1e-6
+DEFAULT_CHUNK = 256        # 청크당 셀 수 (배치 크기 = 2 x 청크)
+
+SHEET_LABELS = {
+    'df_expenditure': '진료비',
+    'df_gdp': 'GDP',
+    'df_pop': '건보대상',
+    'df_sgr_law': '법과제도',
+    'df_sgr_reval': '환산지수',
+    'df_rel_value': '상대가치',
+    'df_raw_mei_inf': '생산요소물가',
+    'df_weights': '비용구조',
+}
+
+
+def input_cells(kernel):
+    """커널 입력 배열의 유한값 셀 목록 (자료, 시트, 행, 열, 값, 위치) - 같은 원자료 행은 첫 위치 1개만"""
+    rows = []
+    for key, arr in kernel.base.items():
+        labels_r, labels_c = kernel.rows[key], kernel.columns[key]
+        source = kernel.row_source[key]
+        for flat in np.flatnonzero(np.isfinite(arr)):
+            i, j = divmod(int(flat), arr.shape[1])
+            if source[i] != i:
+                continue
+            rows.append((key, SHEET_LABELS.get(key, key), labels_r[i], labels_c[j], float(arr.flat[flat]), int(flat)))
+    return pd.DataFrame(rows, columns=['자료', '시트', '행', '열', '값', '위치'])
+
+
+class SensitivityResult:
+    """셀 x 출력(모형, 종별, 시나리오) Jacobian"""
+
+    def __init__(self, year, cells, outputs, base_rates, jacobian, one_sided=None):
+        self.year = year
+        self.cells = cells.reset_index(drop=True)
+        self.outputs = outputs
+        self.base_rates = base_rates
+        self.jacobian = jacobian                                   # (셀, 출력) %p / 입력 단위
+        self.one_sided = one_sided if one_sided is not None else np.zeros(jacobian.shape, dtype=bool)
+        self.elasticity = jacobian * self.cells['값'].to_numpy()[:, None] / 100.0   # 입력 1% 증가 시 %p
+
+    def _columns(self, model=None, type_name=None, scenario=None):
+        mask = np.ones(len(self.outputs), dtype=bool)
+        for level, value in (('모형', model), ('종별', type_name), ('시나리오', scenario)):
+            if value is not None:
+                mask &= self.outputs.get_level_values(level) == value
+        return np.flatnonzero(mask)
+
+    def table(self, model=None, type_name=None, scenario='평균', top=None):
+        """(셀, 출력) long 형식 - |탄력성| 내림차순"""
+        cols = self._columns(model, type_name, scenario)
+        el, jac = self.elasticity[:, cols], self.jacobian[:, cols]
+        out = self.outputs[cols].to_frame(index=False)
+        df = pd.concat([self.cells.drop(columns='위치').loc[np.repeat(np.arange(len(self.cells)), len(cols))]
+                        .reset_index(drop=True),
+                        pd.concat([out] * len(self.cells), ignore_index=True)], axis=1)
+        df['기준조정률(%)'] = np.tile(self.base_rates[cols], len(self.cells))
+        df['민감도'] = jac.ravel()
+        df['탄력성(%p/1%)'] = el.ravel()
+        df = df[df['탄력성(%p/1%)'].fillna(0) != 0]
+        df = df.reindex(df['탄력성(%p/1%)'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+        return df.head(top) if top else df
+
+    def ranking(self, model=None, scenario='평균', top=None):
+        """셀별 요약: 최대 |탄력성| 과 그 출력(모형/종별), 평균 |탄력성| - 최대 |탄력성| 내림차순"""
+        cols = self._columns(model, None, scenario)
+        el = np.abs(self.elasticity[:, cols])
+        filled = np.where(np.isnan(el), -1.0, el)
+        best = filled.argmax(axis=1)
+        df = self.cells.drop(columns='위치').copy()
+        df['최대|탄력성|'] = filled[np.arange(len(df)), best]
+        picked = self.outputs[cols[best]] if len(cols) else None
+        df['최대_모형'] = picked.get_level_values('모형') if picked is not None else None
+        df['최대_종별'] = picked.get_level_values('종별') if picked is not None else None
+        with np.errstate(invalid='ignore'):
+            df['평균|탄력성|'] = np.nanmean(np.where(np.isnan(el), np.nan, el), axis=1) if len(cols) else np.nan
+        df = df[df['최대|탄력성|'] > 0].sort_values('최대|탄력성|', ascending=False).reset_index(drop=True)
+        df.insert(0, '순위', list(range(1, len(df) + 1)))
+        return df.head(top) if top else df
+
+
+def _flatten(rates, models):
+    """{모형: (..., 1, 종별, 시나리오)} -> (..., 출력)"""
+    return np.concatenate([rates[m][..., 0, :, :].reshape(rates[m].shape[:-3] + (-1,)) for m in models], axis=-1)
+
+
+def _clamp_state(kernel, x, models):
+    """출력별 PAF 상하한 적용 여부 (..., 출력) - Link 는 상하한 없음"""
+    n_s = len(kernel.scenarios)
+    states = []
+    for m in models:
+        if m == 'Link':
+            state = np.zeros(x['df_expenditure'].shape[:-2] + (len(kernel.types),), dtype=bool)
+        else:
+            state = np.abs(kernel.paf(x, m, clamp=False)[..., 0, :]) > attribution.PAF_LIMIT
+        states.append(np.repeat(state, n_s, axis=-1))
+    return np.concatenate(states, axis=-1)
+
+
+def jacobian(raw_data, target_year, models=RATE_MODELS, rel_step=DEFAULT_REL_STEP, chunk_size=DEFAULT_CHUNK,
+             types=None):
+    """목표연도 최종 조정률의 원자료 셀별 중앙차분 Jacobian -> SensitivityResult"""
+    models = list(models)
+    kernel = RateKernel(raw_data, [target_year], types)
+    cells = input_cells(kernel)
+    outputs = pd.MultiIndex.from_product([models, kernel.types, kernel.scenarios], names=['모형', '종별', '시나리오'])
+    base_rates = _flatten(kernel.rates(kernel.base, models), models)
+    base_state = _clamp_state(kernel, kernel.base, models)
+    aliased = {k: src for k, src in kernel.row_source.items() if (src != np.arange(len(src))).any()}
+
+    values = cells['값'].to_numpy()
+    steps = rel_step * np.where(values != 0, np.abs(values), 1.0)
+    jac = np.empty((len(cells), len(outputs)))
+    one_sided = np.zeros(jac.shape, dtype=bool)
+    for start in range(0, len(cells), chunk_size):
+        sub = cells.iloc[start:start + chunk_size]
+        m = len(sub)
+        h = steps[start:start + m]
+        batch = {k: np.broadcast_to(v, (2 * m,) + v.shape).copy() for k, v in kernel.base.items()}
+        for key, grp in sub.groupby('자료', sort=False):
+            i = grp.index.to_numpy() - start
+            flat = batch[key].reshape(2 * m, -1)
+            flat[i, grp['위치'].to_numpy()] += h[i]
+            flat[m + i, grp['위치'].to_numpy()] -= h[i]
+        for key, src in aliased.items():
+            batch[key] = batch[key][:, src, :]                 # 대체 연도 행에 같은 셀 값 복사
+        out = _flatten(kernel.rates(batch, models), models)
+        plus, minus, hh = out[:m], out[m:], h[:, None]
+        d = (plus - minus) / (2 * hh)
+        state = _clamp_state(kernel, batch, models)
+        cross = state[:m] != state[m:]
+        if cross.any():
+            side = np.where(state[:m] == base_state, (plus - base_rates) / hh, (base_rates - minus) / hh)
+            d = np.where(cross, side, d)
+        jac[start:start + m] = d
+        one_sided[start:start + m] = cross
+    return SensitivityResult(target_year, cells, outputs, base_rates, jac, one_sided)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='원자료 셀별 최종 조정률 민감도')
+    parser.add_argument('year', type=int)
+    parser.add_argument('--model', default=None, choices=RATE_MODELS)
+    parser.add_argument('--scenario', default='평균')
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--data', default='SGR_data.xlsx')
+    parser.add_argument('--out', default=None, help='엑셀 저장 경로 (랭킹 + 상세)')
+    args = parser.parse_args(argv)
+
+    from 파이썬용_sgr_2027 import DataProcessor
+    processor = DataProcessor(args.data)
+    res = jacobian(processor.raw_data, args.year)
+    print(f"[INFO] {args.year}년 입력 셀 {len(res.cells)}개 x 출력 {len(res.outputs)}개 Jacobian 계산 완료")
+    ranking = res.ranking(args.model, args.scenario)
+    print(ranking.head(args.top).to_string(index=False))
+    if args.out:
+        with pd.ExcelWriter(args.out) as writer:
+            ranking.to_excel(writer, sheet_name='셀별_랭킹', index=False)
+            res.table(args.model, scenario=args.scenario).to_excel(writer, sheet_name='상세', index=False)
+        print(f"[SUCCESS] 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
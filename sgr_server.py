@@ -0,0 +1,576 @@
+"""
+SGR 웹 서버 실행 모듈 (확장 API 포함)
+- 파이썬용_sgr_2027.py 의 Flask app 에 확장 라우트(Blueprint)를 등록하여 실행
+- 실행: python sgr_server.py
+- 다중 워커 실행: gunicorn -w 4 'sgr_server:create_app()' (결과는 SGR_RESULT_STORE 파일로 공유)
+- SGR_PARALLEL_WARMUP=1: 시작 시 연도별 분석을 프로세스 풀(parallel_analysis.py)에서 선계산
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from flask import Blueprint, Response, abort, jsonify, request
+
+from 파이썬용_sgr_2027 import app, processor, sanitize_data
+from analysis_cache import AnalysisCache, AnalysisWarmer, compute_analysis, WARMUP_YEARS
+from result_store import SharedResultStore, bump_data_version, data_fingerprint
+from raw_data_api import get_raw_data_store, DEFAULT_PAGE_SIZE
+from live_simulation import serve_websocket
+from engine_profiler import profile_analysis, result_sizes, ProfilerBusy
+import metrics
+from excel_stream import stream_response
+from override_journal import OverrideJournal
+from parallel_analysis import run_years
+from ar_cube import ARCube
+from aggregation_matrix import overall_from_rows
+from budget_solver import constrained_grid
+from financial_forecast import FinancialForecast, scenarios_from_history, DEFAULT_PREMIUM_GROWTH
+from attribution import AttributionModel, MODELS as ATTRIBUTION_MODELS
+from sensitivity import jacobian
+from replay import counterfactual_replay, DEFAULT_START as REPLAY_START
+from driver_projection import (project_drivers, missing_drivers, METHODS as PROJECTION_METHODS,
+                              DEFAULT_HORIZON as PROJECTION_HORIZON, DEFAULT_WINDOW as PROJECTION_WINDOW)
+
+# WebSocket 실시간 시뮬레이션 (flask-sock 설치 시에만 활성화)
+try:
+    from flask_sock import Sock
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
+ext_bp = Blueprint('sgr_ext', __name__)
+
+# 1차: 프로세스 메모리 LRU, 2차: 워커 간 공유 SQLite 저장소
+analysis_cache = AnalysisCache()
+result_store = SharedResultStore()
+
+
+def analysis_key(target_year, overrides=None):
+    return SharedResultStore.make_key(processor.raw_data, target_year, overrides)
+
+
+# 전망으로 채운 원시자료 (원시자료 지문 + 대상연도별 1회 계산)
+_projections = {}
+# 분석용 전망(analysis_raw_data)과 /api/drivers/projection 의 공통 기본값
+PROJECTION_STALE_TAIL = True
+
+
+def analysis_raw_data(target_year, stale_tail=PROJECTION_STALE_TAIL):
+    """대상연도 입력(T-1, 물가 T-2)이 자료 범위를 넘으면 입력 동인 전망으로 채운 원시자료 -> (raw_data, 전망 연도)
+    stale_tail: 마지막 실적을 복사해 둔 뒤쪽 행도 전망 대상으로 처리"""
+    raw_data = processor.raw_data
+    if not missing_drivers(raw_data, target_year):
+        return raw_data, {}
+    key = (SharedResultStore.make_key(raw_data, target_year), stale_tail)
+    if key not in _projections:
+        if len(_projections) >= analysis_cache.max_entries:
+            _projections.clear()
+        proj = project_drivers(raw_data, horizon=target_year, stale_tail=stale_tail)
+        _projections[key] = (proj.raw_data, proj.projected_years())
+    return _projections[key]
+
+
+def request_overrides():
+    """요청의 사용자 수정값: POST {'overrides': {...}} 또는 ?overrides=<JSON> (다운로드 링크) -> dict 또는 None"""
+    if request.method == 'POST':
+        overrides = (request.get_json(silent=True) or {}).get('overrides')
+    else:
+        text = request.args.get('overrides')
+        overrides = json.loads(text) if text else None
+    if overrides is not None and not isinstance(overrides, dict):
+        raise ValueError('overrides 는 {키: 값} 객체여야 합니다.')
+    return overrides or None
+
+
+def get_cached_analysis(target_year, overrides=None):
+    """연도별 분석 결과 (history, components, bulk_sgr) - 메모리 -> 공유 저장소 -> 계산 순"""
+    key = analysis_key(target_year, overrides)
+
+    def compute():
+        raw_data, _ = analysis_raw_data(target_year)
+        return compute_analysis(raw_data, target_year, overrides)
+
+    return analysis_cache.get_or_compute(key, lambda: result_store.get_or_compute(key, compute))
+
+
+metrics.registry.add_collector(metrics.cache_collector({
+    'analysis_memory': analysis_cache,
+    'analysis_shared': result_store,
+}))
+
+def prefetch_years_parallel(years=WARMUP_YEARS, max_workers=None):
+    """캐시에 없는 연도를 프로세스 풀에서 한 번에 계산하여 메모리/공유 캐시에 적재"""
+    raw_data = processor.raw_data
+    missing = [y for y in years if analysis_key(y) not in analysis_cache]
+    if not missing:
+        return {}
+    results = run_years(raw_data, missing, max_workers=max_workers)
+    for year, result in results.items():
+        key = SharedResultStore.make_key(raw_data, year)
+        analysis_cache.put(key, result)
+        result_store.put(key, result)
+    return results
+
+
+warmer = AnalysisWarmer(get_cached_analysis, lambda y: analysis_key(y) in analysis_cache, years=WARMUP_YEARS)
+
+
+@ext_bp.route('/api/warmup_status')
+def warmup_status():
+    """연도별 사전 계산 상태 (UI에서 준비된 연도 표시용)"""
+    return jsonify({
+        'years': {str(y): s for y, s in warmer.status().items()},
+        'cache': analysis_cache.stats()
+    })
+
+
+@ext_bp.route('/api/analysis/<int:year>', methods=['GET', 'POST'])
+def analysis_by_year(year):
+    """연도별 분석 결과 (POST {'overrides': {...}} 이면 사용자 수정값 반영)"""
+    try:
+        overrides = request_overrides()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    try:
+        history, components, bulk_sgr = get_cached_analysis(year, overrides)
+        return jsonify(sanitize_data({
+            'success': True,
+            'year': year,
+            'history': history,
+            'components': components,
+            'bulk_sgr': bulk_sgr,
+            'projected': analysis_raw_data(year)[1]
+        }))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@ext_bp.route('/api/raw_sheets')
+def raw_sheets():
+    """원시자료 시트 목록 (본문 제외)"""
+    return jsonify({'sheets': get_raw_data_store(processor.raw_data).describe()})
+
+
+@ext_bp.route('/api/raw_sheet/<path:sheet>')
+def raw_sheet(sheet):
+    """시트 1개 부분 조회: ?columns=a,b&year_from=2015&year_to=2025&offset=0&limit=50"""
+    columns = request.args.get('columns')
+    try:
+        page = get_raw_data_store(processor.raw_data).query(
+            sheet,
+            columns=columns.split(',') if columns else None,
+            year_from=request.args.get('year_from', type=int),
+            year_to=request.args.get('year_to', type=int),
+            offset=request.args.get('offset', 0, type=int),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+        )
+        return jsonify(page)
+    except KeyError as e:
+        return jsonify({'error': str(e)}), 404
+
+
+@ext_bp.route('/metrics')
+def prometheus_metrics():
+    """Prometheus 수집용 (라우트별 지연, in-flight, 엔진 단계 시간, 캐시 적중률)"""
+    return Response(metrics.registry.render(), mimetype=metrics.CONTENT_TYPE)
+
+
+@ext_bp.route('/debug/profile')
+def debug_profile():
+    """run_full_analysis 1회 프로파일: ?year=2025&format=json|collapsed&memory=1&fresh=1
+    (디버그 모드 또는 SGR_PROFILE_ENDPOINT=1 일 때만 노출)"""
+    if not (app.debug or os.environ.get('SGR_PROFILE_ENDPOINT') == '1'):
+        abort(404)
+    year = request.args.get('year', 2025, type=int)
+    track_memory = request.args.get('memory') == '1'
+    try:
+        # 분석 캐시 경유 -> 적중/미스 이벤트 기록 (?fresh=1 이면 캐시 없이 엔진 실행)
+        analysis_fn = None if request.args.get('fresh') == '1' else get_cached_analysis
+        prof, result = profile_analysis(processor.raw_data, year, track_memory=track_memory,
+                                        analysis_fn=analysis_fn)
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+    if request.args.get('format') == 'collapsed':
+        return Response(prof.collapsed(), mimetype='text/plain; charset=utf-8')
+    extra = None
+    if track_memory:
+        # 결과 객체 구성요소별 크기 + 현재 캐시 항목 크기 (캐시 개수 산정용)
+        entry_sizes = analysis_cache.entry_sizes()
+        extra = {'result_bytes': result_sizes(result),
+                 'cache_bytes': {'entries': entry_sizes, 'total': sum(entry_sizes.values()),
+                                 'max_entries': analysis_cache.max_entries}}
+    return Response(prof.to_json(extra=extra), mimetype='application/json; charset=utf-8')
+
+
+# AR 시나리오 큐브 (분석 결과 키 + 모형별 1회 구성)
+_ar_cubes = {}
+MAX_R_POINTS = 5001
+
+
+def get_ar_cube(year, model='S1'):
+    """분석 결과(기본증가율, 시나리오 조정률)와 원시자료 진료비 가중치로 큐브 구성 (결과 없으면 None)"""
+    key = (analysis_key(year), model)
+    if key not in _ar_cubes:
+        history, _, bulk_sgr = get_cached_analysis(year)
+        if not _by_year(bulk_sgr.get('scenario_adjustments'), year):
+            return None
+        raw_data, _ = analysis_raw_data(year)
+        cube = ARCube.from_analysis(history, bulk_sgr, raw_data['df_expenditure'], year, model,
+                                    processor.HOSPITAL_TYPES, processor.GROUP_MAPPING)
+        if len(_ar_cubes) >= analysis_cache.max_entries * 2:
+            _ar_cubes.clear()
+        _ar_cubes[key] = cube
+    return _ar_cubes[key]
+
+
+def _parse_r(text):
+    """'0.1,0.5' 또는 '0:1:101' (시작:끝:개수) -> 배열 (최대 MAX_R_POINTS 개, 초과 시 ValueError)"""
+    if not text:
+        return None
+    if ':' in text:
+        start, stop, num = text.split(':')
+        num = int(num)
+        if not 1 <= num <= MAX_R_POINTS:
+            raise ValueError(f'r 개수는 1~{MAX_R_POINTS} 이어야 합니다: {num}')
+        return np.linspace(float(start), float(stop), num)
+    values = text.split(',')
+    if len(values) > MAX_R_POINTS:
+        raise ValueError(f'r 개수는 {MAX_R_POINTS} 이하여야 합니다: {len(values)}')
+    return np.array([float(v) for v in values])
+
+
+def _parse_bounds(text):
+    """'1.5,3.6' -> (하한, 상한) 인상률(%) (숫자 2개, 하한 <= 상한 아니면 ValueError)"""
+    if not text:
+        return None
+    values = [float(v) for v in text.split(',')]
+    if len(values) != 2 or not np.isfinite(values).all():
+        raise ValueError(f'bounds 는 하한,상한 두 숫자여야 합니다: {text}')
+    if values[0] > values[1]:
+        raise ValueError(f'bounds 하한이 상한보다 큽니다: {text}')
+    return tuple(values)
+
+
+@ext_bp.route('/api/ar/<int:year>')
+def ar_query(year):
+    """AR 시나리오 조회: ?model=S1&base_rate=GDP&mei_scenario=I1M1Z1&r=0:1:201&columns=전체,의원&format=rows|cube"""
+    model = request.args.get('model', 'S1')
+    try:
+        cube = get_ar_cube(year, model)
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 422
+    if cube is None:
+        return jsonify({'success': False, 'error': f'{year}년 {model} AR 분석 결과가 없습니다.'}), 404
+    if request.args.get('format') == 'cube':
+        return jsonify(sanitize_data({'success': True, 'year': year, 'model': model, 'cube': cube.to_dict()}))
+
+    def _list(name):
+        value = request.args.get(name)
+        return value.split(',') if value else None
+    try:
+        df = cube.query(r=_parse_r(request.args.get('r')), base_rate=_list('base_rate'),
+                        mei_scenario=_list('mei_scenario'), columns=_list('columns'))
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sanitize_data({'success': True, 'year': year, 'model': model,
+                                  'columns': list(df.columns), 'rows': df.to_numpy().tolist()}))
+
+
+# 추가소요재정 엑셀: 종별 -> 그룹 -> 전체 순 (화면 표와 동일)
+BUDGET_ROWS = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국',
+               '병원(계)', '의원(계)', '치과(계)', '한방(계)', '약국(계)', '전체']
+
+
+def _by_year(data, year):
+    if not data:
+        return None
+    return data.get(year) or data.get(str(year))
+
+
+def budget_frame(paths):
+    """{(모형, 시나리오): {'rate': {...}, 'budget': {...}}} -> 종별 x (인상률, 소요재정) 표"""
+    cols = {}
+    for label, item in paths.items():
+        cols[f'{label}_인상률(%)'] = pd.Series((item or {}).get('rate', {}), dtype=float)
+        cols[f'{label}_소요재정(억)'] = pd.Series((item or {}).get('budget', {}), dtype=float)
+    df = pd.DataFrame(cols)
+    order = [r for r in BUDGET_ROWS if r in df.index] + [r for r in df.index if r not in BUDGET_ROWS]
+    df = df.reindex(order)
+    df.index.name = '구분'
+    return df
+
+
+@ext_bp.route('/api/budget_envelopes/<int:year>')
+def budget_envelopes(year):
+    """목표 재정 격자별 제약 결과: ?envelopes=12000,13480,15000 또는 10000:20000:101 &bounds=1.5,3.6"""
+    try:
+        envelopes = _parse_r(request.args.get('envelopes'))
+        rate_bounds = _parse_bounds(request.args.get('bounds'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if envelopes is None or not len(envelopes):
+        return jsonify({'success': False, 'error': 'envelopes 가 필요합니다.'}), 400
+    _, _, bulk_sgr = get_cached_analysis(year)
+    data = _by_year(bulk_sgr.get('budget_analysis'), year)
+    if not data:
+        return jsonify({'success': False, 'error': f'{year}년 추가소요재정 분석 결과가 없습니다.'}), 404
+    df = constrained_grid(data, envelopes, rate_bounds=rate_bounds)
+    return jsonify(sanitize_data({'success': True, 'year': year, 'columns': list(df.columns),
+                                  'rows': df.to_numpy().tolist()}))
+
+
+@ext_bp.route('/api/attribution/<int:year>')
+def attribution(year):
+    """최종 조정률 요인분해: ?model=S1&scenario=평균,I1M1Z1&group=1 (group=1 이면 GROUP_MAPPING 유형 집계)"""
+    model = request.args.get('model', 'S1')
+    if model not in ATTRIBUTION_MODELS:
+        return jsonify({'success': False, 'error': f'model 은 {ATTRIBUTION_MODELS} 중 하나여야 합니다.'}), 400
+    scenarios = request.args.get('scenario')
+    try:
+        res = AttributionModel(processor.raw_data).run([year], models=[model])
+        if request.args.get('group') == '1':
+            res = res.by_group(processor.GROUP_MAPPING, processor.raw_data['df_expenditure'])
+        df = res.to_frame(model, scenarios=scenarios.split(',') if scenarios else None)
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sanitize_data({'success': True, 'year': year, 'model': model, 'factors': res.factors,
+                                  'residual': res.residual(model), 'columns': list(df.columns),
+                                  'rows': df.to_numpy().tolist()}))
+
+
+@ext_bp.route('/api/sensitivity/<int:year>')
+def sensitivity(year):
+    """입력 셀별 조정률 민감도 랭킹: ?model=S1&scenario=평균&type=의원&top=30 (type 지정 시 해당 종별 상세)"""
+    model = request.args.get('model') or None
+    scenario = request.args.get('scenario', '평균')
+    type_name = request.args.get('type')
+    top = request.args.get('top', 30, type=int)
+    try:
+        res = jacobian(processor.raw_data, year)
+        df = res.table(model, type_name, scenario, top) if type_name else res.ranking(model, scenario, top)
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sanitize_data({'success': True, 'year': year, 'n_cells': len(res.cells),
+                                  'columns': list(df.columns), 'rows': df.to_numpy().tolist()}))
+
+
+@ext_bp.route('/api/replay')
+def replay():
+    """반사실 과거 재현: ?start=2014&end=2026&year=2026&scenario=평균 -> 모형 x 종별 요약 + 시나리오별 누적 격차"""
+    start = request.args.get('start', REPLAY_START, type=int)
+    end = request.args.get('end', type=int)
+    year = request.args.get('year', type=int)
+    scenario = request.args.get('scenario', '평균')
+    try:
+        res = counterfactual_replay(processor.raw_data, start, end)
+        df = res.summary(year, scenario)
+        by_scenario = {m: res.scenario_table(m, year)['전체'].to_dict() for m in res.models}
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sanitize_data({'success': True, 'start': res.years[0], 'end': res.years[-1],
+                                  'columns': list(df.columns), 'rows': df.to_numpy().tolist(),
+                                  'cumulative_gap_by_scenario': by_scenario}))
+
+
+@ext_bp.route('/api/drivers/projection')
+def drivers_projection():
+    """입력 동인 전망: ?horizon=2035&method=ar1&window=10&stale_tail=1 -> 적합 계수 + 시트별 전망값
+    (stale_tail 기본값은 분석에 쓰는 전망과 동일)"""
+    horizon = request.args.get('horizon', PROJECTION_HORIZON, type=int)
+    method = request.args.get('method', 'ar1')
+    if method not in PROJECTION_METHODS:
+        return jsonify({'success': False, 'error': f'method 는 {PROJECTION_METHODS} 중 하나입니다.'}), 400
+    proj = project_drivers(processor.raw_data, horizon, method, request.args.get('window', PROJECTION_WINDOW, type=int),
+                           request.args.get('stale_tail', '1' if PROJECTION_STALE_TAIL else '0') == '1')
+    projected = proj.projected_years()
+    values = {key: {str(y): proj.raw_data[key].loc[y].to_dict() for y in years} for key, years in projected.items()}
+    params = proj.summary()
+    return jsonify(sanitize_data({'success': True, 'horizon': horizon, 'method': method,
+                                  'projected_years': projected, 'values': values,
+                                  'columns': list(params.columns), 'rows': params.to_numpy().tolist()}))
+
+
+@ext_bp.route('/api/overall_line', methods=['POST'])
+def overall_line():
+    """대시보드 '전체' 선: {'rows': {연도: {종별/그룹: 값}}, 'lag': 2} -> {연도: 진료비 가중평균}"""
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get('rows')
+    if not isinstance(rows, dict):
+        return jsonify({'success': False, 'error': 'rows 가 필요합니다.'}), 400
+    try:
+        overall = overall_from_rows(rows, processor.raw_data['df_expenditure'], processor.HOSPITAL_TYPES,
+                                    processor.GROUP_MAPPING, lag=int(payload.get('lag', 2)))
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sanitize_data({'success': True, 'overall': {str(y): v for y, v in overall.items()}}))
+
+
+@ext_bp.route('/api/financial_forecast/<int:year>')
+def financial_forecast(year):
+    """재정 장기 전망: ?horizon=2050&premium_growth=0.03,0.05,0.07 (조정률 시나리오는 해당 연도 분석 결과)"""
+    try:
+        horizon = request.args.get('horizon', 2050, type=int)
+        growth = _parse_r(request.args.get('premium_growth'))
+        growth = DEFAULT_PREMIUM_GROWTH if growth is None else growth
+        history, _, _ = get_cached_analysis(year)
+        result = FinancialForecast.from_finance(processor.raw_data['df_finance']).run(
+            scenarios_from_history(history, year), premium_growth=growth, horizon=horizon)
+    except (KeyError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sanitize_data({
+        'success': True,
+        'year': year,
+        'years': result.years.tolist(),
+        'premium_growth': result.premium_growth.tolist(),
+        'scenarios': result.scenarios,
+        'income': result.income[:, 0, :].tolist(),
+        'expenditure': result.expenditure[0].tolist(),
+        'acc_balance': result.acc_balance.tolist(),
+        'depletion_year': result.depletion_year.tolist(),
+        'first_deficit_year': result.first_deficit_year.tolist(),
+        'depletion_distribution': result.depletion_distribution().to_dict('records'),
+    }))
+
+
+def download_budget_stream(year):
+    """/download_budget/<year> - 캐시된 분석 결과로 스트리밍 작성 (모형별 시트, ?overrides= 수정값 반영)"""
+    try:
+        overrides = request_overrides()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    _, _, bulk_sgr = get_cached_analysis(year, overrides)
+    data = _by_year(bulk_sgr.get('budget_analysis'), year)
+    if not data:
+        return jsonify({'success': False, 'error': f'{year}년 추가소요재정 분석 결과가 없습니다.'}), 404
+    sheets = [(model, budget_frame({s: item for s, item in scenarios.items()}), True)
+              for model, scenarios in data.items()]
+    return stream_response(sheets, f'SGR_Budget_Analysis_{year}.xlsx')
+
+
+def download_budget_constrained_stream():
+    """/download_budget_constrained - 제약 시나리오별 시트 (?year=2025, ?overrides= 수정값 반영)"""
+    year = request.args.get('year', 2025, type=int)
+    try:
+        overrides = request_overrides()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    _, _, bulk_sgr = get_cached_analysis(year, overrides)
+    data = _by_year(bulk_sgr.get('budget_constraints'), year)
+    if not data:
+        return jsonify({'success': False, 'error': f'{year}년 제약 시나리오 결과가 없습니다.'}), 404
+    sheets = []
+    for scenario, models in data.items():
+        paths = {f'{m}_{s}': item for m, by_s in (models or {}).items() for s, item in (by_s or {}).items()}
+        sheets.append((scenario, budget_frame(paths), True))
+    return stream_response(sheets, f'SGR_Budget_Constrained_Analysis_{year}.xlsx')
+
+
+# 기존 라우트(URL 유지)의 처리 함수를 스트리밍 버전으로 교체
+STREAMING_DOWNLOADS = {
+    'download_budget': download_budget_stream,
+    'download_budget_constrained': download_budget_constrained_stream,
+}
+
+
+# 엑셀 저장: 저널 기록 후 즉시 응답, 워크북 반영은 백그라운드 (create_app 에서 생성)
+override_journal = None
+_original_views = {}
+# processor.raw_data 교체(저장 반영 / 압축 후 재로드) 직렬화
+_raw_data_lock = threading.Lock()
+
+
+def _apply_journal(cells=None):
+    """저널 수정값을 원시자료에 반영하고 이전 자료로 계산된 캐시 무효화 (_raw_data_lock 보유 상태에서 호출)
+    - 공유 저장소에서도 현재 원시자료 외의 결과 삭제 (자료 갱신마다 파일이 커지지 않게)"""
+    processor.raw_data = override_journal.apply_to_raw_data(processor.raw_data, cells)
+    bump_data_version()   # reload_data 가 원시자료를 제자리 갱신한 경우 대비
+    analysis_cache.clear()
+    _ar_cubes.clear()
+    _projections.clear()
+    result_store.purge(keep_data_hash=data_fingerprint(processor.raw_data))
+
+
+def _reload_after_compaction():
+    """워크북 반영 완료 -> 파일 재로드 후 아직 반영 안 된 수정값 재적용 (저널 기록 락 안에서 호출됨)"""
+    with _raw_data_lock:
+        processor.reload_data()
+        _apply_journal()
+
+
+def save_to_excel_file_journaled():
+    """/save_to_excel_file - mode='final' 은 저널 경로, 임시 저장(별도 파일 생성)은 기존 처리"""
+    body = request.get_json(silent=True) or {}
+    if override_journal is None or body.get('mode', 'final') != 'final':
+        return _original_views['save_to_excel_file']()
+    try:
+        accepted, rejected = override_journal.append(body.get('overrides') or {})
+    except OSError as e:
+        return jsonify({'success': False, 'error': f'저널 기록 실패: {e}'}), 500
+    with _raw_data_lock:
+        _apply_journal(accepted)
+    if rejected:
+        print(f"[WARN] 해석할 수 없거나 워크북에 없는 수정값 키 {len(rejected)}개: {rejected[:5]}")
+    return jsonify({
+        'success': True,
+        'message': f'{len(accepted)}개 항목 저장 (엑셀 반영 대기): {override_journal.workbook_path}',
+        'skipped': rejected,
+        'journal': override_journal.status(),
+    })
+
+
+@ext_bp.route('/api/override_journal')
+def override_journal_status():
+    """워크북 미반영 수정값 수 / 마지막 압축 오류"""
+    if override_journal is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(override_journal.status(), enabled=True))
+
+
+def _init_override_journal():
+    global override_journal
+    override_journal = OverrideJournal(processor.file_path, on_compacted=_reload_after_compaction)
+    if override_journal.pending():
+        # 이전 프로세스가 워크북 기록 전에 종료된 경우: 메모리 반영 + 재압축
+        with _raw_data_lock:
+            _apply_journal()
+        override_journal.schedule_compaction()
+
+
+def _live_simulation(ws):
+    """슬라이더 편집 스트림 -> 최신 결과 변경분 push (/ws/simulate)"""
+    serve_websocket(ws, lambda year: analysis_raw_data(year)[0], sanitize_data, base_analysis_fn=get_cached_analysis)
+
+
+def create_app(warmup=True):
+    if 'sgr_ext' not in app.blueprints:
+        metrics.install(app)
+        app.register_blueprint(ext_bp)
+        for endpoint, view in STREAMING_DOWNLOADS.items():
+            if endpoint in app.view_functions:
+                app.view_functions[endpoint] = view
+        if 'save_to_excel_file' in app.view_functions:
+            _original_views['save_to_excel_file'] = app.view_functions['save_to_excel_file']
+            app.view_functions['save_to_excel_file'] = save_to_excel_file_journaled
+            _init_override_journal()
+        if WEBSOCKET_AVAILABLE:
+            Sock(app).route('/ws/simulate')(_live_simulation)
+    if warmup:
+        if os.environ.get('SGR_PARALLEL_WARMUP') == '1':
+            # 프로세스 풀 선계산 후 스레드 warm-up 은 캐시 적중으로 상태만 갱신
+            def _parallel_then_warm():
+                try:
+                    prefetch_years_parallel()
+                except Exception as e:
+                    print(f"[WARN] Parallel warm-up failed, falling back to threads: {e}")
+                warmer.start()
+            threading.Thread(target=_parallel_then_warm, name='sgr-parallel-warmup', daemon=True).start()
+        else:
+            warmer.start()
+    return app
+
+
+if __name__ == '__main__':
+    create_app().run(debug=False, host='0.0.0.0', port=5000)
@@ -1,4 +1,5 @@
 const DATA_YEARS = Array.from({ length: 19 }, (_, i) => String(2010 + i)); // 2010-2028
+const PROJECTION_HORIZON = 2035; // 자료 범위 이후 연도는 입력 동인 전망(/api/analysis)으로 분석
 
 // --- GLOBAL STATE ---
 let originalData = null; // Store original data from backend
@@ -242,19 +243,7 @@ function initApp() {
     const targetTab = urlParams.get('tab');
 
     // Populate year selectors
-    const yearSels = ['detailYearSelector', 'dashboardYearSelector'];
-    const years = (appData.history && appData.history.years) ? appData.history.years : DATA_YEARS;
-    yearSels.forEach(id => {
-        const sel = document.getElementById(id);
-        if (!sel) return;
-        sel.innerHTML = '';
-        years.forEach(y => {
-            const opt = document.createElement('option');
-            opt.value = y; opt.textContent = `${y}년`;
-            if (y === 2025) opt.selected = true;
-            sel.appendChild(opt);
-        });
-    });
+    populateYearSelectors(2025);
 
     if (targetTab) {
         switchTab(targetTab);
@@ -271,13 +260,86 @@ function initApp() {
     // Add event listener for dashboard year selector
     const dashboardYearSelector = document.getElementById('dashboardYearSelector');
     if (dashboardYearSelector) {
-        dashboardYearSelector.addEventListener('change', function () {
-            renderCharts();
-            renderInsightReport();
-        });
+        dashboardYearSelector.addEventListener('change', onDashboardYearChange);
     }
 
     renderCharts();
+    pollWarmupStatus();
+}
+
+// 연도 선택기: 분석 연도 (대시보드는 자료 범위 이후 전망 연도 ~PROJECTION_HORIZON 추가)
+function populateYearSelectors(selectedYear) {
+    const years = (appData.history && appData.history.years) ? [...appData.history.years] : DATA_YEARS.map(Number);
+    const lastYear = Math.max(...years.map(Number));
+    const extended = [...years];
+    for (let y = lastYear + 1; y <= PROJECTION_HORIZON; y++) extended.push(y);
+    const projected = new Set(Object.values(appData.projected || {}).flat());
+    [['detailYearSelector', years], ['dashboardYearSelector', extended]].forEach(([id, options]) => {
+        const sel = document.getElementById(id);
+        if (!sel) return;
+        sel.innerHTML = '';
+        options.forEach(y => {
+            const opt = document.createElement('option');
+            const isProjected = Number(y) > lastYear || projected.has(Number(y));
+            opt.value = y; opt.textContent = isProjected ? `${y}년 (전망)` : `${y}년`;
+            if (Number(y) === Number(selectedYear)) opt.selected = true;
+            sel.appendChild(opt);
+        });
+    });
+}
+
+async function onDashboardYearChange() {
+    const year = dashboardYear();
+    sendLiveSimYear();
+    const years = ((appData.history && appData.history.years) || []).map(Number);
+    if (!years.includes(year) && !(await loadProjectedAnalysis(year))) return;
+    renderCharts();
+    renderInsightReport();
+}
+
+// 분석 결과에 없는 연도: 서버가 입력 동인(물가/GDP/인구/진료비 등) 전망으로 채워 분석한 결과로 교체
+// (현재 화면의 수정값을 함께 보내 수정 결과가 사라지지 않게 함)
+async function loadProjectedAnalysis(year) {
+    try {
+        const response = await fetch(`/api/analysis/${year}`, {
+            method: 'POST',
+            body: JSON.stringify({ overrides: collectAllOverrides() }),
+            headers: { 'Content-Type': 'application/json' }
+        });
+        const result = await response.json();
+        if (!result.success) throw new Error(result.error);
+        appData.history = result.history;
+        appData.components = result.components;
+        appData.bulk_sgr = result.bulk_sgr;
+        appData.projected = result.projected || {};
+        populateYearSelectors(year);
+        showToast(`📈 ${year}년: 자료가 없는 연도의 입력값을 전망치로 채워 분석했습니다.`, 'warning');
+        return true;
+    } catch (e) {
+        console.error('Projected analysis failed:', e);
+        showToast(`❌ ${year}년 전망 분석 실패: ${e.message}`, 'error');
+        return false;
+    }
+}
+
+// 서버 사전 계산(Warm-up) 상태를 연도 버튼에 표시 (준비된 연도 = hot)
+async function pollWarmupStatus() {
+    try {
+        const response = await fetch('/api/warmup_status');
+        if (!response.ok) return;
+        const status = await response.json();
+        let pending = false;
+        document.querySelectorAll('#aiYearSelectorContainer .category-tab').forEach(btn => {
+            const info = status.years[btn.textContent.trim()];
+            if (!info) return;
+            btn.classList.toggle('year-hot', info.hot);
+            btn.title = info.hot ? '사전 계산 완료' : `계산 상태: ${info.state}`;
+            if (info.state === 'pending' || info.state === 'running') pending = true;
+        });
+        if (pending) setTimeout(pollWarmupStatus, 3000);
+    } catch (e) {
+        // 확장 API가 없는 서버에서는 표시하지 않음
+    }
 }
 
 function initAllDataTables() {
@@ -335,6 +397,40 @@ function updateModelSelection() {
 }
 
 
+// 모형별 '전체' 선 (history 행 객체 + 내용 서명별 1회 요청 후 캐시, 응답이 오면 다시 그림)
+// applyAnalysisChanges 가 같은 행 객체를 제자리 수정하므로 객체만으로는 캐시 판정 불가
+const overallLineCache = new WeakMap();
+
+function getOverallLine(history, modelKey, years) {
+    const rows = history[modelKey] || {};
+    if (years.every(y => rows[y] && rows[y]['전체'] != null)) {
+        return years.map(y => rows[y]['전체']);
+    }
+    const signature = JSON.stringify(rows);
+    const cached = overallLineCache.get(rows);
+    if (cached === undefined || cached.signature !== signature) {
+        overallLineCache.set(rows, { signature: signature, overall: null });
+        fetch('/api/overall_line', {
+            method: 'POST',
+            body: JSON.stringify({ rows: rows, lag: 2 }),
+            headers: { 'Content-Type': 'application/json' }
+        })
+            .then(response => response.json())
+            .then(result => {
+                const current = overallLineCache.get(rows);
+                // 응답 전에 행이 다시 바뀌었으면 폐기 (새 요청이 진행 중)
+                if (result.success && Object.keys(result.overall).length > 0 &&
+                    current && current.signature === signature) {
+                    current.overall = result.overall;
+                    renderCharts();
+                }
+            })
+            .catch(err => console.error('Error fetching overall line:', err));
+        return null;
+    }
+    return cached.overall ? years.map(y => cached.overall[y] ?? null) : null;
+}
+
 function renderCharts() {
     const selectedYear = parseInt(document.getElementById('dashboardYearSelector')?.value || 2025);
     const selectedModelKey = document.getElementById('dashboardModelSelector')?.value || 'S2';
@@ -457,10 +553,12 @@ function renderCharts() {
         });
     });
 
-    if (!['GDP', 'MEI', 'Link'].includes(selectedModelKey)) {
+    // '전체' 가 없는 모형(GDP/MEI/Link)은 서버 공통 가중평균(/api/overall_line, T-2 진료비 가중)으로 보완
+    const overallLine = getOverallLine(history, selectedModelKey, years);
+    if (overallLine) {
         trendDatasets.push({
             label: '전체',
-            data: years.map(y => history[selectedModelKey][y]['전체']),
+            data: overallLine,
             borderColor: '#94a3b8',
             borderWidth: 4,
             pointStyle: 'rectRounded'
@@ -1276,15 +1374,23 @@ function renderDetailTable() {
 }
 
 function exportBudgetExcel(year) {
-    const url = `/download_budget/${year}`;
-    window.location.href = url;
+    window.location.href = withOverridesQuery(`/download_budget/${year}`);
+}
+
+// 다운로드 링크에 현재 화면의 수정값을 붙여 서버가 같은 입력으로 계산한 결과를 내려받게 함
+function withOverridesQuery(url) {
+    const overrides = collectAllOverrides();
+    if (Object.keys(overrides).length === 0) return url;
+    const sep = url.includes('?') ? '&' : '?';
+    return `${url}${sep}overrides=${encodeURIComponent(JSON.stringify(overrides))}`;
 }
 
 async function renderExcelRawView(container) {
     container.innerHTML = '<div class="glass" style="padding: 3rem; text-align: center;"><div class="spinner"></div><p style="margin-top: 1rem;">Excel 시트 데이터를 로드하고 있습니다...</p></div>';
 
     try {
-        const response = await fetch('/get_excel_raw_data');
+        // 시트 목록만 먼저 받고, 본문은 탭 선택 시 보이는 페이지만 요청
+        const response = await fetch('/api/raw_sheets');
         const data = await response.json();
 
         if (data.error) {
@@ -1294,7 +1400,7 @@ async function renderExcelRawView(container) {
 
         // Requested Order
         const requestedOrder = ['진료비_실제', '종별비용구조', '생산요소_물가', '1인당GDP', '건보대상', '연도별환산지수', '법과제도', '상대가치변화', '기관수', '수가계약결과', '건보_재정통계'];
-        const apiSheetNames = Object.keys(data);
+        const apiSheetNames = data.sheets.map(s => s.name);
         const sheetNames = requestedOrder.filter(name => apiSheetNames.includes(name));
 
         if (sheetNames.length === 0) {
@@ -1322,10 +1428,10 @@ async function renderExcelRawView(container) {
         `;
 
         container.innerHTML = html;
-        window.rawExcelData = data;
         window.rawSheetNames = sheetNames;
+        const RAW_PAGE_SIZE = 50;
 
-        window.switchSheetTab = (sheetName) => {
+        window.switchSheetTab = async (sheetName, offset = 0) => {
             const tabs = document.querySelectorAll('.sheet-tabs .category-tab');
             tabs.forEach(t => t.classList.remove('active'));
             const idx = window.rawSheetNames.indexOf(sheetName);
@@ -1333,9 +1439,15 @@ async function renderExcelRawView(container) {
             if (activeTab) activeTab.classList.add('active');
 
             const contentArea = document.getElementById('sheetContentContainer');
-            const sheetData = window.rawExcelData[sheetName];
+            let sheetData = null;
+            try {
+                const pageResponse = await fetch(`/api/raw_sheet/${encodeURIComponent(sheetName)}?offset=${offset}&limit=${RAW_PAGE_SIZE}`);
+                if (pageResponse.ok) sheetData = await pageResponse.json();
+            } catch (e) {
+                console.error("Sheet page load failed:", e);
+            }
 
-            if (!sheetData) {
+            if (!sheetData || sheetData.error) {
                 contentArea.innerHTML = '<div class="glass" style="padding: 2rem;">데이터를 찾을 수 없습니다.</div>';
                 return;
             }
@@ -1380,11 +1492,19 @@ async function renderExcelRawView(container) {
                 return `<tr>${rowCols}</tr>`;
             }).join('');
 
+            const rangeLabel = sheetData.rows.length ? `${sheetData.offset + 1}-${sheetData.offset + sheetData.rows.length}` : '0';
+            const prevOffset = sheetData.offset > 0 ? Math.max(0, sheetData.offset - sheetData.limit) : null;
+            const nextOffset = sheetData.offset + sheetData.rows.length < sheetData.total_rows ? sheetData.offset + sheetData.limit : null;
+
             contentArea.innerHTML = `
                 <div class="glass" style="overflow-x: auto; border-radius: 12px; border: 1px solid var(--border-glass); animation: slideUp 0.4s ease-out;">
                     <div style="background: linear-gradient(90deg, rgba(99, 102, 241, 0.1), transparent); padding: 1.5rem; border-bottom: 1px solid var(--border-glass); display: flex; justify-content: space-between; align-items: center;">
                         <h3 style="font-weight: 800; color: var(--accent-primary); margin: 0;">📋 시트명: ${sheetName}</h3>
-                        <span style="font-size: 0.8rem; background: rgba(255,255,255,0.05); padding: 0.3rem 0.8rem; border-radius: 20px;">Rows: ${sheetData.rows.length}</span>
+                        <div style="display: flex; gap: 0.5rem; align-items: center;">
+                            <button class="category-tab" style="padding: 0.3rem 0.8rem;" ${prevOffset === null ? 'disabled' : ''} onclick="switchSheetTab('${sheetName}', ${prevOffset})">◀</button>
+                            <span style="font-size: 0.8rem; background: rgba(255,255,255,0.05); padding: 0.3rem 0.8rem; border-radius: 20px;">Rows: ${rangeLabel} / ${sheetData.total_rows}</span>
+                            <button class="category-tab" style="padding: 0.3rem 0.8rem;" ${nextOffset === null ? 'disabled' : ''} onclick="switchSheetTab('${sheetName}', ${nextOffset})">▶</button>
+                        </div>
                     </div>
                     <div style="max-height: 600px; overflow-y: auto;">
                         <table class="detail-display-table" style="width: 100%; border-collapse: separate; border-spacing: 0;">
@@ -1770,7 +1890,7 @@ function renderBudgetAnalysis(year = 2025) {
                 <i class="fas fa-exclamation-triangle" style="color: #f59e0b; margin-right: 0.5rem;"></i>
                 본 수치는 2023년 결산 및 실적 데이터를 기반으로 한 추정치이며, 실제 예산과는 차이가 있을 수 있습니다.
             </div>
-            <button class="glass-btn" style="background: rgba(34, 197, 94, 0.2); border-color: rgba(34, 197, 94, 0.4); color: #4ade80;" onclick="location.href='/download_budget/2025'">
+            <button class="glass-btn" style="background: rgba(34, 197, 94, 0.2); border-color: rgba(34, 197, 94, 0.4); color: #4ade80;" onclick="exportBudgetExcel(2025)">
                 <i class="fas fa-file-excel"></i> 엑셀 시트 다운로드
             </button>
         </div>
@@ -1835,7 +1955,7 @@ function renderBudgetConstrainedTable(constrainedData, year) {
                     과거 수가협상 결과(${year - 5}-${year - 1})를 바탕으로, "추가소요재정" 또는 "수가인상률"을 제약조건으로 하여 연구 결과를 재산정한 2단계 분석입니다.
                 </p>
             </div>
-            <button class="primary" onclick="location.href='/download_budget_constrained'" style="background: #f59e0b; border-color: #f59e0b; box-shadow: 0 4px 15px rgba(245, 158, 11, 0.3);">
+            <button class="primary" onclick="location.href=withOverridesQuery('/download_budget_constrained')" style="background: #f59e0b; border-color: #f59e0b; box-shadow: 0 4px 15px rgba(245, 158, 11, 0.3);">
                 📥 제약 시나리오 결과 엑셀 다운로드
             </button>
         </div>
@@ -2359,8 +2479,8 @@ function resetMeiData() {
     });
 }
 
-function triggerGlobalSimulation() {
-    // Collect all user data and send to simulate
+// 화면에서 수정한 모든 입력값 -> 서버 수정값 키 형식
+function collectAllOverrides() {
     const allOverrides = {};
 
     // MEI
@@ -2423,10 +2543,84 @@ function triggerGlobalSimulation() {
         }
     }
 
-    updateSimulationWithData(allOverrides);
+    return allOverrides;
+}
+
+function triggerGlobalSimulation() {
+    // Collect all user data and send to simulate
+    updateSimulationWithData(collectAllOverrides());
+}
+
+// --- 실시간 시뮬레이션 채널 (/ws/simulate) ---
+// 편집 스트림을 하나의 연결로 보내고, 서버는 최신 입력만 계산하여 변경분을 push
+let liveSimSocket = null;
+let liveSimUnavailable = false;
+
+// 삭제된 키 표시 (live_simulation.REMOVED) - null 은 값이 null 로 바뀐 것
+function isRemovedMarker(value) {
+    return value && typeof value === 'object' && value.__removed__ === true && Object.keys(value).length === 1;
+}
+
+function applyAnalysisChanges(target, changes) {
+    for (const key in changes) {
+        const value = changes[key];
+        if (isRemovedMarker(value)) {
+            delete target[key];
+        } else if (value && typeof value === 'object' && !Array.isArray(value) &&
+            target[key] && typeof target[key] === 'object' && !Array.isArray(target[key])) {
+            applyAnalysisChanges(target[key], value);
+        } else {
+            target[key] = value;
+        }
+    }
+}
+
+function dashboardYear() {
+    return parseInt(document.getElementById('dashboardYearSelector')?.value || 2025);
+}
+
+// 세션 분석 연도를 대시보드 선택 연도와 맞춤 (연결 직후 / 연도 변경 시)
+function sendLiveSimYear() {
+    if (liveSimSocket && liveSimSocket.readyState === WebSocket.OPEN) {
+        liveSimSocket.send(JSON.stringify({ type: 'set_year', year: dashboardYear() }));
+    }
+}
+
+function getLiveSimSocket() {
+    if (liveSimUnavailable || typeof WebSocket === 'undefined') return null;
+    if (liveSimSocket && liveSimSocket.readyState <= WebSocket.OPEN) return liveSimSocket;
+
+    const proto = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    liveSimSocket = new WebSocket(`${proto}://${window.location.host}/ws/simulate`);
+    // 연결 중 HTTP(/simulate)로 보낸 수정값도 세션에 반영한 뒤 연도 설정 (첫 결과가 수정값 없는 결과로 덮어쓰지 않게)
+    liveSimSocket.onopen = () => {
+        liveSimSocket.send(JSON.stringify({ type: 'replace', overrides: collectAllOverrides() }));
+        sendLiveSimYear();
+    };
+    liveSimSocket.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        if (msg.type === 'result') {
+            if (msg.full) {
+                Object.assign(appData, msg.analysis_data);
+            } else {
+                applyAnalysisChanges(appData, msg.changes);
+            }
+            renderAllViews();
+        } else if (msg.type === 'error') {
+            console.error('Live simulation error:', msg.error);
+        }
+    };
+    liveSimSocket.onerror = () => { liveSimUnavailable = true; };
+    liveSimSocket.onclose = () => { liveSimSocket = null; };
+    return liveSimSocket;
 }
 
 async function updateSimulationWithData(overrides) {
+    const socket = getLiveSimSocket();
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ type: 'replace', overrides: overrides }));
+        return;
+    }
     try {
         const response = await fetch('/simulate', {
             method: 'POST',
@@ -0,0 +1,221 @@
+"""
+부하·확장성 테스트용 합성 데이터셋 생성기
+- 실제 SGR_data.xlsx 를 템플릿으로 사용하여 같은 시트 구조(시트명, 인덱스, 열 이름 규칙)를 유지
+- 종별 수(세부 종별/지역 추가), 연도 수, 생산요소 물가지수 변형(인건비_k / 관리비_k / 재료비_k) 개수 조절
+- 템플릿 범위 안의 값은 원본 그대로, 범위 밖의 연도는 열별 로그 증가율(평균/표준편차)로 전후 연장
+- 결과는 워크북(xlsx)으로 출력하여 DataProcessor 로 읽음 (시트 -> raw_data 변환은 DataProcessor 가 담당)
+
+사용 예:
+    python synthetic_data.py --types 40 --start 1990 --end 2035 --variants 6 4 4 --out SGR_data_x4.xlsx
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+TEMPLATE_FILE = 'SGR_data.xlsx'
+
+# 열 = 종별인 시트. 금액/기관수 시트는 세부 종별마다 규모를 다르게, 지수 시트는 원 종별 근처로 복제
+LEVEL_TYPE_SHEETS = ('expenditure_real', 'num')
+INDEX_TYPE_SHEETS = ('cf_t', 'law', 'rvs', 'Sheet1')
+COST_TYPES = ('인건비', '관리비', '재료비')
+TOTAL_COLUMN = '총계'
+
+
+def load_template(path=TEMPLATE_FILE):
+    return pd.read_excel(path, sheet_name=None, index_col=0)
+
+
+def _type_names(base_types, n_types):
+    """원 종별 이후 추가 종별은 '{원종별}_{번호}' (세부 종별/지역 단위로 가정)"""
+    if n_types <= len(base_types):
+        return list(base_types[:n_types]), {t: t for t in base_types[:n_types]}
+    names, parent = list(base_types), {t: t for t in base_types}
+    k = 0
+    while len(names) < n_types:
+        base = base_types[k % len(base_types)]
+        name = f"{base}_{k // len(base_types) + 2}"
+        names.append(name)
+        parent[name] = base
+        k += 1
+    return names, parent
+
+
+def _log_growth_stats(col):
+    """양수 열이면 (평균, 표준편차) 로그 증가율, 아니면 None (부트스트랩 대상)"""
+    values = col.to_numpy(dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) < 3 or (values <= 0).any():
+        return None
+    g = np.diff(np.log(values))
+    return float(g.mean()), float(g.std())
+
+
+def _extend_years(df, years, rng):
+    """연도 인덱스 시트를 새 연도 범위로 재구성 (겹치는 연도는 원본 유지)"""
+    old_years = [int(y) for y in df.index]
+    first, last = min(old_years), max(old_years)
+    out = pd.DataFrame(index=pd.Index(years, name=df.index.name), columns=df.columns, dtype=float)
+    for c in df.columns:
+        col = df[c].astype(float)
+        stats = _log_growth_stats(col)
+        series = {y: col.loc[y] for y in old_years if first <= y <= last}
+        fwd = [y for y in years if y > last]
+        bwd = [y for y in years if y < first][::-1]
+        if stats is None:
+            pool = col.dropna().to_numpy()
+            for y in fwd + bwd:
+                series[y] = rng.choice(pool) if len(pool) else np.nan
+        else:
+            mu, sigma = stats
+            valid = col.dropna()
+            level = valid.iloc[-1]
+            for y in fwd:
+                level *= np.exp(rng.normal(mu, sigma))
+                series[y] = level
+            level = valid.iloc[0]
+            for y in bwd:
+                level /= np.exp(rng.normal(mu, sigma))
+                series[y] = level
+        out[c] = [series.get(y, np.nan) for y in years]
+    # 정수형 시트(rvs, pop 등)는 정수형 유지
+    for c in df.columns:
+        if pd.api.types.is_integer_dtype(df[c]) and not out[c].isna().any():
+            out[c] = out[c].round().astype(df[c].dtype)
+    return out
+
+
+def _expand_types(df, names, parent, rng, spread):
+    """종별 열 확장: 추가 종별 = 원 종별 x 열별 배율 (spread: 배율 범위)"""
+    out = pd.DataFrame(index=df.index)
+    for name in names:
+        base = df[parent[name]]
+        if name == parent[name]:
+            out[name] = base
+            continue
+        lo, hi = spread
+        factor = rng.uniform(lo, hi)
+        col = base * factor
+        out[name] = col.round().astype(base.dtype) if pd.api.types.is_integer_dtype(base) else col
+    return out
+
+
+def _expand_cost_structure(df, names, parent, rng):
+    """비용구조: 추가 종별은 원 종별 비중에 교란 후 재정규화 (총계 = 1)"""
+    shares = df.loc[list(COST_TYPES)]
+    out = pd.DataFrame(index=shares.index)
+    for name in names:
+        s = shares[parent[name]].to_numpy(dtype=float)
+        if name != parent[name]:
+            s = s * rng.uniform(0.8, 1.2, size=len(s))
+        out[name] = s / s.sum()
+    out.loc[TOTAL_COLUMN] = out.sum()
+    out.index.name = df.index.name
+    return out
+
+
+def _expand_price_variants(df, variants, rng, drift=0.01):
+    """생산요소 물가 열(인건비_k ...) 개수 조정. 추가 변형은 기존 변형에 누적 표류(drift) 적용"""
+    out = pd.DataFrame(index=df.index)
+    for cost, n in zip(COST_TYPES, variants):
+        existing = [c for c in df.columns if str(c).startswith(f"{cost}_")]
+        for k in range(1, n + 1):
+            src = existing[(k - 1) % len(existing)]
+            col = df[src].astype(float)
+            if k > len(existing):
+                col = col * np.exp(np.cumsum(rng.normal(0.0, drift, size=len(col))))
+            out[f"{cost}_{k}"] = col
+    return out
+
+
+def generate_sheets(n_types=None, start_year=None, end_year=None, price_variants=None,
+                    template=None, seed=0):
+    """템플릿 구조를 따르는 합성 시트 딕셔너리 {시트명: DataFrame}
+
+    n_types: 종별 수 (None 이면 템플릿 그대로, 10 초과분은 세부 종별로 생성)
+    start_year / end_year: 진료비(expenditure_real) 기준 연도 범위. 다른 시트는 템플릿과의 상대 위치 유지
+    price_variants: (인건비, 관리비, 재료비) 변형 개수. MEI 시나리오 수 = 곱
+    """
+    template = template if template is not None else load_template()
+    rng = np.random.default_rng(seed)
+
+    base_types = [c for c in template['expenditure_real'].columns]
+    names, parent = _type_names(base_types, n_types or len(base_types))
+
+    ref_years = [int(y) for y in template['expenditure_real'].index]
+    ref_first, ref_last = min(ref_years), max(ref_years)
+    start_year = ref_first if start_year is None else start_year
+    end_year = ref_last if end_year is None else end_year
+
+    sheets = {}
+    for sheet, df in template.items():
+        if sheet == 'cost_structure':
+            sheets[sheet] = _expand_cost_structure(df, names, parent, rng)
+            continue
+
+        first, last = int(min(df.index)), int(max(df.index))
+        years = list(range(start_year + (first - ref_first), end_year + (last - ref_last) + 1))
+        out = _extend_years(df, years, rng)
+
+        if sheet in LEVEL_TYPE_SHEETS:
+            has_total = TOTAL_COLUMN in out.columns
+            out = _expand_types(out, names, parent, rng, spread=(0.3, 1.5))
+            if has_total:
+                out[TOTAL_COLUMN] = out.sum(axis=1)
+        elif sheet in INDEX_TYPE_SHEETS:
+            out = _expand_types(out, names, parent, rng, spread=(0.98, 1.02))
+        elif sheet == 'factor_pd' and price_variants:
+            out = _expand_price_variants(out, price_variants, rng)
+        sheets[sheet] = out
+    return sheets
+
+
+def write_workbook(sheets, path):
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name)
+    return path
+
+
+def dataset_size(sheets):
+    """크기 요약 (벤치마크 리포트용)"""
+    cells = sum(df.size for df in sheets.values())
+    exp = sheets['expenditure_real']
+    mei_cols = sheets['factor_pd'].columns
+    scenarios = 1
+    for cost in COST_TYPES:
+        scenarios *= max(1, sum(1 for c in mei_cols if str(c).startswith(f"{cost}_")))
+    return {
+        'types': len([c for c in exp.columns if c != TOTAL_COLUMN]),
+        'years': len(exp.index),
+        'mei_scenarios': scenarios,
+        'cells': int(cells),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SGR 합성 데이터셋 생성')
+    parser.add_argument('--template', default=TEMPLATE_FILE)
+    parser.add_argument('--types', type=int, help='종별 수')
+    parser.add_argument('--start', type=int, help='시작 연도')
+    parser.add_argument('--end', type=int, help='종료 연도')
+    parser.add_argument('--variants', type=int, nargs=3, metavar=('I', 'M', 'Z'),
+                        help='인건비/관리비/재료비 물가지수 변형 개수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help='출력 xlsx 경로')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.template):
+        print(f"[ERROR] Template not found: {args.template}")
+        return 1
+    sheets = generate_sheets(args.types, args.start, args.end, args.variants,
+                             template=load_template(args.template), seed=args.seed)
+    write_workbook(sheets, args.out)
+    print(f"[SUCCESS] {args.out} 생성: {dataset_size(sheets)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from aggregation_matrix import (AggregationMatrix, TYPE_GROUPS_5, weighted_average, weighted_average_series,
+                                overall_from_rows)
+
+TYPES = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국']
+
+
+def loop_group_average(df, exp_w, groups):
+    """기존 그룹별 루프 (비교 기준)"""
+    out = {}
+    for group, members in groups.items():
+        valid = [m for m in members if m in df.index and m in exp_w.index]
+        if not valid:
+            continue
+        total = exp_w.loc[valid].sum()
+        out[group] = (pd.Series(np.nan, index=df.columns) if total == 0
+                      else df.loc[valid].mul(exp_w.loc[valid] / total, axis=0).sum(axis=0))
+    return pd.DataFrame(out).T.reindex(list(groups))
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    df_exp = pd.DataFrame(rng.uniform(100, 1000, (3, len(TYPES))), index=[2021, 2022, 2023], columns=TYPES)
+    block = rng.normal(size=(3, len(TYPES), 4))
+    return df_exp, block
+
+
+def test_matches_group_loop_all_years():
+    df_exp, block = _data()
+    block[1, 2, 0] = np.nan
+    agg = AggregationMatrix(TYPE_GROUPS_5, TYPES)
+    out = agg.aggregate(block, df_exp, [2021, 2022, 2023])
+    for i, y in enumerate([2021, 2022, 2023]):
+        expected = loop_group_average(pd.DataFrame(block[i], index=TYPES), df_exp.loc[y], TYPE_GROUPS_5)
+        np.testing.assert_allclose(out[i], expected.to_numpy())
+
+
+def test_frame_with_missing_type_and_zero_total():
+    df_exp, block = _data(1)
+    df_exp.loc[2022, ['치과병원', '치과의원']] = 0
+    df = pd.DataFrame(block[1], index=TYPES).drop('요양병원')
+    agg = AggregationMatrix(TYPE_GROUPS_5, TYPES)
+    expected = loop_group_average(df, df_exp.loc[2022], TYPE_GROUPS_5)
+    pd.testing.assert_frame_equal(agg.aggregate_frame(df, df_exp, 2022), expected, check_names=False)
+
+
+def test_custom_overlapping_and_fixed_groups():
+    df_exp, block = _data(2)
+    groups = {'전체': TYPES, '병원급': ['상급종합', '종합병원'], '고정': {'의원': 3, '약국': 1}}
+    out = AggregationMatrix(groups, TYPES).aggregate(block, df_exp, [2021, 2022, 2023])
+    w = df_exp.loc[2021] / df_exp.loc[2021].sum()
+    np.testing.assert_allclose(out[0, 0], (block[0] * w.to_numpy()[:, None]).sum(axis=0))
+    np.testing.assert_allclose(out[2, 2], 0.75 * block[2, 4] + 0.25 * block[2, 9])
+
+
+def test_weighted_average_missing_modes_and_lag():
+    df_exp, block = _data(3)
+    block[2, 0, 1] = np.nan
+    zero = weighted_average(block[2:], df_exp, [2023], TYPES, lag=1)[0, 0]
+    renorm = weighted_average(block[2:], df_exp, [2023], TYPES, lag=1, missing='renormalize')[0, 0]
+    w = df_exp.loc[2022].to_numpy()
+    np.testing.assert_allclose(zero, np.nansum(block[2] * w[:, None], axis=0) / w.sum())
+    keep = ~np.isnan(block[2, :, 1])
+    assert abs(renorm[1] - (block[2, keep, 1] * w[keep]).sum() / w[keep].sum()) < 1e-12
+    np.testing.assert_allclose(renorm[[0, 2, 3]], zero[[0, 2, 3]])
+
+
+def test_weighted_average_series_matches_year_loop():
+    df_exp, block = _data(4)
+    df_index = pd.DataFrame(block[:, :, 0], index=df_exp.index, columns=TYPES)
+    out = weighted_average_series(df_index, df_exp, lag=1)
+    assert list(out.index) == [2022, 2023]
+    for y in out.index:
+        w = df_exp.loc[y - 1]
+        assert abs(out[y] - (df_index.loc[y] * w).sum() / w.sum()) < 1e-12
+
+
+def test_overall_from_type_or_group_rows():
+    df_exp, block = _data(5)
+    rows = {str(y): dict(zip(TYPES, block[i, :, 0])) for i, y in enumerate(df_exp.index)}
+    rows['2023']['약국'] = None
+    out = overall_from_rows(rows, df_exp, TYPES, TYPE_GROUPS_5, lag=2)
+    assert list(out) == [2023]
+    w = df_exp.loc[2021].drop('약국')
+    assert abs(out[2023] - (pd.Series(rows['2023']).drop('약국') * w).sum() / w.sum()) < 1e-12
+
+    group_rows = {2023: {'병원(계)': 2.0, '의원(계)': 1.0}}
+    groups = {'병원(계)': ['상급종합', '종합병원'], '의원(계)': ['의원']}
+    out = overall_from_rows(group_rows, df_exp, TYPES, groups, lag=0)
+    e = df_exp.loc[2023]
+    hosp = e['상급종합'] + e['종합병원']
+    assert abs(out[2023] - (2.0 * hosp + e['의원']) / (hosp + e['의원'])) < 1e-12
+
+
+def test_weighted_cf_lag_matches_calc_overall_cf():
+    # calculate_weighted_avg_cf 와 calc_overall_cf 는 같은 연도 정렬 (환산지수 t, 진료비 t-lag)
+    from calc_overall_cf import calculate_overall_cf
+    from calculate_weighted_avg_cf import calculate_weighted_average_cf
+    rng = np.random.default_rng(5)
+    df_exp = pd.DataFrame(rng.uniform(100, 1000, (8, len(TYPES))), index=range(2012, 2020), columns=TYPES)
+    df_cf = pd.DataFrame(rng.uniform(60, 100, (8, len(TYPES))), index=range(2014, 2022), columns=TYPES)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'SGR_data.xlsx')
+        with pd.ExcelWriter(path) as writer:
+            df_exp.to_excel(writer, sheet_name='expenditure_real')
+            df_cf.to_excel(writer, sheet_name='cf_t')
+        os.chdir(tmp)  # 결과 엑셀은 현재 폴더에 저장
+        try:
+            for lag in (0, 2):
+                ours = calculate_weighted_average_cf(path, lag=lag)
+                ref = calculate_overall_cf(path, lag=lag)
+                assert ours['연도'].tolist() == ref['연도'].tolist()
+                np.testing.assert_allclose(ours['가중평균환산지수'], ref['전체_환산지수'].round(4))
+                y = ours['연도'].iloc[0]
+                assert abs(ours['총진료비'].iloc[0] - df_exp.loc[y - lag].sum()) < 0.01
+        finally:
+            os.chdir(cwd)
+    assert ref['연도'].tolist() == list(range(2014, 2022))
+
+
+if __name__ == "__main__":
+    test_matches_group_loop_all_years()
+    test_frame_with_missing_type_and_zero_total()
+    test_custom_overlapping_and_fixed_groups()
+    test_weighted_average_missing_modes_and_lag()
+    test_weighted_average_series_matches_year_loop()
+    test_overall_from_type_or_group_rows()
+    test_weighted_cf_lag_matches_calc_overall_cf()
+    print("[SUCCESS] aggregation matrix tests passed")
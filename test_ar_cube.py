@@ -0,0 +1,95 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from ar_cube import ARCube
+
+TYPES = ['상급종합', '종합병원', '병원', '요양병원', '의원', '치과병원', '치과의원', '한방병원', '한의원', '약국']
+GROUPS = {'병원(계)': TYPES[:4], '의원(계)': ['의원'], '치과(계)': TYPES[5:7], '한방(계)': TYPES[7:9], '약국(계)': ['약국']}
+
+
+def _cube(r_values=(0.1, 0.5, 1.0)):
+    rng = np.random.default_rng(0)
+    weights = pd.Series(rng.uniform(1, 10, len(TYPES)), index=TYPES)
+    base = {b: pd.Series(rng.normal(2, 0.5, len(TYPES)), index=TYPES) for b in ['GDP', 'MEI', 'Link']}
+    cf = {f'I1M1Z{i}': pd.Series(rng.normal(1, 1, len(TYPES)), index=TYPES) for i in range(1, 5)}
+    return ARCube.build(base, cf, weights, r_values, GROUPS), base, cf, weights
+
+
+def test_matches_scenario_formula():
+    cube, base, cf, weights = _cube()
+    w = weights / weights.sum()
+    for b in base:
+        for s in cf:
+            for r in (0.1, 0.37, 1.0):
+                final = base[b] + r * (cf[s] - (cf[s] * w).sum())
+                got = cube.rates(b, s, r)
+                assert max(abs(got[t] - final[t]) for t in TYPES) < 1e-12
+                members = GROUPS['병원(계)']
+                group = (final[members] * weights[members]).sum() / weights[members].sum()
+                assert abs(got['병원(계)'] - group) < 1e-12
+                assert abs(got['전체'] - (base[b] * w).sum()) < 1e-12
+
+
+def test_dense_r_and_query():
+    cube, _, _, _ = _cube()
+    block = cube.values(r=np.linspace(0, 1, 500))
+    assert block.shape == (3, 4, 500, len(TYPES) + 6)
+    df = cube.query(base_rate='GDP', mei_scenario=['I1M1Z2'], r=[0.2, 0.4], columns=['전체', '의원'])
+    assert list(df.columns) == ['base_rate', 'mei_scenario', 'r', '전체', '의원']
+    assert len(df) == 2
+
+
+def test_records_roundtrip():
+    cube, _, _, _ = _cube()
+    records = cube.to_records()
+    assert len(records) == 3 * 4 * 3
+    rebuilt = ARCube.from_records(records)
+    np.testing.assert_allclose(rebuilt.values(), cube.values(), atol=1e-12)
+    restored = ARCube.from_dict(cube.to_dict())
+    np.testing.assert_allclose(restored.values(r=[0.3]), cube.values(r=[0.3]))
+
+
+def _engine_records(history, bulk_sgr, df_exp, year, model, r_values):
+    """엔진 run_full_analysis 의 AR 루프 (기본증가율 x 시나리오 x r, 결측 0)"""
+    exp_w = df_exp.loc[year - 2].reindex(TYPES).fillna(0)
+    w = exp_w / exp_w.sum()
+    out = []
+    for br in ('GDP', 'MEI', 'Link'):
+        base = pd.Series({t: history[br][year].get(t, 0) for t in TYPES})
+        for sn, adj in bulk_sgr['scenario_adjustments'][year].items():
+            cf = pd.Series({t: adj[model].get(t, 0) for t in TYPES})
+            for r in r_values:
+                final = base + r * (cf - (cf * w).sum())
+                rates = final.to_dict()
+                for g, members in GROUPS.items():
+                    rates[g] = (final[members] * w[members] / w[members].sum()).sum()
+                rates['전체'] = (final * w).sum()
+                out.append({'base_rate': br, 'mei_scenario': sn, 'r': r, 'rates': rates})
+    return out
+
+
+def test_from_analysis_matches_engine_loop():
+    rng = np.random.default_rng(1)
+    df_exp = pd.DataFrame(rng.uniform(100, 1000, (3, len(TYPES))), index=[2023, 2024, 2025], columns=TYPES)
+    history = {b: {2025: dict(zip(TYPES, rng.normal(2, 0.5, len(TYPES))))} for b in ('GDP', 'MEI', 'Link')}
+    del history['MEI'][2025]['약국']                                    # 결측 종별은 엔진처럼 0
+    bulk = {'scenario_adjustments': {2025: {s: {'S1': dict(zip(TYPES, rng.normal(1, 1, len(TYPES))))}
+                                            for s in ('I1M2Z2', '평균')}}}
+    cube = ARCube.from_analysis(history, bulk, df_exp, 2025, 'S1', TYPES, GROUPS)
+    assert cube.mei_scenarios == ['I1M2Z2', '평균'] and list(cube.r_values) == [1.0, 0.75, 0.5, 0.25, 0.15, 0.0]
+    for rec in _engine_records(history, bulk, df_exp, 2025, 'S1', cube.r_values):
+        got = cube.rates(rec['base_rate'], rec['mei_scenario'], rec['r'])
+        assert max(abs(got[k] - v) for k, v in rec['rates'].items()) < 1e-10
+
+
+if __name__ == "__main__":
+    test_matches_scenario_formula()
+    test_dense_r_and_query()
+    test_records_roundtrip()
+    test_from_analysis_matches_engine_loop()
+    print("[SUCCESS] AR cube tests passed")
@@ -8,6 +8,8 @@ from 파이썬용_sgr_2027 import DataProcessor, CalculationEngine
 import pandas as pd
 import numpy as np
 
+from ar_cube import ARCube
+
 def test_ar_analysis():
     processor = DataProcessor('SGR_data.xlsx')
     engine = CalculationEngine(processor.raw_data)
@@ -15,9 +17,10 @@ def test_ar_analysis():
     
     if 2025 in bulk_sgr['ar_analysis']:
         ar_2025 = bulk_sgr['ar_analysis'][2025]
-        print(f"Number of scenarios for 2025: {len(ar_2025)}")
-        if len(ar_2025) > 0:
-            first = ar_2025[0]
+        records = ar_2025['S1'] if isinstance(ar_2025, dict) else ar_2025
+        print(f"Number of scenarios for 2025: {len(records)}")
+        if len(records) > 0:
+            first = records[0]
             print(f"First scenario: {first['base_rate']}, {first['mei_scenario']}, r={first['r']}")
             print(f"Rates for '전체': {first['rates']['전체']}")
             
@@ -43,6 +46,13 @@ def test_ar_analysis():
             
             print(f"Avg Final: {avg_final:.4f}, Avg Base: {avg_base:.4f}")
             assert abs(avg_final - avg_base) < 0.1 # Should be very close
+            
+            # 원시자료로 구성한 큐브(ARCube.from_analysis)가 엔진 레코드와 일치 (레코드는 소수 2자리 반올림)
+            cube = ARCube.from_analysis(history, bulk_sgr, processor.raw_data['df_expenditure'], 2025, 'S1',
+                                        engine.HOSPITAL_TYPES, engine.GROUP_MAPPING)
+            for rec in records:
+                rebuilt = cube.rates(rec['base_rate'], rec['mei_scenario'], rec['r'])
+                assert all(abs(rebuilt[k] - v) < 0.011 for k, v in rec['rates'].items() if v is not None)
             print("AR Model weighting logic verified!")
     else:
         print("AR analysis data not found for 2025")
@@ -0,0 +1,110 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pytest
+
+from attribution import AttributionModel, FACTORS, PAF_LIMIT
+from sample_raw_data import synthetic_raw_data
+
+
+def _raw_data():
+    return synthetic_raw_data(range(2008, 2027), seed=1,
+                              mei_cols=['인건비_1', '인건비_2', '관리비_1', '관리비_2', '재료비_1', '재료비_2'])
+
+
+def _sgr(raw, y, model, t):
+    g, p = raw['df_gdp'], raw['df_pop']
+    gdp = (g.loc[y, '실질GDP'] / g.loc[y, '영안인구']) / (g.loc[y - 1, '실질GDP'] / g.loc[y - 1, '영안인구'])
+    pop = p.loc[y, '건보대상자수'] / p.loc[y - 1, '건보대상자수']
+    if model == 'S2':
+        gdp = 1 + (gdp - 1) * 0.8
+        pop = p.loc[y, '건보_고령화반영후(대상자수)'] / p.loc[y - 1, '건보대상자수']
+    reval = raw['df_sgr_reval'].loc[y, t] / raw['df_sgr_reval'].loc[y - 1, t]
+    return gdp * pop * raw['df_sgr_law'].loc[y, t] * reval
+
+
+def test_uaf_matches_engine_paf_formula():
+    # 엔진 calc_paf_s1 / s2: 누적 분모 AE_{T-2} x (1 + SGR_{T-1}), 범위 밖 연도는 첫 연도 값(_safe_get), +-5% 상하한
+    raw = _raw_data()
+    model = AttributionModel(raw)
+    ae = raw['df_expenditure']
+    first = ae.index.min()
+    clamped = 0
+    for T in (2015, 2022, 2025):
+        s1 = model.uaf_parts([T], 'S1', clamp=False).sum(axis=0)[0]
+        s2 = model.uaf_parts([T], 'S2', clamp=False).sum(axis=0)[0]
+        for j, t in enumerate(model.types):
+            a = lambda y: ae.loc[max(y, first), t]
+            sgr = lambda y, m: raw['df_sgr_law'].loc[first, t] if y <= first else _sgr(raw, y, m, t)
+            tge = lambda y, m: a(y - 1) * sgr(y, m)
+            short = (tge(T - 2, 'S1') - a(T - 2)) / a(T - 2)
+            window = range(T - 11, T - 1)
+            accum = (sum(tge(y, 'S1') for y in window) - sum(a(y) for y in window)) / \
+                (a(T - 2) * (1 + sgr(T - 1, 'S1')))
+            assert abs(s1[j] - (0.75 * short + 0.33 * accum)) < 1e-12
+            expected = sum(w * (tge(T - lag, 'S2') - a(T - lag)) / a(T - lag)
+                           for lag, w in ((2, 0.5), (3, 0.3), (4, 0.2)))
+            assert abs(s2[j] - expected) < 1e-12
+        for m, raw_uaf in (('S1', s1), ('S2', s2)):
+            paf = model.uaf_parts([T], m).sum(axis=0)[0]
+            np.testing.assert_allclose(paf, np.clip(raw_uaf, -PAF_LIMIT, PAF_LIMIT), atol=1e-15)
+            clamped += int((np.abs(raw_uaf) > PAF_LIMIT).sum())
+    assert clamped > 0
+
+
+def test_contributions_sum_to_final_rate():
+    raw = _raw_data()
+    model = AttributionModel(raw)
+    res = model.run(range(2020, 2027))
+    mei, _ = model.mei_index(range(2020, 2027))
+    for m in ('S1', 'S2'):
+        assert res.contributions[m].shape == (len(FACTORS), 7, 2, 8 + 4)
+        assert res.residual(m) < 1e-10
+        uaf = model.uaf_parts(range(2020, 2027), m).sum(axis=0)[..., None]
+        expected = mei * (1 + uaf) - 1
+        if m == 'S2':
+            expected = expected - (raw['df_rel_value'].loc[2019:2025].to_numpy() - 1)[..., None]
+        np.testing.assert_allclose(res.rates[m], expected * 100)
+    # S1 에는 상대가치 조정이 없음
+    assert np.all(res.contributions['S1'][-1] == 0)
+
+
+def test_explain_and_group_keep_additivity():
+    raw = _raw_data()
+    res = AttributionModel(raw).run([2025])
+    s = res.explain(2025, '의원', model='S2', scenario='I1M1Z1')
+    assert abs(s[FACTORS].sum() - s['조정률(%)']) < 1e-10
+    grouped = res.by_group({'전체': ['병원', '의원']}, raw['df_expenditure'])
+    w = raw['df_expenditure'].loc[2023]
+    expected = (res.rates['S1'][0, :, 0] * w.to_numpy()).sum() / w.sum()
+    assert abs(grouped.rates['S1'][0, 0, 0] - expected) < 1e-10
+    assert grouped.residual('S1') < 1e-10
+    df = res.to_frame('S1', years=[2025], scenarios=['평균'])
+    assert list(df['종별']) == ['병원', '의원']
+
+
+def test_kernel_rates_match_engine_history():
+    # 엔진 history S1/S2 = round((MEI 평균 x (1 + PAF) - 1) x 100, 2), S2 는 상대가치 차감 전
+    engine = pytest.importorskip('파이썬용_sgr_2027')
+    processor = engine.DataProcessor('SGR_data.xlsx')
+    history = engine.CalculationEngine(processor.raw_data).run_full_analysis(2025)[0]
+    types = list(processor.HOSPITAL_TYPES)
+    years = [y for y in history['years'] if history['S1'].get(y)]
+    res = AttributionModel(processor.raw_data, types).run(years)
+    s = res.scenarios.index('평균')
+    for i, year in enumerate(years):
+        for m in ('S1', 'S2'):
+            rate = res.rates[m][i, :, s] - res.contributions[m][-1, i, :, s]
+            expected = [history[m][year][t] for t in types]
+            np.testing.assert_allclose(rate, expected, atol=0.005 + 1e-9, err_msg=f'{m} {year}')
+
+
+if __name__ == "__main__":
+    test_uaf_matches_engine_paf_formula()
+    test_contributions_sum_to_final_rate()
+    test_explain_and_group_keep_additivity()
+    test_kernel_rates_match_engine_history()
+    print("[SUCCESS] attribution tests passed")
@@ -0,0 +1,55 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from budget_solver import additional_budget, constrained_grid, solve_scale_factors, DEFAULT_GROUPS
+
+
+def _inputs(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.5, 4.0, (12, 10)), rng.uniform(1e4, 1e5, 10)
+
+
+def test_linear_scale_matches_closed_form():
+    rates, base = _inputs()
+    envelopes = np.linspace(5000, 20000, 51)
+    res = solve_scale_factors(rates, base, envelopes)
+    assert res['k'].shape == (51, 12)
+    assert res['converged'].all()
+    expected = envelopes[:, None] / additional_budget(rates, base)[None]
+    np.testing.assert_allclose(res['k'], expected, rtol=1e-9)
+
+
+def test_bounded_rates_and_unreachable_envelopes():
+    rates, base = _inputs(1)
+    bounds = (1.5, 3.6)
+    floor = additional_budget(np.full(10, bounds[0]), base)
+    res = solve_scale_factors(rates, base, [floor * 0.5, floor * 1.5], rate_bounds=bounds)
+    assert not res['converged'][0].any()
+    assert res['converged'][1].all()
+    np.testing.assert_allclose(res['budget'][1], floor * 1.5, rtol=1e-6)
+    assert (res['rates'][1] >= bounds[0] - 1e-12).all() and (res['rates'][1] <= bounds[1] + 1e-12).all()
+
+
+def test_constrained_grid_from_budget_analysis():
+    rates, base = _inputs(2)
+    types = [t for members in DEFAULT_GROUPS.values() for t in members]
+    budget_year = {'S1': {}, 'S2': {}}
+    for i in range(4):
+        r = dict(zip(types, rates[i]))
+        b = dict(zip(types, rates[i] * base / 100))
+        budget_year['S1' if i < 2 else 'S2'][f'평균{i}'] = {'rate': r, 'budget': b}
+    grid = constrained_grid(budget_year, [10000, 12000])
+    assert len(grid) == 2 * 4
+    assert grid['converged'].all()
+    np.testing.assert_allclose(grid['전체_소요재정(억)'], grid['envelope'], rtol=1e-9)
+
+
+if __name__ == "__main__":
+    test_linear_scale_matches_closed_form()
+    test_bounded_rates_and_unreachable_envelopes()
+    test_constrained_grid_from_budget_analysis()
+    print("[SUCCESS] budget solver tests passed")
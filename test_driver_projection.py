@@ -0,0 +1,77 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from attribution import RateKernel
+from driver_projection import project_drivers, missing_drivers, fit_ar1
+from sample_raw_data import synthetic_raw_data
+
+
+def _raw_data():
+    return synthetic_raw_data(range(2008, 2027), seed=4, exp_growth=(0.02, 0.1), mei_missing_tail=2,
+                              mei_cols=['인건비_1', '인건비_2', '관리비_1', '재료비_1'])
+
+
+def test_ar1_fit_matches_per_series_least_squares():
+    rng = np.random.default_rng(0)
+    z = rng.normal(0.02, 0.01, (30, 5))
+    z[-3:, 1] = np.nan                        # 계열마다 마지막 관측 위치가 다름
+    last = np.array([29, 26, 29, 29, 29])
+    c, phi = fit_ar1(z, last, window=12)
+    for j in range(5):
+        seg = z[last[j] - 11:last[j] + 1, j]
+        b, a = np.polyfit(seg[:-1], seg[1:], 1)
+        assert abs(phi[j] - b) < 1e-12 and abs(c[j] - a) < 1e-12
+
+
+def test_fills_only_missing_tail_and_flags_it():
+    raw = _raw_data()
+    proj = project_drivers(raw, horizon=2032)
+    years = proj.projected_years()
+    assert years['df_raw_mei_inf'] == list(range(2025, 2033))
+    assert years['df_gdp'] == list(range(2027, 2033))
+    for key, flag in proj.flags.items():
+        out = proj.raw_data[key]
+        pd.testing.assert_frame_equal(out.loc[raw[key].index], raw[key].astype(float), check_names=False)
+        assert not flag.loc[raw[key].index].any().any()
+        assert out.loc[2032].notna().all()
+    # 상대가치(1 기준 지수)가 상수면 그대로 유지
+    np.testing.assert_allclose(proj.raw_data['df_rel_value'].loc[2027:], [[1.01, 0.99]] * 6)
+    assert proj.raw_data['df_weights'] is raw['df_weights']
+
+
+def test_projected_inputs_make_future_rates_computable():
+    raw = _raw_data()
+    assert missing_drivers(raw, 2026) == []
+    assert missing_drivers(raw, 2027) == ['df_raw_mei_inf']
+    k = RateKernel(raw, [2030])
+    assert np.isnan(k.rates(k.base)['S1']).all()
+    proj = project_drivers(raw, horizon=2030)
+    assert missing_drivers(proj.raw_data, 2030) == []
+    k = RateKernel(proj.raw_data, [2030])
+    assert all(np.isfinite(r).all() for r in k.rates(k.base).values())
+
+
+def test_trend_method_and_stale_tail():
+    raw = _raw_data()
+    exp = raw['df_expenditure'].copy()
+    exp.loc[2025:2026] = exp.loc[2024].to_numpy()       # 마지막 실적 복사 행
+    raw['df_expenditure'] = exp
+    proj = project_drivers(raw, horizon=2028, method='trend', stale_tail=True)
+    assert proj.projected_years()['df_expenditure'] == [2025, 2026, 2027, 2028]
+    growth = np.log(proj.raw_data['df_expenditure'].loc[2025:2028]).diff().dropna()
+    np.testing.assert_allclose(growth.to_numpy(), np.broadcast_to(growth.iloc[0].to_numpy(), growth.shape))
+    # 법과제도 지수는 복사 판정 대상이 아님
+    assert proj.projected_years()['df_sgr_law'] == [2027, 2028]
+
+
+if __name__ == "__main__":
+    test_ar1_fit_matches_per_series_least_squares()
+    test_fills_only_missing_tail_and_flags_it()
+    test_projected_inputs_make_future_rates_computable()
+    test_trend_method_and_stale_tail()
+    print("[SUCCESS] driver projection tests passed")
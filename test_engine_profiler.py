@@ -0,0 +1,49 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import pytest
+
+from engine_profiler import EngineProfiler, ProfilerBusy
+
+MB = 2 ** 20
+
+
+class _Calc:
+    def __init__(self):
+        self.kept = []
+
+    def outer(self):
+        self.kept.append(bytearray(2 * MB))
+        self.inner()
+        self.inner()
+
+    def inner(self):
+        self.kept.append(bytearray(MB))
+
+
+def test_memory_counts_self_retained_only():
+    calc = _Calc()
+    with EngineProfiler(targets=[_Calc], track_memory=True) as prof:
+        calc.outer()
+    mem = prof.memory()
+    # outer 의 잔존에는 inner 할당(2MB)이 포함되지 않음
+    assert abs(mem['_Calc.outer']['retained_bytes'] - 2 * MB) < 0.1 * MB
+    assert abs(mem['_Calc.inner']['retained_bytes'] - 2 * MB) < 0.1 * MB
+    node = prof.root.children['_Calc.outer']
+    assert node.retained_bytes - node.self_retained_bytes == node.children['_Calc.inner'].retained_bytes
+
+
+def test_busy_profiler_raises_profiler_busy():
+    with EngineProfiler(targets=[]):
+        with pytest.raises(ProfilerBusy):
+            EngineProfiler(targets=[]).__enter__()
+    with EngineProfiler(targets=[]):
+        pass
+
+
+if __name__ == "__main__":
+    test_memory_counts_self_retained_only()
+    test_busy_profiler_raises_profiler_busy()
+    print("[SUCCESS] engine profiler tests passed")
@@ -0,0 +1,113 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_forecast import FinancialForecast, NO_YEAR, scenarios_from_history
+
+
+def _forecast():
+    return FinancialForecast(base_year=2024, premium=1000.0, gov_ratio=0.1, other_ratio=0.0, benefit=1000.0,
+                             admin_ratio=0.0, acc_balance=300.0, volume_growth=0.0)
+
+
+def test_matches_year_by_year_loop():
+    fc = _forecast()
+    res = fc.run({'low': 1.0, 'high': 4.0}, premium_growth=[0.02, 0.05], horizon=2040)
+    assert res.acc_balance.shape == (2, 2, 16)
+    for p, g in enumerate([0.02, 0.05]):
+        for c, cf in enumerate([1.0, 4.0]):
+            premium, benefit, acc = 1000.0, 1000.0, 300.0
+            for i, year in enumerate(range(2025, 2041)):
+                premium *= 1 + g
+                benefit *= 1 + cf / 100
+                acc += premium * 1.1 - benefit
+                assert abs(res.acc_balance[p, c, i] - acc) < 1e-6
+
+
+def test_deficit_years_and_distribution():
+    fc = _forecast()
+    res = fc.run({'flat': 0.0, 'fast': 12.0}, premium_growth=[0.0], horizon=2030)
+    # 수입 1100 > 지출 1000 -> 적자 없음 / 12% 증가 시 2025년 지출 1120 -> 당기적자
+    assert res.first_deficit_year[0, 0] == NO_YEAR
+    assert res.first_deficit_year[0, 1] == 2025
+    dist = res.depletion_distribution()
+    assert dist['경우수'].sum() == 2
+    assert dist.iloc[-1]['고갈_연도'] == '2030년 이후'
+    legacy = res.to_legacy()
+    assert legacy['fast'][2026]['is_deficit'] and not legacy['flat'][2026]['is_deficit']
+
+
+def test_from_finance_sheet():
+    df = pd.DataFrame({
+        '연도': [2022, 2023, 2024],
+        '보험료수입': [800.0, 820.0, 840.0], '정부지원': [100.0, 110.0, 120.0], '기타수입': [20.0, 25.0, 30.0],
+        '보험급여비': [830.0, 890.0, 950.0], '관리운영비_기타지출포함': [20.0, 20.0, 21.0],
+        '누적수지': [240.0, 280.0, 297.0], '환산지수_가중평균': [84.4, 86.2, 88.1],
+    })
+    fc = FinancialForecast.from_finance(df)
+    assert fc.base_year == 2024
+    assert abs(fc.gov_ratio - 120 / 840) < 1e-12
+    expected = np.mean([(890 / 86.2) / (830 / 84.4) - 1, (950 / 88.1) / (890 / 86.2) - 1])
+    assert abs(fc.volume_growth - expected) < 1e-12
+
+
+def test_short_paths_hold_last_value_and_bad_inputs_raise():
+    fc = _forecast()
+    res = fc.run({'path': [1.0, 4.0]}, premium_growth=[0.0], horizon=2028)
+    growth = res.expenditure[0, 0, 1:] / res.expenditure[0, 0, :-1] - 1
+    np.testing.assert_allclose(growth, [0.04, 0.04, 0.04])
+    with pytest.raises(ValueError):
+        fc.run({})
+    with pytest.raises(ValueError):
+        fc.run({'S1': 1.0}, horizon=2024)
+    with pytest.raises(ValueError):
+        fc.run({'S1': []})
+
+
+def _check_legacy_identities(forecast):
+    for by_year in forecast.values():
+        years = sorted(int(y) for y in by_year)
+        for prev, year in zip(years, years[1:]):
+            row = by_year[year]
+            assert abs(row['net_balance'] - (row['total_income'] - row['expenditure'])) <= 1
+            assert abs(row['acc_balance'] - (by_year[prev]['acc_balance'] + row['net_balance'])) <= len(years)
+            assert row['is_deficit'] == (row['net_balance'] < 0)
+
+
+def test_legacy_matches_engine_forecast():
+    engine = pytest.importorskip('파이썬용_sgr_2027')
+    processor = engine.DataProcessor('SGR_data.xlsx')
+    history, _, bulk = engine.CalculationEngine(processor.raw_data).run_full_analysis(target_year=2025)
+    forecast = bulk.get('financial_forecast')
+    if not forecast:
+        pytest.skip("엔진 결과에 financial_forecast 가 없음")
+    fc = FinancialForecast.from_finance(processor.raw_data['df_finance'])
+    models = [m for m in ('S1', 'S2') if m in forecast]
+    scenarios = {m: v for m, v in scenarios_from_history(history, 2025).items() if m in models}
+    ours = fc.run(scenarios, premium_growth=[0.0], horizon=max(int(y) for m in models for y in forecast[m]))
+    legacy = ours.to_legacy()
+    _check_legacy_identities(legacy)
+    _check_legacy_identities({m: {int(y): v for y, v in forecast[m].items()} for m in models})
+    for m in models:
+        engine_rows = {int(y): v for y, v in forecast[m].items()}
+        # 같은 필드, 엔진 전망 연도 중 기준연도 이후는 모두 포함
+        assert set(legacy[m][fc.base_year + 1]) == set(next(iter(engine_rows.values())))
+        assert {y for y in engine_rows if y > fc.base_year} <= set(legacy[m])
+        # 같은 finance 시트 기준: 첫 전망 연도 누적수지 - 당기수지 = 기준연도 누적수지
+        first = engine_rows.get(fc.base_year + 1)
+        if first is not None:
+            assert abs(first['acc_balance'] - first['net_balance'] - fc.acc_balance) <= 1
+
+
+if __name__ == "__main__":
+    test_matches_year_by_year_loop()
+    test_deficit_years_and_distribution()
+    test_from_finance_sheet()
+    test_short_paths_hold_last_value_and_bad_inputs_raise()
+    test_legacy_matches_engine_forecast()
+    print("[SUCCESS] financial forecast tests passed")
@@ -0,0 +1,61 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from golden_outputs import flatten_analysis, compare, is_identical, save_golden, load_golden
+
+
+def _sample(scale=1.0):
+    history = {'S1': {2025: {'병원(계)': 1.5 * scale, '의원(계)': 2.0}}, 'years': [2024, 2025]}
+    components = {'mei_raw': {2025: pd.DataFrame({'평균': [1.02, np.nan]}, index=['병원', '의원'])}}
+    bulk_sgr = {'ar_analysis': {2025: [{'r': 0.5, 'rates': {'전체': 1.9}}]}}
+    return {2025: (history, components, bulk_sgr)}
+
+
+def test_identical_outputs():
+    golden = flatten_analysis(_sample())
+    result = compare(golden, flatten_analysis(_sample()))
+    assert is_identical(result), result
+    # NaN 끼리는 동일로 간주
+    assert result['compared'] == len(golden[0])
+
+
+def test_ranked_deviations():
+    result = compare(flatten_analysis(_sample()), flatten_analysis(_sample(scale=1.1)))
+    assert result['mismatched'] == 1
+    top = result['deviations'].iloc[0]
+    assert top['path'] == '2025/history/S1/2025/병원(계)'
+    assert abs(top['abs_diff'] - 0.15) < 1e-12
+
+
+def test_missing_and_added_paths():
+    golden = flatten_analysis(_sample())
+    current = _sample()
+    current[2025][0]['S2'] = {2025: {'병원(계)': 1.0}}
+    del current[2025][2]['ar_analysis']
+    result = compare(golden, flatten_analysis(current))
+    assert result['added'] == ['2025/history/S2/2025/병원(계)']
+    assert len(result['missing']) == 2
+    assert not is_identical(result)
+
+
+def test_npz_roundtrip():
+    keys, values = flatten_analysis(_sample())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'golden.npz')
+        save_golden(path, keys, values, {'years': [2025]})
+        k2, v2 = load_golden(path)
+    assert (k2 == keys).all()
+    assert np.array_equal(v2, values, equal_nan=True)
+
+if __name__ == "__main__":
+    test_identical_outputs()
+    test_ranked_deviations()
+    test_missing_and_added_paths()
+    test_npz_roundtrip()
+    print("[SUCCESS] golden output tests passed")
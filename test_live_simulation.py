@@ -0,0 +1,130 @@
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+import analysis_cache
+import live_simulation
+from result_store import bump_data_version
+from live_simulation import (LiveSimulationSession, REMOVED, affected_calculators, diff_tree,
+                             reuse_engine_caches)
+
+
+class _FakeEngine:
+    """연도별 캐시를 가진 계산기 2개 + 계산 횟수 기록"""
+    runs = []
+
+    def __init__(self, raw_data, overrides=None):
+        self.mei_calc = SimpleNamespace(_cache={})
+        self.sgr_calc = SimpleNamespace(_comp_cache={}, _s1_cache={}, _s2_cache={})
+
+    def run_full_analysis(self, target_year=2025):
+        computed = []
+        for y in (target_year - 1, target_year):
+            if y not in self.mei_calc._cache:
+                self.mei_calc._cache[y] = 'mei'
+                computed.append(('mei', y))
+            if y not in self.sgr_calc._comp_cache:
+                self.sgr_calc._comp_cache[y] = 'sgr'
+                computed.append(('sgr', y))
+        _FakeEngine.runs.append(computed)
+        return {'S1': {target_year: 1.0}}, {}, {}
+
+
+class _InPlaceEngine(_FakeEngine):
+    """엔진처럼 수정값(GDP_연도)을 raw_data 에 제자리 기록하고 그 값으로 결과 계산"""
+
+    def __init__(self, raw_data, overrides=None):
+        super().__init__(raw_data, overrides)
+        self.raw_data = raw_data
+        for key, value in (overrides or {}).items():
+            if key.startswith('GDP_'):
+                raw_data['df_gdp'].loc[int(key.split('_')[1]), '실질GDP'] = value
+
+    def run_full_analysis(self, target_year=2025):
+        super().run_full_analysis(target_year)
+        return {'S1': {target_year: float(self.raw_data['df_gdp'].loc[2024, '실질GDP'])}}, {}, {}
+
+
+def test_diff_tree_removal_marker():
+    prev = {'a': 1, 'b': {'x': 1, 'y': 2}, 'c': 3}
+    new = {'a': None, 'b': {'x': 1}}
+    assert diff_tree(prev, new) == {'a': None, 'b': {'y': REMOVED}, 'c': REMOVED}
+    assert diff_tree(new, new) is None
+
+
+def test_affected_calculators():
+    assert affected_calculators(['I1_2024', 'WEIGHT_의원_인건비 ']) == {'mei_calc'}
+    assert affected_calculators(['GDP_2024', 'LAW_병원_2025', '의원_2023']) == {'sgr_calc'}
+    assert affected_calculators(['RV_병원_2025']) == set()
+
+
+def test_reuse_engine_caches_skips_stale_calculators():
+    prev, engine = _FakeEngine(None), _FakeEngine(None)
+    prev.mei_calc._cache[2024] = 'mei'
+    prev.sgr_calc._s1_cache[2024] = 'paf'
+    assert reuse_engine_caches(prev, engine, {'I1_2024'}) == ['sgr_calc']
+    assert engine.mei_calc._cache == {} and engine.sgr_calc._s1_cache == {2024: 'paf'}
+    assert engine.sgr_calc._s1_cache is not prev.sgr_calc._s1_cache
+
+
+def test_session_reuses_intermediate_results(monkeypatch):
+    monkeypatch.setattr(live_simulation, 'build_engine', _FakeEngine)
+    _FakeEngine.runs = []
+    raw = {}
+    session = LiveSimulationSession(lambda year: raw, lambda text: None, lambda x: x)
+    try:
+        session._analysis_for({'GDP_2024': 1.0}, 2025)
+        session._analysis_for({'GDP_2024': 1.0, 'I1_2024': 2.0}, 2025)   # MEI 입력만 변경 -> SGR 캐시 재사용
+        assert session.reused == ['sgr_calc']
+        session._analysis_for({'GDP_2024': 1.0, 'I1_2024': 2.0}, 2026)   # 연도 변경 -> 두 계산기 모두 재사용
+        assert session.reused == ['mei_calc', 'sgr_calc']
+    finally:
+        session.close()
+    assert _FakeEngine.runs == [
+        [('mei', 2024), ('sgr', 2024), ('mei', 2025), ('sgr', 2025)],
+        [('mei', 2024), ('mei', 2025)],
+        [('mei', 2026), ('sgr', 2026)],
+    ]
+
+
+def test_removed_override_does_not_leak_into_next_tick(monkeypatch):
+    monkeypatch.setattr(analysis_cache, '_engine_module', SimpleNamespace(CalculationEngine=_InPlaceEngine))
+    raw = {'df_gdp': pd.DataFrame({'실질GDP': [1.0, 2.0]}, index=[2023, 2024])}
+    session = LiveSimulationSession(lambda year: raw, lambda text: None, lambda x: x)
+    try:
+        assert session._analysis_for({'GDP_2024': 9.0}, 2025)[0]['S1'][2025] == 9.0
+        assert session._analysis_for({'I1_2024': 1.0}, 2025)[0]['S1'][2025] == 2.0
+        assert session.reused == []                 # GDP 수정 해제 -> SGR 캐시 재계산
+        assert raw['df_gdp'].loc[2024, '실질GDP'] == 2.0
+        raw['df_gdp'].loc[2024, '실질GDP'] = 3.0     # 원시자료 내용 변경(제자리 수정 후 버전 갱신) -> 재사용하지 않음
+        bump_data_version()
+        session.cache = live_simulation.AnalysisCache()
+        session._analysis_for({'I1_2024': 1.0}, 2025)
+        assert session.reused == []
+    finally:
+        session.close()
+
+
+def test_send_failure_closes_session(monkeypatch):
+    monkeypatch.setattr(live_simulation, 'build_engine', _FakeEngine)
+    monkeypatch.setattr(live_simulation, 'COALESCE_SECONDS', 0.0)
+
+    def broken_send(text):
+        raise OSError('connection closed')
+
+    session = LiveSimulationSession(lambda year: {}, broken_send, lambda x: x)
+    session.handle_message({'type': 'edit', 'overrides': {'GDP_2024': 1.0}})
+    session._worker.join(timeout=5)
+    assert not session._worker.is_alive() and session._closed
+
+
+if __name__ == "__main__":
+    test_diff_tree_removal_marker()
+    test_affected_calculators()
+    test_reuse_engine_caches_skips_stale_calculators()
+    print("[SUCCESS] live simulation tests passed")
@@ -0,0 +1,80 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from macro_link import MacroLinkModel, link_rates
+
+
+def link_formula(m, gdp_rate):
+    return gdp_rate + (1/3 * (m - gdp_rate)) if m > gdp_rate else gdp_rate
+
+
+def _model():
+    years = list(range(2015, 2026))
+    rng = np.random.default_rng(0)
+    cols = ['인건비_1', '인건비_2', '관리비_1', '관리비_2', '재료비_1', '재료비_2']
+    df_inf = pd.DataFrame(100 * np.cumprod(1 + rng.uniform(0, 0.05, (len(years), 6)), axis=0),
+                          index=years, columns=cols)
+    df_weights = pd.DataFrame({'인건비': [0.5, 0.4], '관리비': [0.3, 0.4], '재료비': [0.2, 0.2]},
+                              index=['병원', '의원'])
+    df_gdp = pd.DataFrame({'실질GDP': 1000 * np.cumprod(1 + rng.uniform(0, 0.04, len(years)))}, index=years)
+    df_rv = pd.DataFrame({'병원': 1.01, '의원': 0.99}, index=years[:-1])
+    return MacroLinkModel(df_inf, df_weights, df_gdp, df_rv)
+
+
+def test_link_rates_matches_formula():
+    mei = np.array([[0.01, 0.05, np.nan], [0.03, 0.02, 0.04]])
+    gdp = np.array([0.02, 0.025])
+    expected = np.array([[link_formula(m, g) for m in row] for row, g in zip(mei, gdp)])
+    np.testing.assert_allclose(link_rates(mei, gdp), expected)
+
+
+def test_coefficient_sweep_broadcast():
+    mei = np.array([[0.01, 0.05], [0.03, 0.02]])
+    gdp = np.array([0.02, 0.025])
+    coefs = np.linspace(0, 1, 5)
+    sweep = link_rates(mei, gdp, coef=coefs)
+    assert sweep.shape == (5, 2, 2)
+    for k, c in enumerate(coefs):
+        np.testing.assert_allclose(sweep[k], link_rates(mei, gdp, coef=c))
+
+
+def test_model_matches_scalar_loop():
+    model = _model()
+    years = model.valid_years(range(2018, 2028))
+    assert years == [2020, 2021, 2022, 2023, 2024, 2025, 2026, 2027]
+    block = model.cf(years)
+    for i, ty in enumerate(years):
+        dy = ty - 2
+        inf = model.df_inf
+        gdp_rate = model.df_gdp.loc[dy, '실질GDP'] / model.df_gdp.loc[dy - 1, '실질GDP'] - 1
+        labor = (inf.loc[dy, '인건비_2'] / inf.loc[dy - 3, '인건비_2']) ** (1/3) - 1
+        m = inf.loc[dy, '관리비_1'] / inf.loc[dy - 1, '관리비_1'] - 1
+        z = inf.loc[dy, '재료비_2'] / inf.loc[dy - 1, '재료비_2'] - 1
+        w = model.df_weights.loc['의원']
+        mei = w['인건비'] * labor + w['관리비'] * m + w['재료비'] * z
+        rv = model.df_rv.loc[dy, '의원'] - 1 if dy in model.df_rv.index else 0
+        expected = (link_formula(mei, gdp_rate) - rv) * 100
+        assert abs(block[i, 1, model.columns.index('I2M1Z2')] - expected) < 1e-12
+
+
+def test_to_frame_keeps_requested_types():
+    model = _model()
+    years = [2024, 2025]
+    df = model.to_frame(model.cf(years), years, types=['의원', '약국', '병원'])
+    assert df['종별'].tolist() == ['의원', '약국', '병원'] * 2
+    assert df['연도'].tolist() == [2024] * 3 + [2025] * 3
+    assert df.loc[df['종별'] == '약국', model.columns].isna().all().all()
+    assert df.loc[df['종별'] != '약국', model.columns].notna().all().all()
+
+
+if __name__ == "__main__":
+    test_link_rates_matches_formula()
+    test_coefficient_sweep_broadcast()
+    test_model_matches_scalar_loop()
+    test_to_frame_keeps_requested_types()
+    print("[SUCCESS] macro link tests passed")
@@ -0,0 +1,61 @@
+import sys
+import os
+import time
+
+sys.path.append(os.getcwd())
+
+import metrics
+from metrics import instrument_stages, timed_stage
+
+
+class _Mei:
+    def index(self, depth=0):
+        time.sleep(0.01)
+        if depth < 2:
+            self.index(depth + 1)        # 같은 단계 재귀: 바깥 호출만 측정
+
+
+class _Sgr:
+    def __init__(self):
+        self.mei = _Mei()
+
+    def paf(self):
+        time.sleep(0.02)
+        self.mei.index()                 # 다른 단계 호출 시간은 paf 자기 시간에서 제외
+
+
+def _stage_counts():
+    with metrics.STAGE_DURATION._lock:
+        return {k[0]: (v[1], v[2]) for k, v in metrics.STAGE_DURATION._values.items()}
+
+
+def test_stage_totals_recorded_once_per_run():
+    instrument_stages({'mei': [(_Mei, 'index')], 'paf': [(_Sgr, 'paf')]})
+    instrument_stages({'mei': [(_Mei, 'index')]})          # 중복 설치 무시
+    metrics.STAGE_DURATION._values.clear()
+    sgr = _Sgr()
+    with timed_stage('run_full_analysis', remainder='engine_other'):
+        sgr.paf()
+        sgr.mei.index()
+        time.sleep(0.01)
+    counts = _stage_counts()
+    assert {k: n for k, (_, n) in counts.items()} == {
+        'run_full_analysis': 1, 'mei': 1, 'paf': 1, 'engine_other': 1}
+    assert abs(counts['mei'][0] - 0.06) < 0.03
+    assert abs(counts['paf'][0] - 0.02) < 0.015
+    total = counts['mei'][0] + counts['paf'][0] + counts['engine_other'][0]
+    assert abs(total - counts['run_full_analysis'][0]) < 1e-9
+
+
+def test_stage_outside_scope_observed_per_call():
+    instrument_stages({'mei': [(_Mei, 'index')]})
+    metrics.STAGE_DURATION._values.clear()
+    _Mei().index(depth=2)
+    _Mei().index(depth=2)
+    assert _stage_counts()['mei'][1] == 2
+
+
+if __name__ == "__main__":
+    test_stage_totals_recorded_once_per_run()
+    test_stage_outside_scope_observed_per_call()
+    print("[SUCCESS] metrics tests passed")
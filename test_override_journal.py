@@ -0,0 +1,121 @@
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+import override_journal
+from override_journal import OverrideJournal, parse_override_key
+
+
+def _workbook(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'factor_pd'
+    ws.append(['연도', '인건비_1', '관리비_1'])
+    for y in (2023, 2024, 2025):
+        ws.append([y, 100.0, 200.0])
+    ws = wb.create_sheet('cost_structure')
+    ws.append(['비용유형', '병원', '의원'])
+    ws.append(['인건비', 0.4, 0.5])
+    wb.save(path)
+
+
+def test_parse_override_key():
+    assert parse_override_key('M1_2024') == ('factor_pd', 2024, '관리비_1')
+    assert parse_override_key('LAW_병원_2025 ') == ('law', 2025, '병원')
+    assert parse_override_key('NHI_POP_2024') == ('pop', 2024, '건보대상자수')
+    assert parse_override_key('WEIGHT_의원_인건비') == ('cost_structure', '인건비', '의원')
+    assert parse_override_key('의원(계)_2023') == ('expenditure_real', 2023, '의원(계)')
+    assert parse_override_key('unknown') is None
+
+
+def test_journal_apply_and_compact():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'SGR_data.xlsx')
+        _workbook(path)
+        journal = OverrideJournal(path)
+        journal.schedule_compaction = lambda: None  # 테스트에서는 직접 compact 호출
+        accepted, rejected = journal.append({'I1_2024': 111.0, 'WEIGHT_의원_인건비': 0.6, 'bad': 1})
+        assert len(accepted) == 2 and rejected == ['bad']
+
+        # 메모리 반영: 원본 DataFrame 은 그대로, 새 dict 반환 (비용구조는 전치된 형태)
+        raw = {'df_raw_mei_inf': pd.DataFrame({'인건비_1': [100.0, 100.0]}, index=[2023, 2024]),
+               'df_weights': pd.DataFrame({'인건비': [0.4, 0.5]}, index=['병원', '의원'])}
+        patched = journal.apply_to_raw_data(raw)
+        assert patched['df_raw_mei_inf'].loc[2024, '인건비_1'] == 111.0
+        assert patched['df_weights'].loc['의원', '인건비'] == 0.6
+        assert raw['df_raw_mei_inf'].loc[2024, '인건비_1'] == 100.0
+
+        # 프로세스 재시작 시 저널 복원
+        assert OverrideJournal(path).pending() == journal.pending()
+
+        assert journal.compact() == 2
+        wb = load_workbook(path)
+        assert wb['factor_pd']['B3'].value == 111.0
+        assert wb['cost_structure']['C2'].value == 0.6
+        assert OverrideJournal(path).pending() == {}
+
+
+def test_unknown_cells_rejected_and_unresolved_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'SGR_data.xlsx')
+        _workbook(path)
+        reloads = []
+        journal = OverrideJournal(path, on_compacted=lambda: reloads.append(1))
+        journal.schedule_compaction = lambda: None
+        # 해석은 되지만 워크북에 없는 셀 -> 저장 시점에 거부
+        accepted, rejected = journal.append({'의원(계)_2023': 1.0, 'I1_2030': 1.0, 'M1_2025': 201.0})
+        assert rejected == ['의원(계)_2023', 'I1_2030'] and len(accepted) == 1
+
+        # 원시자료에 없는 셀은 저널에 남기고 보고
+        patched = journal.apply_to_raw_data({'df_raw_mei_inf': pd.DataFrame({'인건비_1': [1.0]}, index=[2025])})
+        assert journal.status()['unapplied'] == ['factor_pd/2025/관리비_1']
+        assert patched['df_raw_mei_inf'].loc[2025, '인건비_1'] == 1.0
+
+        # 저장 이후 워크북에서 열이 사라진 경우: 압축해도 저널에 남김
+        wb = load_workbook(path)
+        wb['factor_pd'].delete_cols(3)
+        wb.save(path)
+        mtime = os.path.getmtime(path)
+        assert journal.compact() == 0
+        assert journal.status()['unresolved'] == ['factor_pd/2025/관리비_1']
+        # 기록할 셀이 없으면 워크북을 다시 쓰지 않고 재로드도 하지 않음
+        assert os.path.getmtime(path) == mtime and reloads == []
+        assert OverrideJournal(path).pending() == journal.pending() != {}
+
+
+def test_worker_restarts_after_idle_exit():
+    idle, delay = override_journal.WORKER_IDLE_SECONDS, override_journal.COMPACT_DELAY_SECONDS
+    override_journal.WORKER_IDLE_SECONDS, override_journal.COMPACT_DELAY_SECONDS = 0.05, 0.0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'SGR_data.xlsx')
+            _workbook(path)
+            reloads = []
+            journal = OverrideJournal(path, on_compacted=lambda: reloads.append(journal.write_lock.locked()))
+            for n, value in enumerate((111.0, 112.0), start=1):
+                journal.append({'I1_2024': value})
+                deadline = time.time() + 10
+                while (journal.pending() or len(reloads) < n) and time.time() < deadline:
+                    time.sleep(0.01)
+                assert journal.pending() == {}
+                assert load_workbook(path)['factor_pd']['B3'].value == value
+                time.sleep(0.2)  # 대기 시간 초과 -> 작업 스레드 종료, 다음 저장에서 재시작
+                assert journal._worker is None
+            # 재로드 콜백은 기록 락 안에서 실행
+            assert reloads == [True, True]
+    finally:
+        override_journal.WORKER_IDLE_SECONDS, override_journal.COMPACT_DELAY_SECONDS = idle, delay
+
+
+if __name__ == "__main__":
+    test_parse_override_key()
+    test_journal_apply_and_compact()
+    test_unknown_cells_rejected_and_unresolved_kept()
+    test_worker_restarts_after_idle_exit()
+    print("[SUCCESS] override journal tests passed")
@@ -0,0 +1,112 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis_cache
+import parallel_analysis
+from parallel_analysis import SharedRawData, attach, merge_history, run_years
+
+
+def test_shared_raw_data_roundtrip():
+    raw = {
+        'df_gdp': pd.DataFrame({'실질GDP': [1.0, 2.0], '영안인구': [3.0, 4.0]}, index=[2023, 2024]),
+        'df_num': pd.DataFrame({'종별': ['병원', '의원'], '기관수': [10, 20]}),  # 혼합 dtype -> pickle
+        's': pd.Series([1, 2, 3], name='x'),
+        'flag': True,
+    }
+    with SharedRawData(raw) as shared:
+        shm, restored = attach(shared.spec())
+        try:
+            pd.testing.assert_frame_equal(restored['df_gdp'], raw['df_gdp'])
+            pd.testing.assert_frame_equal(restored['df_num'], raw['df_num'])
+            pd.testing.assert_series_equal(restored['s'], raw['s'])
+            assert restored['flag'] is True
+            # 공유 메모리 뷰 (복사 없음, 읽기 전용)
+            view = np.ndarray((2, 2), dtype=np.float64, buffer=shm.buf)
+            assert np.shares_memory(restored['df_gdp'].to_numpy(), view)
+            assert not restored['df_gdp'].to_numpy().flags.writeable
+        finally:
+            del restored, view
+            shm.close()
+
+
+def test_merge_history():
+    h1 = {'S1': {2024: {'전체': 1.0}}, 'years': [2023, 2024]}
+    h2 = {'S1': {2024: {'전체': 2.0}, 2025: {'전체': 3.0}}, 'years': [2024, 2025]}
+    merged = merge_history({2025: (h2, {}, {}), 2024: (h1, {}, {})})
+    assert merged['S1'] == {2024: {'전체': 2.0}, 2025: {'전체': 3.0}}
+    assert merged['years'] == [2023, 2024, 2025]
+    assert h1['S1'][2024]['전체'] == 1.0
+
+
+class _InPlaceEngine:
+    """엔진처럼 수정값(GDP_연도)을 raw_data 에 제자리 기록"""
+
+    def __init__(self, raw_data, overrides=None):
+        self.raw_data = raw_data
+        for key, value in (overrides or {}).items():
+            raw_data['df_gdp'].loc[int(key.split('_')[1]), '실질GDP'] = value
+
+    def run_full_analysis(self, target_year=2025):
+        return float(self.raw_data['df_gdp'].loc[2024, '실질GDP']), {}, {}
+
+
+_FAKE_ENGINE = SimpleNamespace(CalculationEngine=_InPlaceEngine)
+
+
+def _gdp_raw():
+    return {'df_gdp': pd.DataFrame({'실질GDP': [1.0, 2.0]}, index=[2023, 2024])}
+
+
+def test_compute_analysis_with_overrides_leaves_raw_data_unchanged(monkeypatch):
+    monkeypatch.setattr(analysis_cache, '_engine_module', _FAKE_ENGINE)
+    raw = _gdp_raw()
+    before = raw['df_gdp'].copy()
+    assert analysis_cache.compute_analysis(raw, 2025, {'GDP_2024': 9.0})[0] == 9.0
+    pd.testing.assert_frame_equal(raw['df_gdp'], before)
+    assert analysis_cache.compute_analysis(raw, 2025)[0] == 2.0
+    # 순차 실행 경로도 같은 원시자료를 그대로 넘김
+    assert run_years(raw, [2025], overrides={'GDP_2024': 7.0}, max_workers=1)[2025][0] == 7.0
+    pd.testing.assert_frame_equal(raw['df_gdp'], before)
+
+
+def _run_in_worker(overrides):
+    analysis_cache._engine_module = _FAKE_ENGINE
+    return parallel_analysis._run_year(2025, overrides)[1][0]
+
+
+def test_worker_tasks_with_overrides_get_private_copy():
+    with SharedRawData(_gdp_raw()) as shared:
+        with ProcessPoolExecutor(max_workers=1, initializer=parallel_analysis._init_worker,
+                                 initargs=(shared.spec(),)) as pool:
+            assert pool.submit(_run_in_worker, {'GDP_2024': 9.0}).result() == 9.0
+            # 다음 작업은 공유 원본(수정 전 값)에서 시작
+            assert pool.submit(_run_in_worker, {}).result() == 2.0
+        view = np.ndarray((2, 1), dtype=np.float64, buffer=shared.shm.buf)
+        assert view[1, 0] == 2.0
+        del view
+
+
+def test_run_years_with_overrides_in_workers():
+    engine = pytest.importorskip('파이썬용_sgr_2027')
+    raw = engine.DataProcessor('SGR_data.xlsx').raw_data
+    overrides = {'I1_2024': 3.0}
+    parallel = run_years(raw, [2025, 2026], overrides=overrides, max_workers=2)
+    sequential = run_years(raw, [2025, 2026], overrides=overrides, max_workers=1)
+    assert merge_history(parallel) == merge_history(sequential)
+
+
+if __name__ == "__main__":
+    test_shared_raw_data_roundtrip()
+    test_merge_history()
+    test_worker_tasks_with_overrides_get_private_copy()
+    test_run_years_with_overrides_in_workers()
+    print("[SUCCESS] parallel analysis tests passed")
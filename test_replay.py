@@ -0,0 +1,65 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from attribution import RateKernel
+from replay import counterfactual_replay, TOTAL_LABEL
+from sample_raw_data import synthetic_raw_data
+
+
+def _raw_data():
+    return synthetic_raw_data(range(2000, 2025), seed=3, exp_growth=(0.02, 0.1),
+                              mei_cols=['인건비_1', '인건비_2', '관리비_1', '재료비_1', '재료비_2'])
+
+
+def test_matches_year_by_year_recursion():
+    raw = _raw_data()
+    res = counterfactual_replay(raw, start=2012, end=2024, models=['S1'])
+    cf_actual, exp_actual = raw['df_sgr_reval'], raw['df_expenditure']
+    for scenario in ('I2M1Z2', '평균'):
+        s = res.scenarios.index(scenario)
+        raw2 = dict(raw, df_sgr_reval=cf_actual.copy(), df_expenditure=exp_actual.copy())
+        for T in range(2012, 2025):
+            k = RateKernel(raw2, [T])
+            r = k.rates(k.base, ['S1'])['S1'][0, :, s] / 100
+            r = np.where(np.isnan(r), cf_actual.loc[T] / cf_actual.loc[T - 1] - 1, r)
+            raw2['df_sgr_reval'].loc[T] = raw2['df_sgr_reval'].loc[T - 1] * (1 + r)
+            raw2['df_expenditure'].loc[T] = exp_actual.loc[T] * raw2['df_sgr_reval'].loc[T] / cf_actual.loc[T]
+        np.testing.assert_allclose(res.cf['S1'][s], raw2['df_sgr_reval'].loc[2012:2024].to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(res.expenditure['S1'][s], raw2['df_expenditure'].loc[2012:2024].to_numpy(),
+                                   rtol=1e-12)
+
+
+def test_s2_price_replay_keeps_one_year_rates():
+    # S2 격차는 (AE_{y-1} x 환산지수 변화 / AE_y) 비율이라 가격만 바꾼 재현에서는 상쇄 -> 1년 전망 조정률과 같음
+    raw = _raw_data()
+    res = counterfactual_replay(raw, start=2012, models=['S2'])
+    k = RateKernel(raw, range(2012, 2025))
+    one_year = np.moveaxis(k.rates(k.base, ['S2'])['S2'], -1, 0)
+    assert not res.fallback['S2'].any()
+    np.testing.assert_allclose(res.rates['S2'], one_year, rtol=1e-10)
+
+
+def test_link_levels_and_gaps():
+    raw = _raw_data()
+    res = counterfactual_replay(raw, start=2015, end=2022)
+    start_cf = raw['df_sgr_reval'].loc[2014].to_numpy()
+    np.testing.assert_allclose(res.cf['Link'], start_cf * np.cumprod(1 + res.rates['Link'] / 100, axis=1))
+    summary = res.summary(year=2022, scenario='평균')
+    total = summary[(summary['모형'] == 'Link') & (summary['종별'] == TOTAL_LABEL)].iloc[0]
+    s = res.scenarios.index('평균')
+    assert abs(total['누적_격차'] - res.gap('Link')[s].sum()) < 1e-6
+    assert abs(total['환산지수_비율'] - total['재현_진료비'] / total['실제_진료비']) < 1e-12
+    table = res.scenario_table('S1')
+    np.testing.assert_allclose(table[TOTAL_LABEL], res.gap('S1').sum(axis=(1, 2)))
+    assert len(res.to_frame('S2', '평균')) == 8 * 2
+
+
+if __name__ == "__main__":
+    test_matches_year_by_year_recursion()
+    test_s2_price_replay_keeps_one_year_rates()
+    test_link_levels_and_gaps()
+    print("[SUCCESS] replay tests passed")
@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+import result_store
+from result_store import FileLock, SharedResultStore, bump_data_version, data_fingerprint
+
+
+def test_fingerprint_memo_follows_sheets_and_version():
+    raw = {'df_gdp': pd.DataFrame({'실질GDP': [1.0, 2.0]}, index=[2023, 2024])}
+    before = data_fingerprint(raw)
+    assert data_fingerprint(raw) == before
+    memo = result_store._fingerprint_memo[id(raw)]
+    assert memo[0] is raw and memo[1][0][1] is raw['df_gdp']      # 사본 없이 참조만 보관
+    raw['df_gdp'] = raw['df_gdp'].assign(실질GDP=[1.0, 3.0])       # 시트 교체 -> 재해시
+    changed = data_fingerprint(raw)
+    assert changed != before
+    raw['df_gdp'].loc[2024, '실질GDP'] = 2.0                        # 제자리 수정 + 버전 갱신
+    bump_data_version()
+    assert data_fingerprint(raw) == before
+    assert data_fingerprint({'df_gdp': raw['df_gdp'].copy()}) == before
+
+
+def test_purge_keeps_current_data_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedResultStore(os.path.join(tmp, 'store.sqlite'))
+        store.put(('old', 2025, 'base'), {'S1': 1.0})
+        store.put(('new', 2025, 'base'), {'S1': 2.0})
+        store.purge(keep_data_hash='new')
+        assert store.get(('old', 2025, 'base')) is None
+        assert store.get(('new', 2025, 'base')) == {'S1': 2.0}
+
+
+def test_stale_lock_reclaimed_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'k.lock')
+        open(path, 'w').close()
+        old = time.time() - 100
+        os.utime(path, (old, old))
+        a, b = FileLock(path, stale_seconds=10), FileLock(path, stale_seconds=10)
+        assert not a.try_acquire()          # 죽은 락 회수
+        assert a.try_acquire()
+        try:
+            assert not b.try_acquire()      # 새 락은 회수되지 않음
+            assert os.path.exists(path)
+        finally:
+            a.release()
+        assert not os.path.exists(path)
+        assert os.listdir(tmp) == []
+
+
+def test_heartbeat_keeps_held_lock_fresh():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'k.lock')
+        lock = FileLock(path, stale_seconds=0.6, heartbeat_seconds=0.05)
+        assert lock.try_acquire()
+        try:
+            time.sleep(1.0)                 # stale_seconds 보다 오래 보유
+            assert time.time() - os.path.getmtime(path) < 0.6
+            assert not FileLock(path, stale_seconds=0.6).try_acquire()
+            assert os.path.exists(path)
+        finally:
+            lock.release()
+        assert not lock._heartbeat.is_alive()
+
+
+def test_release_keeps_foreign_lock():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'k.lock')
+        lock = FileLock(path)
+        assert lock.try_acquire()
+        os.remove(path)                     # 회수된 뒤 다른 프로세스가 새 락 생성
+        other = FileLock(path)
+        assert other.try_acquire()
+        lock.release()
+        assert os.path.exists(path)
+        other.release()
+
+
+def test_get_or_compute_single_computation():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedResultStore(os.path.join(tmp, 'store.sqlite'))
+        key = ('abc', 2025, 'base')
+        calls = []
+        compute = lambda: calls.append(1) or {'S1': 1.0}
+        assert store.get_or_compute(key, compute) == {'S1': 1.0}
+        assert store.get_or_compute(key, compute) == {'S1': 1.0}
+        assert len(calls) == 1 and store.stats()['hits'] == 1
+
+
+if __name__ == "__main__":
+    test_fingerprint_memo_follows_sheets_and_version()
+    test_purge_keeps_current_data_only()
+    test_stale_lock_reclaimed_once()
+    test_heartbeat_keeps_held_lock_fresh()
+    test_release_keeps_foreign_lock()
+    test_get_or_compute_single_computation()
+    print("[SUCCESS] result store tests passed")
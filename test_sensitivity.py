@@ -0,0 +1,120 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pytest
+
+import attribution
+from attribution import RateKernel
+from sensitivity import jacobian
+from sample_raw_data import synthetic_raw_data
+
+
+def _raw_data():
+    return synthetic_raw_data(range(2008, 2027), seed=2,
+                              mei_cols=['인건비_1', '인건비_2', '관리비_1', '재료비_1'])
+
+
+def _rates(raw, year, model):
+    k = RateKernel(raw, [year])
+    return k.rates(k.base, [model])[model][0].ravel()
+
+
+def test_batched_jacobian_matches_cell_by_cell():
+    raw = _raw_data()
+    res = jacobian(raw, 2025, chunk_size=50)
+    assert res.jacobian.shape == (len(res.cells), 3 * 2 * (2 + 4))
+    rng = np.random.default_rng(0)
+    for model in ('S1', 'S2', 'Link'):
+        cols = res._columns(model, None, None)
+        nonzero = np.flatnonzero(np.abs(np.nan_to_num(res.jacobian[:, cols])).max(axis=1) > 0)
+        for ci in rng.choice(nonzero, 4, replace=False):
+            cell = res.cells.iloc[ci]
+            h = 1e-5 * max(abs(cell['값']), 1e-3)
+            bumped = []
+            for delta in (h, -h):
+                raw2 = dict(raw)
+                df = raw2[cell['자료']].astype(float).copy()
+                df.loc[cell['행'], cell['열']] += delta
+                raw2[cell['자료']] = df
+                bumped.append(_rates(raw2, 2025, model))
+            expected = (bumped[0] - bumped[1]) / (2 * h)
+            np.testing.assert_allclose(res.jacobian[ci, cols], expected, rtol=1e-4, atol=1e-7)
+
+
+def test_cells_outside_window_have_zero_sensitivity():
+    res = jacobian(_raw_data(), 2025, models=['S2'])
+    # S2 UAF 는 T-2 ~ T-4 격차만 사용 -> 2015년 진료비는 영향 없음
+    row = res.cells[(res.cells['자료'] == 'df_expenditure') & (res.cells['행'] == 2015)].index
+    assert np.all(res.jacobian[row] == 0)
+
+
+def test_ranking_sorted_by_elasticity():
+    res = jacobian(_raw_data(), 2025)
+    ranking = res.ranking(top=10)
+    assert len(ranking) == 10
+    assert list(ranking['순위']) == list(range(1, 11))
+    assert ranking['최대|탄력성|'].is_monotonic_decreasing
+    table = res.table(model='S1', type_name='의원', top=5)
+    assert set(table['모형']) == {'S1'} and set(table['종별']) == {'의원'}
+    assert table['탄력성(%p/1%)'].abs().is_monotonic_decreasing
+
+
+def test_clamp_kink_uses_one_sided_difference():
+    # 상하한을 기준 UAF 바로 위에 두면 +-h 교란이 꺾임을 넘음 -> 상하한 없는 모형과 같은 기울기여야 함
+    raw = _raw_data()
+    k = RateKernel(raw, [2025])
+    u = k.paf(k.base, 'S1', clamp=False)[0, 0]
+    limit = attribution.PAF_LIMIT
+    try:
+        attribution.PAF_LIMIT = np.inf
+        free = jacobian(raw, 2025, models=['S1'])
+        attribution.PAF_LIMIT = abs(u) + 1e-9
+        res = jacobian(raw, 2025, models=['S1'])
+    finally:
+        attribution.PAF_LIMIT = limit
+    cols = res._columns('S1', k.types[0], None)
+    assert res.one_sided[:, cols].any()
+    np.testing.assert_allclose(res.base_rates[cols], free.base_rates[cols])
+    np.testing.assert_allclose(res.jacobian[:, cols], free.jacobian[:, cols], rtol=1e-4, atol=1e-6)
+
+
+def test_out_of_range_rows_are_one_cell():
+    # 2018년 목표: 2005~2007년은 자료 범위 밖 -> 2008년 셀이 대체 사용, 셀 목록에는 1번만
+    raw = _raw_data()
+    res = jacobian(raw, 2018, models=['S1'])
+    cells = res.cells[(res.cells['자료'] == 'df_expenditure') & (res.cells['열'] == '병원')]
+    assert list(cells['행']) == list(range(2008, 2018))
+    ci = cells.index[0]
+    h = 1e-3
+    bumped = []
+    for delta in (h, -h):
+        df = raw['df_expenditure'].copy()
+        df.loc[2008, '병원'] += delta
+        bumped.append(_rates(dict(raw, df_expenditure=df), 2018, 'S1'))
+    np.testing.assert_allclose(res.jacobian[ci], (bumped[0] - bumped[1]) / (2 * h), rtol=1e-4, atol=1e-7)
+
+
+def test_base_rates_match_engine_history():
+    engine = pytest.importorskip('파이썬용_sgr_2027')
+    processor = engine.DataProcessor('SGR_data.xlsx')
+    history = engine.CalculationEngine(processor.raw_data).run_full_analysis(2025)[0]
+    types = list(processor.HOSPITAL_TYPES)
+    res = jacobian(processor.raw_data, 2025, models=['S1', 'S2'], types=types)
+    k = RateKernel(processor.raw_data, [2025], types)
+    rv = (k.rv_index(k.base)[0] - 1) * 100                     # 엔진 history S2 는 상대가치 차감 전
+    for m, add in (('S1', 0.0), ('S2', rv)):
+        rates = res.base_rates[res._columns(m, None, '평균')] + add
+        np.testing.assert_allclose(rates, [history[m][2025][t] for t in types], atol=0.005 + 1e-9)
+
+
+if __name__ == "__main__":
+    test_batched_jacobian_matches_cell_by_cell()
+    test_cells_outside_window_have_zero_sensitivity()
+    test_ranking_sorted_by_elasticity()
+    test_clamp_kink_uses_one_sided_difference()
+    test_out_of_range_rows_are_one_cell()
+    test_base_rates_match_engine_history()
+    print("[SUCCESS] sensitivity tests passed")
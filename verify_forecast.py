@@ -8,6 +8,7 @@ import pandas as pd
 # Assuming we can import it if it's in the same dir
 sys.path.append(os.getcwd())
 from 파이썬용_sgr_2027 import CalculationEngine, DataProcessor
+from financial_forecast import FinancialForecast, scenarios_from_history
 
 def test_forecast():
     processor = DataProcessor('SGR_data.xlsx')
@@ -16,6 +17,13 @@ def test_forecast():
     # Run analysis for 2025
     history, details, bulk_sgr = engine.run_full_analysis(target_year=2025)
     
+    # 장기 전망 (2050년까지, 보험료 증가율 가정 x 조정률 시나리오)
+    fc = FinancialForecast.from_finance(processor.raw_data['df_finance'])
+    result = fc.run(scenarios_from_history(history, 2025), horizon=2050)
+    print("\n[Long-horizon forecast] depletion year by premium growth x scenario")
+    print(result.summary())
+    print(result.depletion_distribution().to_string(index=False))
+    
     forecast = bulk_sgr.get('financial_forecast')
     if not forecast:
         print("FAILED: No financial forecast found in bulk_sgr")